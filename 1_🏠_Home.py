@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
-from utils import load_data
+from utils.instrumentation import begin_rerun, end_rerun, section
+from utils.kpi import load_home_kpis
 import os
 
 # --- Page Configuration ---
@@ -9,6 +10,7 @@ st.set_page_config(
     page_icon="🏠",
     layout="wide"
 )
+begin_rerun("home")
 
 # --- Header ---
 st.title("SIMANTRA: Sistem Manajemen Talenta Berintegritas")
@@ -19,10 +21,11 @@ manajemen talenta Aparatur Sipil Negara (ASN) menjadi lebih objektif, prediktif,
 
 # --- Main Content ---
 
-# Load data to get total ASN
-df_asn = load_data('data/data_asn.csv')
+# Counts precomputed for the current data and models; only a stale or missing file loads them
+with section('home.load_data'):
+    kpis = load_home_kpis()
 
-if not df_asn.empty:
+if kpis is not None:
     st.divider()
 
     # --- Key Performance Indicators ---
@@ -31,23 +34,19 @@ if not df_asn.empty:
     with col1:
         st.metric(
             label="Total ASN Terdata",
-            value=f"{df_asn.shape[0]} Orang"
+            value=f"{kpis['jumlah_asn']} Orang"
         )
     with col2:
-        # Dummy value as specified
+        # Counted from the batch EWS pass over every ASN
         st.metric(
             label="Potensi Risiko Terdeteksi",
-            value="15 Kasus",
-            delta="-2% vs bulan lalu",
-            delta_color="inverse"
+            value=f"{kpis['jumlah_risiko']} Kasus"
         )
     with col3:
-        # Dummy value as specified
+        # Counted from the same talent pool table as the Pemetaan Talenta page
         st.metric(
             label="Talent Pool High Potential",
-            value="85 Orang",
-            delta="+5% vs bulan lalu",
-            delta_color="normal"
+            value=f"{kpis['jumlah_high_potential']} Orang"
         )
 
     st.divider()
@@ -70,4 +69,6 @@ else:
 
 # --- Footer ---
 st.markdown("---")
-st.markdown("_TradeAI - MinusOne | SIMANTRA_")
\ No newline at end of file
+st.markdown("_TradeAI - MinusOne | SIMANTRA_")
+
+end_rerun()
\ No newline at end of file
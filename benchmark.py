@@ -0,0 +1,426 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+# Number of ASN at scale 1x, the size of the bundled sample data
+BASE_NUM_ASN = 100
+DEFAULT_SCALES = [1, 100, 10000]
+BENCHMARK_DIR = 'benchmarks'
+HISTORY_PATH = os.path.join(BENCHMARK_DIR, 'history.json')
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baseline.json')
+DATA_CACHE_DIR = os.path.join(BENCHMARK_DIR, '.data')
+DATASETS = ['asn', 'lhkpn', 'relasi', 'sentimen', 'slik']
+
+# --- Dataset generation ---
+
+def dataset_dir(scale):
+    return os.path.join(DATA_CACHE_DIR, f'scale_{scale}')
+
+def ensure_datasets(scale, seed=42):
+    """Generates the CSV and Parquet datasets of one scale once; later runs reuse them."""
+    data_dir = dataset_dir(scale)
+    if all(os.path.exists(os.path.join(data_dir, f'data_{name}.parquet')) for name in DATASETS):
+        return data_dir
+
+    os.makedirs(data_dir, exist_ok=True)
+    num_asn = BASE_NUM_ASN * scale
+    subprocess.run(
+        [sys.executable, 'create_dummy_data.py', '--num-asn', str(num_asn), '--seed', str(seed), '--output-dir', data_dir],
+        check=True, stdout=subprocess.DEVNULL
+    )
+    # The columnar copies are what the application reads once 'convert_data.py' has run
+    import streamlit.logger
+    streamlit.logger.set_log_level('error')
+    from utils import convert_all_datasets
+    convert_all_datasets(data_dir)
+    return data_dir
+
+# --- Benchmark cases ---
+# Every case receives the dataset directory, runs the measured work and returns
+# the number of items it processed (rows, predictions, calls...) for the throughput.
+
+def _read(data_dir, name, file_format='parquet'):
+    from utils import read_csv_typed, read_dataset
+    path = os.path.join(data_dir, f'data_{name}.csv')
+    return read_csv_typed(path) if file_format == 'csv' else read_dataset(path)
+
+def case_load_data_csv(data_dir):
+    return sum(len(_read(data_dir, name, 'csv')) for name in DATASETS)
+
+def case_load_data_parquet(data_dir):
+    return sum(len(_read(data_dir, name)) for name in DATASETS)
+
+def case_analyze_lhkpn_anomaly_batch(data_dir):
+    from utils import detect_lhkpn_anomalies, train_anomaly_model
+    df_lhkpn, df_asn = _read(data_dir, 'lhkpn'), _read(data_dir, 'asn')
+    model = train_anomaly_model(df_lhkpn=df_lhkpn, df_asn=df_asn)
+    with timed_section():
+        detect_lhkpn_anomalies(model, df_lhkpn, df_asn)
+    return len(df_lhkpn)
+
+def case_analyze_lhkpn_anomaly_single(data_dir):
+    from utils import analyze_lhkpn_anomaly, train_anomaly_model
+    df_lhkpn, df_asn = _read(data_dir, 'lhkpn'), _read(data_dir, 'asn')
+    model = train_anomaly_model(df_lhkpn=df_lhkpn, df_asn=df_asn)
+    id_asn = df_lhkpn['id_asn'].iloc[0]
+    with timed_section():
+        # The per-selection path of the EWS page: mask scan plus scoring of one ASN
+        df_asn_lhkpn = df_lhkpn[df_lhkpn['id_asn'] == id_asn].sort_values('tahun_lapor')
+        analyze_lhkpn_anomaly(model, df_asn_lhkpn.copy(), df_asn)
+    return 1
+
+def case_analyze_financial_health_batch(data_dir):
+    import pandas as pd
+    from utils import analyze_financial_health_batch
+    df_merged = pd.merge(_read(data_dir, 'asn'), _read(data_dir, 'slik'), on='id_asn', how='left')
+    with timed_section():
+        analyze_financial_health_batch(df_merged)
+    return len(df_merged)
+
+def case_analyze_financial_health_single(data_dir):
+    import pandas as pd
+    from utils import analyze_financial_health
+    df_merged = pd.merge(_read(data_dir, 'asn'), _read(data_dir, 'slik'), on='id_asn', how='left')
+    rows = [df_merged.iloc[i] for i in range(min(200, len(df_merged)))]
+    with timed_section():
+        for row in rows:
+            analyze_financial_health(row)
+    return len(rows)
+
+def _hub_id(relation_index):
+    import numpy as np
+    return int(relation_index.node_ids[int(np.argmax(np.diff(relation_index.indptr)))])
+
+def case_relation_index_build(data_dir):
+    from utils import RelationIndex
+    df_relasi = _read(data_dir, 'relasi')
+    with timed_section():
+        RelationIndex(df_relasi)
+    return len(df_relasi)
+
+def case_network_risk_propagate(data_dir):
+    """Personalized PageRank of the EWS indicators over the whole relation graph."""
+    from utils import RelationIndex, build_network_risk, build_risk_table, train_anomaly_model
+    frames = {name: _read(data_dir, name) for name in ['asn', 'slik', 'lhkpn', 'relasi']}
+    model = train_anomaly_model(df_lhkpn=frames['lhkpn'], df_asn=frames['asn'])
+    _, risk_table = build_risk_table(model, frames['asn'], frames['slik'], frames['lhkpn'])
+    relation_index = RelationIndex(frames['relasi'])
+    with timed_section():
+        build_network_risk(risk_table, relation_index)
+    return relation_index.num_edges
+
+def case_relation_cluster_detect(data_dir):
+    """Offline cluster stage: components and label-propagation communities over the cluster relation types."""
+    from utils import RelationIndex, detect_relation_clusters
+    relation_index = RelationIndex(_read(data_dir, 'relasi'))
+    with timed_section():
+        detect_relation_clusters(relation_index)
+    return relation_index.num_edges
+
+def case_batch_score_all(data_dir):
+    """Headless scoring of every ASN, as run by `simantra.py score --all`."""
+    from utils import score_all_asn, train_anomaly_model, train_classification_model
+    datasets = {name: _read(data_dir, name) for name in ['asn', 'slik', 'lhkpn', 'sentimen']}
+    classifier = train_classification_model()
+    anomaly_model = train_anomaly_model(df_lhkpn=datasets['lhkpn'], df_asn=datasets['asn'])
+    with timed_section():
+        score_all_asn(classifier, anomaly_model, datasets)
+    return len(datasets['asn'])
+
+def case_create_network_graph(data_dir):
+    from utils import RelationIndex, create_network_graph
+    relation_index = RelationIndex(_read(data_dir, 'relasi'))
+    hub_id = _hub_id(relation_index)
+    with timed_section():
+        create_network_graph(relation_index, hub_id, {})
+    return 1
+
+def case_relation_path_search(data_dir):
+    import numpy as np
+    from utils import RelationIndex
+    relation_index = RelationIndex(_read(data_dir, 'relasi'))
+    targets = relation_index.node_ids[np.random.default_rng(0).choice(relation_index.num_nodes, size=max(1, relation_index.num_nodes // 100), replace=False)]
+    with timed_section():
+        relation_index.find_paths(_hub_id(relation_index), targets, max_hops=3, edge_types=['Transaksi Keuangan', 'Keluarga'])
+    return 1
+
+def case_create_career_matrix_plot(data_dir):
+    from utils import create_career_matrix_plot
+    rows = [row for _, row in _read(data_dir, 'asn').head(50).iterrows()]
+    with timed_section():
+        for row in rows:
+            create_career_matrix_plot(row)
+    return len(rows)
+
+def case_talent_pool_predict(data_dir):
+    from utils import TalentPoolTable, assign_talent_pools, train_classification_model
+    df_asn = _read(data_dir, 'asn')
+    model = train_classification_model()
+    with timed_section():
+        TalentPoolTable(df_asn, assign_talent_pools(model, df_asn))
+    return len(df_asn)
+
+def case_talent_table_page(data_dir):
+    """One uncached query of the ASN detail table: search, sort and take the first page."""
+    from utils import TalentPoolTable, assign_talent_pools, train_classification_model
+    df_asn = _read(data_dir, 'asn')
+    talent_pools = TalentPoolTable(df_asn, assign_talent_pools(train_classification_model(), df_asn))
+    with timed_section():
+        positions = talent_pools.select(search='a', sort_by='nama')
+        talent_pools.page(positions, 0, 50)
+    return len(df_asn)
+
+def case_page_profil_talenta(data_dir):
+    """Cold start of the Profil Talenta page: build the repository, then render one profile."""
+    from utils import ASNRepository, aggregate_sentiment, build_risk_table, create_career_matrix_plot, \
+        FINANCIAL_REASONS, read_sentiment_scores, score_reviews, train_anomaly_model
+    frames = {name: _read(data_dir, name) for name in DATASETS}
+    with timed_section():
+        model = train_anomaly_model(df_lhkpn=frames['lhkpn'], df_asn=frames['asn'])
+        scored_lhkpn, risk_table = build_risk_table(model, frames['asn'], frames['slik'], frames['lhkpn'])
+        scored_reviews, _ = score_reviews(frames['sentimen'], read_sentiment_scores(os.path.join(data_dir, 'skor_sentimen.parquet')), processes=1)
+        repo = ASNRepository(risk_table, scored_lhkpn, frames['sentimen'], aggregate_sentiment(scored_reviews))
+        id_asn = repo.search_index.search('', 1)[0]
+        asn_data = repo.get_asn(id_asn)
+        FINANCIAL_REASONS[asn_data['kode_alasan_keuangan']]
+        repo.get_reviews(id_asn)['ulasan_naratif'].tolist()
+        create_career_matrix_plot(asn_data)
+    return len(frames['asn'])
+
+def case_page_pemetaan_talenta(data_dir):
+    """One rerun of the Pemetaan Talenta page: aggregate the cached talent pools and build the map."""
+    import plotly.express as px
+    from utils import TALENT_DENSITY_BINS, TALENT_SCATTER_POINT_LIMIT, TalentPoolTable, assign_talent_pools, \
+        create_talent_density_plot, train_classification_model
+    df_asn = _read(data_dir, 'asn')
+    talent_pools = TalentPoolTable(df_asn, assign_talent_pools(train_classification_model(), df_asn))
+    kinerja_range, potensi_range = talent_pools.bounds['kinerja_2023'], talent_pools.bounds['potensi']
+    with timed_section():
+        density = talent_pools.density(None, kinerja_range, potensi_range)
+        if density['jumlah'].sum() > TALENT_SCATTER_POINT_LIMIT:
+            fig = create_talent_density_plot(density, talent_pools.pools, kinerja_range, potensi_range, TALENT_DENSITY_BINS)
+        else:
+            fig = px.scatter(talent_pools.filter(None), x='kinerja_2023', y='potensi', color='talent_pool', hover_name='nama',
+                             hover_data=['jabatan_sekarang', 'unit_kerja'])
+        fig.to_json()
+    return len(df_asn)
+
+def case_page_early_warning(data_dir):
+    """Cold start of the EWS page: batch risk table, relation index and one rendered graph."""
+    from utils import RelationIndex, build_risk_table, create_network_graph, train_anomaly_model
+    frames = {name: _read(data_dir, name) for name in ['asn', 'slik', 'lhkpn', 'relasi']}
+    with timed_section():
+        model = train_anomaly_model(df_lhkpn=frames['lhkpn'], df_asn=frames['asn'])
+        _, risk_table = build_risk_table(model, frames['asn'], frames['slik'], frames['lhkpn'])
+        relation_index = RelationIndex(frames['relasi'])
+        create_network_graph(relation_index, _hub_id(relation_index), {})
+    return len(frames['asn'])
+
+CASES = {
+    'load_data_csv': case_load_data_csv,
+    'load_data_parquet': case_load_data_parquet,
+    'analyze_lhkpn_anomaly_batch': case_analyze_lhkpn_anomaly_batch,
+    'analyze_lhkpn_anomaly_single': case_analyze_lhkpn_anomaly_single,
+    'analyze_financial_health_batch': case_analyze_financial_health_batch,
+    'analyze_financial_health_single': case_analyze_financial_health_single,
+    'relation_index_build': case_relation_index_build,
+    'network_risk_propagate': case_network_risk_propagate,
+    'relation_cluster_detect': case_relation_cluster_detect,
+    'batch_score_all': case_batch_score_all,
+    'create_network_graph': case_create_network_graph,
+    'relation_path_search': case_relation_path_search,
+    'create_career_matrix_plot': case_create_career_matrix_plot,
+    'talent_pool_predict': case_talent_pool_predict,
+    'talent_table_page': case_talent_table_page,
+    'page_profil_talenta': case_page_profil_talenta,
+    'page_pemetaan_talenta': case_page_pemetaan_talenta,
+    'page_early_warning': case_page_early_warning
+}
+
+# --- Measurement ---
+
+_section_seconds = []
+
+class timed_section:
+    """Marks the part of a case that is timed, so its setup is excluded from the wall time."""
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        _section_seconds.append(time.perf_counter() - self._start)
+
+def _peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run_case(name, data_dir):
+    """Runs one case and returns its measurements; meant to run in a fresh process."""
+    # utils runs outside 'streamlit run' here: silence the missing-runtime cache warnings
+    # and keep the imports themselves out of the measured time
+    import importlib
+    import streamlit.logger
+    streamlit.logger.set_log_level('error')
+    import utils
+    for submodule in utils.SUBMODULES:
+        importlib.import_module(f'utils.{submodule}')
+    _section_seconds.clear()
+    start = time.perf_counter()
+    items = CASES[name](data_dir)
+    wall = time.perf_counter() - start
+    # Cases without a timed section are timed as a whole
+    seconds = sum(_section_seconds) if _section_seconds else wall
+    return {
+        'wall_s': round(seconds, 6),
+        'peak_rss_mb': round(_peak_rss_mb(), 1),
+        'items': items,
+        'throughput_per_s': round(items / seconds, 1) if seconds > 0 else None
+    }
+
+def run_isolated(name, data_dir):
+    """Runs a case in a new interpreter so that its peak RSS is not shared with other cases."""
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        return pool.apply(run_case, (name, data_dir))
+
+# --- History and baseline ---
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def append_history(results, path=HISTORY_PATH):
+    history = []
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            history = json.load(f)
+    history.append({
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'commit': _git_commit(),
+        'results': results
+    })
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=2)
+
+def machine_info():
+    """Hardware and interpreter the results were measured on; results are only comparable on a matching machine."""
+    import numpy
+    import pandas
+    return {
+        'system': platform.system(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'numpy': numpy.__version__,
+        'pandas': pandas.__version__
+    }
+
+def write_baseline(results, path=BASELINE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'commit': _git_commit(),
+            'machine': machine_info(),
+            'results': results
+        }, f, indent=2)
+
+def read_baseline(path=BASELINE_PATH):
+    """Returns the machine info (None for baselines saved without it) and the results of the baseline."""
+    with open(path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if 'results' not in baseline:
+        return None, baseline
+    return baseline['machine'], baseline['results']
+
+# Measurements compared with the baseline and their units
+BASELINE_METRICS = {'wall_s': 's', 'peak_rss_mb': 'MB'}
+
+def compare_with_baseline(results, baseline, tolerances):
+    """
+    Returns the (key, metric, baseline, current) entries that exceed the baseline by more than
+    the tolerance of their metric, given in `tolerances` per BASELINE_METRICS key.
+    """
+    regressions = []
+    for key, current in results.items():
+        reference = baseline.get(key)
+        if not reference:
+            continue
+        for metric, tolerance in tolerances.items():
+            if metric in reference and current[metric] > reference[metric] * (1 + tolerance):
+                regressions.append((key, metric, reference[metric], current[metric]))
+    return regressions
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark jalur kritis utils.py pada beberapa skala data (tanpa server Streamlit).")
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)),
+                        help=f"Kelipatan dari {BASE_NUM_ASN} ASN, dipisahkan koma.")
+    parser.add_argument('--cases', default=None, help="Nama kasus yang dijalankan, dipisahkan koma (default: semua).")
+    parser.add_argument('--in-process', action='store_true', help="Jalankan semua kasus dalam satu proses (peak RSS tidak terisolasi).")
+    parser.add_argument('--save-baseline', action='store_true', help="Simpan hasil sebagai baseline baru.")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Toleransi perlambatan terhadap baseline (0.2 = 20%%).")
+    parser.add_argument('--rss-tolerance', type=float, default=0.2, help="Toleransi kenaikan peak RSS terhadap baseline (0.2 = 20%%).")
+    parser.add_argument('--strict', action='store_true',
+                        help="Gagal karena regresi walaupun baseline diukur di mesin atau versi Python lain.")
+    parser.add_argument('--no-history', action='store_true', help="Jangan tambahkan hasil ke file riwayat.")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    scales = [int(s) for s in args.scales.split(',')]
+    case_names = args.cases.split(',') if args.cases else list(CASES)
+    unknown = set(case_names) - set(CASES)
+    if unknown:
+        sys.exit(f"Kasus tidak dikenal: {', '.join(sorted(unknown))}")
+
+    results = {}
+    for scale in scales:
+        print(f"\n== Skala {scale}x ({BASE_NUM_ASN * scale} ASN) ==")
+        data_dir = ensure_datasets(scale)
+        for name in case_names:
+            result = run_case(name, data_dir) if args.in_process else run_isolated(name, data_dir)
+            results[f'{name}@{scale}x'] = result
+            print(f"{name:32s} {result['wall_s']:10.4f} s {result['peak_rss_mb']:9.1f} MB {result['throughput_per_s'] or 0:14.1f} /s")
+
+    if not args.no_history:
+        append_history(results)
+
+    if args.save_baseline:
+        write_baseline(results)
+        print(f"\nBaseline disimpan ke {BASELINE_PATH}.")
+        return
+
+    if os.path.exists(BASELINE_PATH):
+        baseline_machine, baseline = read_baseline()
+        tolerances = {'wall_s': args.tolerance, 'peak_rss_mb': args.rss_tolerance}
+        regressions = compare_with_baseline(results, baseline, tolerances)
+        # Timings from other hardware or another interpreter are not comparable: report, but do not fail
+        same_machine = baseline_machine == machine_info()
+        if not same_machine:
+            print(f"\nPeringatan: baseline diukur di mesin lain ({json.dumps(baseline_machine)}); "
+                  f"mesin ini: {json.dumps(machine_info())}.")
+        if regressions:
+            print(f"\nRegresi terdeteksi (waktu > {args.tolerance:.0%} atau peak RSS > {args.rss_tolerance:.0%} di atas baseline):")
+            for key, metric, reference, current in regressions:
+                unit = BASELINE_METRICS[metric]
+                print(f"- {key} {metric}: {reference:.4f} {unit} -> {current:.4f} {unit}")
+            if same_machine or args.strict:
+                sys.exit(1)
+            print("Tidak dianggap gagal karena mesinnya berbeda; gunakan --strict untuk tetap gagal.")
+        else:
+            print("\nTidak ada regresi dibandingkan baseline.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import ast
+import glob
+import json
+import subprocess
+import sys
+
+# Maximum cold import time of every page, in milliseconds. Streamlit itself is already
+# loaded by the server before a page runs, so it is imported before the clock starts.
+IMPORT_BUDGETS_MS = {
+    '1_🏠_Home.py': 700,
+    'pages/2_👤_Profil_Talenta.py': 800,
+    'pages/3_📊_Pemetaan_Talenta.py': 900,
+    'pages/4_🚨_Early_Warning_System.py': 800
+}
+
+# Runs in a fresh interpreter: times the page's own top-level imports
+_MEASURE_SCRIPT = """
+import json, sys, time
+import streamlit, streamlit.logger
+streamlit.logger.set_log_level('error')
+source = sys.stdin.read()
+start = time.perf_counter()
+exec(compile(source, 'page_imports', 'exec'), {})
+print(json.dumps({'ms': (time.perf_counter() - start) * 1000, 'modules': len(sys.modules)}))
+"""
+
+def page_imports(page_path):
+    """Returns the top-level import statements of a page as source code."""
+    with open(page_path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    statements = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return '\n'.join(ast.unparse(node) for node in statements)
+
+def measure(page_path, repeat):
+    """Best cold import time of a page over `repeat` fresh interpreters, in milliseconds."""
+    source = page_imports(page_path)
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', _MEASURE_SCRIPT], input=source, capture_output=True, text=True, check=True
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return min(runs, key=lambda run: run['ms'])
+
+def heaviest_imports(page_path, limit=10):
+    """
+    Third-party packages with the largest cumulative import time, from `python -X importtime`.
+    Unlike `measure`, this includes Streamlit itself.
+    """
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', page_imports(page_path)], capture_output=True, text=True
+    ).stderr
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit() or name.startswith('  '):
+            continue
+        package = name.strip().split('.')[0]
+        if package in sys.stdlib_module_names:
+            continue
+        totals[package] = totals.get(package, 0) + int(cumulative) / 1000
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Ukur waktu import dingin setiap halaman dan bandingkan dengan anggarannya.")
+    parser.add_argument('--repeat', type=int, default=3, help="Jumlah pengukuran per halaman; diambil yang tercepat.")
+    parser.add_argument('--detail', action='store_true', help="Tampilkan paket dengan waktu import terbesar.")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    pages = ['1_🏠_Home.py'] + sorted(glob.glob('pages/*.py'))
+    over_budget = []
+    for page in pages:
+        result = measure(page, args.repeat)
+        budget = IMPORT_BUDGETS_MS.get(page)
+        status = 'OK' if budget is None or result['ms'] <= budget else 'MELEBIHI'
+        budget_text = f"{budget} ms" if budget is not None else '-'
+        print(f"{page:40s} {result['ms']:8.0f} ms  (anggaran {budget_text}, {result['modules']} modul)  {status}")
+        if status != 'OK':
+            over_budget.append(page)
+        if args.detail:
+            for package, ms in heaviest_imports(page):
+                print(f"    {package:30s} {ms:8.0f} ms")
+
+    if over_budget:
+        print(f"\n{len(over_budget)} halaman melebihi anggaran waktu import.")
+        sys.exit(1)
+    print("\nSemua halaman berada dalam anggaran waktu import.")
+
+if __name__ == '__main__':
+    main()
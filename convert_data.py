@@ -0,0 +1,16 @@
+from utils.data import convert_all_datasets
+
+def main():
+    """Converts every dataset CSV in 'data/' into its typed columnar (Parquet) copy."""
+    print("Mengonversi file data CSV ke format kolumnar (Parquet)...")
+    converted = convert_all_datasets('data')
+    for path in converted:
+        print(f"- {path}")
+
+    if not converted:
+        print("Tidak ada file CSV yang ditemukan. Jalankan 'python create_dummy_data.py' terlebih dahulu.")
+    else:
+        print("\nKonversi selesai. Aplikasi akan membaca salinan Parquet selama tidak lebih lama dari file CSV-nya.")
+
+if __name__ == '__main__':
+    main()
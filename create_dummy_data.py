@@ -1,168 +1,289 @@
-import pandas as pd
+import argparse
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
 import numpy as np
-import random
+import pandas as pd
 from faker import Faker
-import os
 
-# Initialize Faker for Indonesian data
-fake = Faker('id_ID')
+# --- Option lists shared by every chunk ---
+PANGKAT_GOL_OPTIONS = ['III/a', 'III/b', 'III/c', 'III/d', 'IV/a', 'IV/b', 'IV/c']
+JABATAN_OPTIONS = [
+    'Analis Kebijakan Pertama', 'Analis Kebijakan Muda', 'Analis Kebijakan Madya',
+    'Perencana Pertama', 'Perencana Muda', 'Perencana Madya',
+    'Auditor Pertama', 'Auditor Muda', 'Auditor Madya',
+    'Pranata Komputer Pertama', 'Pranata Komputer Muda', 'Pranata Komputer Madya'
+]
+UNIT_KERJA_OPTIONS = [
+    'Biro Perencanaan', 'Biro Kepegawaian', 'Biro Hukum',
+    'Inspektorat', 'Direktorat Kinerja ASN', 'Pusat Pengembangan Talenta'
+]
+PENDIDIKAN_OPTIONS = ['S1', 'S2', 'S3']
+TIPE_RELASI_OPTIONS = ['Kolega 1 Unit', 'Keluarga', 'Alumni Pelatihan', 'Transaksi Keuangan', 'Proyek Bersama']
 
-# --- 1. Generate data_asn.csv ---
-def create_data_asn(num_records=100):
+POSITIVE_TEMPLATES = [
+    "{} menunjukkan integritas luar biasa dan profesionalisme yang tinggi. Kinerjanya sangat hebat dan selalu melampaui ekspektasi.",
+    "Kinerja {} sangat memuaskan, fantastis, dan patut dipuji. Dia adalah aset yang sangat berharga bagi tim.",
+    "{} adalah pribadi yang ceria, selalu kolaboratif dan solutif. Inovasinya membawa dampak yang sangat positif dan menguntungkan.",
+    "Sangat senang dengan kontribusi {}. Selalu proaktif, dapat diandalkan, dan hasilnya selalu sempurna.",
+    "Luar biasa, {} selalu menunjukkan kinerja terbaik, sangat direkomendasikan untuk proyek penting selanjutnya."
+]
+NEGATIVE_TEMPLATES = [
+    "{} sangat buruk dalam kolaborasi dan seringkali menciptakan suasana tidak nyaman. Ini masalah serius.",
+    "Manajemen waktu {} sangat mengecewakan dan sering terlambat. Ini menghambat pekerjaan tim.",
+    "Sangat disayangkan, inisiatif dari {} sangat kurang. Kinerjanya di bawah standar dan tidak memuaskan.",
+    "Tingkat ketelitian {} dalam laporan sangat buruk dan sering menyebabkan kesalahan fatal. Ini tidak bisa diterima.",
+    "Komunikasi {} sangat buruk, seringkali tidak jelas dan menyebabkan kebingungan. Sangat sulit bekerja sama."
+]
+
+# NIPs are 18-digit numbers derived from the id through a bijection, so they stay unique across chunks
+NIP_BASE = 10 ** 17
+NIP_MODULUS = 9 * 10 ** 17
+# Coprime with NIP_MODULUS; id * NIP_MULTIPLIER stays within int64 up to MAX_NUM_ASN ids
+NIP_MULTIPLIER = 863_512_978_417
+# Largest supported --num-asn; the int64 product above overflows beyond about 10.68 million ids
+MAX_NUM_ASN = 10_000_000
+
+def create_name_pools(seed, pool_size=1000):
+    """Draws pools of Indonesian first and last names once; rows combine them by index."""
+    fake = Faker('id_ID')
+    fake.seed_instance(seed)
+    first_names = np.array([fake.first_name() for _ in range(pool_size)], dtype=object)
+    last_names = np.array([fake.last_name() for _ in range(pool_size)], dtype=object)
+    return first_names, last_names
+
+# --- 1. Generate data_asn ---
+def create_data_asn(rng, asn_ids, name_pools):
     """Generates dummy data for ASN profiles."""
-    pangkat_gol_options = ['III/a', 'III/b', 'III/c', 'III/d', 'IV/a', 'IV/b', 'IV/c']
-    jabatan_options = [
-        'Analis Kebijakan Pertama', 'Analis Kebijakan Muda', 'Analis Kebijakan Madya',
-        'Perencana Pertama', 'Perencana Muda', 'Perencana Madya',
-        'Auditor Pertama', 'Auditor Muda', 'Auditor Madya',
-        'Pranata Komputer Pertama', 'Pranata Komputer Muda', 'Pranata Komputer Madya'
-    ]
-    unit_kerja_options = [
-        'Biro Perencanaan', 'Biro Kepegawaian', 'Biro Hukum',
-        'Inspektorat', 'Direktorat Kinerja ASN', 'Pusat Pengembangan Talenta'
-    ]
-    pendidikan_options = ['S1', 'S2', 'S3']
-
-    data = []
-    for i in range(1, num_records + 1):
-        data.append({
-            'id_asn': i,
-            'nama': fake.name(),
-            'nip': fake.unique.numerify(text='##################'),
-            'pangkat_gol': random.choice(pangkat_gol_options),
-            'jabatan_sekarang': random.choice(jabatan_options),
-            'unit_kerja': random.choice(unit_kerja_options),
-            'kinerja_2023': random.randint(60, 100),
-            'potensi': random.randint(60, 100),
-            'pendidikan_terakhir': random.choice(pendidikan_options),
-            'lama_bekerja_thn': random.randint(2, 25),
-            'gaji_bulanan': random.randint(5, 25) * 1_000_000,
-            'total_hutang': random.randint(0, 500) * 1_000_000
-        })
-    return pd.DataFrame(data)
-
-# --- 2. Generate data_lhkpn.csv ---
-def create_data_lhkpn(asn_ids, num_years=5):
+    n = len(asn_ids)
+    first_names, last_names = name_pools
+    first = first_names[rng.integers(0, len(first_names), n)]
+    last = last_names[rng.integers(0, len(last_names), n)]
+
+    return pd.DataFrame({
+        'id_asn': asn_ids,
+        'nama': pd.Series(first) + ' ' + pd.Series(last),
+        'nip': NIP_BASE + (asn_ids * NIP_MULTIPLIER) % NIP_MODULUS,
+        'pangkat_gol': np.asarray(PANGKAT_GOL_OPTIONS, dtype=object)[rng.integers(0, len(PANGKAT_GOL_OPTIONS), n)],
+        'jabatan_sekarang': np.asarray(JABATAN_OPTIONS, dtype=object)[rng.integers(0, len(JABATAN_OPTIONS), n)],
+        'unit_kerja': np.asarray(UNIT_KERJA_OPTIONS, dtype=object)[rng.integers(0, len(UNIT_KERJA_OPTIONS), n)],
+        'kinerja_2023': rng.integers(60, 101, n),
+        'potensi': rng.integers(60, 101, n),
+        'pendidikan_terakhir': np.asarray(PENDIDIKAN_OPTIONS, dtype=object)[rng.integers(0, len(PENDIDIKAN_OPTIONS), n)],
+        'lama_bekerja_thn': rng.integers(2, 26, n),
+        'gaji_bulanan': rng.integers(5, 26, n) * 1_000_000,
+        'total_hutang': rng.integers(0, 501, n) * 1_000_000
+    })
+
+# --- 2. Generate data_lhkpn ---
+def create_data_lhkpn(rng, asn_ids, anomaly_rate, num_years=5, anomaly_year=2022):
     """Generates dummy LHKPN data with potential anomalies."""
-    data = []
-    asn_with_anomaly = random.sample(asn_ids, k=5) # Select 5 ASN for anomaly
-
-    for asn_id in asn_ids:
-        # Start with a more varied base wealth
-        kekayaan = random.randint(300, 1500) * 1_000_000
-        # Assign a stable, individual growth rate for each ASN
-        growth_rate = random.uniform(0.05, 0.15)
-        
-        for year in range(2019, 2019 + num_years):
-            # Inject a very significant anomaly for selected ASN in a specific year
-            if asn_id in asn_with_anomaly and year == 2022:
-                kekayaan *= random.uniform(2.5, 4.0) # 150% to 300% jump
-            else:
-                # Apply a much more stable and predictable increase for normal data
-                kekayaan *= (1 + growth_rate + random.uniform(-0.02, 0.02))
-
-            data.append({
-                'id_asn': asn_id,
-                'tahun_lapor': year,
-                'total_kekayaan': int(kekayaan)
-            })
-    return pd.DataFrame(data)
-
-# --- 3. Generate data_relasi.csv ---
-def create_data_relasi(asn_ids, num_relations=150):
-    """Generates dummy social network data."""
-    tipe_relasi_options = ['Kolega 1 Unit', 'Keluarga', 'Alumni Pelatihan', 'Transaksi Keuangan', 'Proyek Bersama']
-    data = []
-    for _ in range(num_relations):
-        sumber, target = random.sample(asn_ids, 2)
-        data.append({
-            'id_asn_sumber': sumber,
-            'id_asn_target': target,
-            'tipe_relasi': random.choice(tipe_relasi_options)
-        })
-    return pd.DataFrame(data)
-
-# --- 4. Generate data_sentimen.csv ---
-def create_data_sentimen(asn_ids, num_reviews_per_asn=3):
-    """Generates dummy performance review narratives."""
-    positive_templates = [
-        "{} menunjukkan integritas luar biasa dan profesionalisme yang tinggi. Kinerjanya sangat hebat dan selalu melampaui ekspektasi.",
-        "Kinerja {} sangat memuaskan, fantastis, dan patut dipuji. Dia adalah aset yang sangat berharga bagi tim.",
-        "{} adalah pribadi yang ceria, selalu kolaboratif dan solutif. Inovasinya membawa dampak yang sangat positif dan menguntungkan.",
-        "Sangat senang dengan kontribusi {}. Selalu proaktif, dapat diandalkan, dan hasilnya selalu sempurna.",
-        "Luar biasa, {} selalu menunjukkan kinerja terbaik, sangat direkomendasikan untuk proyek penting selanjutnya."
-    ]
-    negative_templates = [
-        "{} sangat buruk dalam kolaborasi dan seringkali menciptakan suasana tidak nyaman. Ini masalah serius.",
-        "Manajemen waktu {} sangat mengecewakan dan sering terlambat. Ini menghambat pekerjaan tim.",
-        "Sangat disayangkan, inisiatif dari {} sangat kurang. Kinerjanya di bawah standar dan tidak memuaskan.",
-        "Tingkat ketelitian {} dalam laporan sangat buruk dan sering menyebabkan kesalahan fatal. Ini tidak bisa diterima.",
-        "Komunikasi {} sangat buruk, seringkali tidak jelas dan menyebabkan kebingungan. Sangat sulit bekerja sama."
-    ]
-    data = []
-    asn_df = create_data_asn(len(asn_ids)) # Create a temporary df to get names
-    asn_map = asn_df.set_index('id_asn')['nama'].to_dict()
-
-    for asn_id in asn_ids:
-        nama_asn = asn_map.get(asn_id, "ASN")
-        for _ in range(num_reviews_per_asn):
-            if random.random() > 0.3: # 70% positive
-                ulasan = random.choice(positive_templates).format(nama_asn.split()[0])
-            else:
-                ulasan = random.choice(negative_templates).format(nama_asn.split()[0])
-            data.append({
-                'id_asn': asn_id,
-                'ulasan_naratif': ulasan
-            })
-    return pd.DataFrame(data)
-
-# --- 5. Generate data_slik.csv ---
-def create_data_slik(asn_ids):
+    n = len(asn_ids)
+    years = np.arange(2019, 2019 + num_years)
+
+    # Start with a varied base wealth and a stable, individual growth rate for each ASN
+    kekayaan_awal = rng.integers(300, 1501, n) * 1_000_000
+    growth_rate = rng.uniform(0.05, 0.15, n)
+    factors = 1 + growth_rate[:, None] + rng.uniform(-0.02, 0.02, (n, num_years))
+
+    # Inject a very significant anomaly (150% to 300% jump) for selected ASN in a specific year
+    anomalous = rng.choice(n, size=int(round(n * anomaly_rate)), replace=False)
+    if anomaly_year in years:
+        year_idx = int(np.searchsorted(years, anomaly_year))
+        factors[anomalous, year_idx] = rng.uniform(2.5, 4.0, len(anomalous))
+
+    kekayaan = kekayaan_awal[:, None] * np.cumprod(factors, axis=1)
+    return pd.DataFrame({
+        'id_asn': np.repeat(asn_ids, num_years),
+        'tahun_lapor': np.tile(years, n),
+        'total_kekayaan': kekayaan.ravel().astype(np.int64)
+    })
+
+# --- 3. Generate data_relasi ---
+def create_data_relasi(rng, sumber_ids, num_asn_total, num_relations):
+    """Generates dummy social network data starting from `sumber_ids` towards any ASN."""
+    sumber = rng.choice(sumber_ids, size=num_relations)
+    # A non-zero offset modulo the population keeps source and target distinct
+    target = (sumber - 1 + rng.integers(1, num_asn_total, num_relations)) % num_asn_total + 1
+    return pd.DataFrame({
+        'id_asn_sumber': sumber,
+        'id_asn_target': target,
+        'tipe_relasi': np.asarray(TIPE_RELASI_OPTIONS, dtype=object)[rng.integers(0, len(TIPE_RELASI_OPTIONS), num_relations)]
+    })
+
+# --- 4. Generate data_sentimen ---
+def create_data_sentimen(rng, df_asn, num_reviews_per_asn=3):
+    """Generates dummy performance review narratives that mention the real ASN names."""
+    templates = POSITIVE_TEMPLATES + NEGATIVE_TEMPLATES
+    prefixes = np.array([t.split('{}')[0] for t in templates], dtype=object)
+    suffixes = np.array([t.split('{}')[1] for t in templates], dtype=object)
+
+    n = len(df_asn) * num_reviews_per_asn
+    # 70% positive
+    positive = rng.random(n) > 0.3
+    template_idx = np.where(
+        positive,
+        rng.integers(0, len(POSITIVE_TEMPLATES), n),
+        len(POSITIVE_TEMPLATES) + rng.integers(0, len(NEGATIVE_TEMPLATES), n)
+    )
+    first_names = np.repeat(df_asn['nama'].str.split(' ', n=1).str[0].to_numpy(dtype=object), num_reviews_per_asn)
+
+    return pd.DataFrame({
+        'id_asn': np.repeat(df_asn['id_asn'].to_numpy(), num_reviews_per_asn),
+        'ulasan_naratif': prefixes[template_idx] + first_names + suffixes[template_idx]
+    })
+
+# --- 5. Generate data_slik ---
+def create_data_slik(rng, asn_ids):
     """Generates dummy SLIK OJK data."""
-    data = []
-    for asn_id in asn_ids:
-        # 20% chance of having a bad record
-        kualitas = 'Y' if random.random() < 0.2 else 'N'
-        data.append({
-            'id_asn': asn_id,
-            'kualitas_debitur_buruk': kualitas
-        })
-    return pd.DataFrame(data)
+    # 20% chance of having a bad record
+    return pd.DataFrame({
+        'id_asn': asn_ids,
+        'kualitas_debitur_buruk': np.where(rng.random(len(asn_ids)) < 0.2, 'Y', 'N')
+    })
+
+def generate_chunk(task):
+    """Generates every dataset for one contiguous range of ASN ids (runs in a worker process)."""
+    start_id, end_id, seed_seq, config, name_pools = task
+    rng = np.random.default_rng(seed_seq)
+    asn_ids = np.arange(start_id, end_id, dtype=np.int64)
+
+    df_asn = create_data_asn(rng, asn_ids, name_pools)
+
+    lhkpn_ids = np.sort(rng.choice(asn_ids, size=int(round(len(asn_ids) * config['lhkpn_fraction'])), replace=False))
+    df_lhkpn = create_data_lhkpn(rng, lhkpn_ids, config['anomaly_rate'])
+
+    num_relations = int(round(len(asn_ids) * config['relation_density']))
+    df_relasi = create_data_relasi(rng, asn_ids, config['num_asn'], num_relations)
+
+    df_sentimen = create_data_sentimen(rng, df_asn, config['reviews_per_asn'])
+    df_slik = create_data_slik(rng, asn_ids)
+
+    return {'asn': df_asn, 'lhkpn': df_lhkpn, 'relasi': df_relasi, 'sentimen': df_sentimen, 'slik': df_slik}
+
+class ChunkWriter:
+    """Appends the chunks of one dataset to a single CSV or Parquet file."""
+
+    def __init__(self, path, file_format):
+        self.path = path
+        self.file_format = file_format
+        self.rows = 0
+        self._parquet_writer = None
+
+    def write(self, df):
+        if self.file_format == 'csv':
+            df.to_csv(self.path, mode='w' if self.rows == 0 else 'a', header=self.rows == 0, index=False)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table.cast(self._parquet_writer.schema))
+        self.rows += len(df)
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+def to_parquet_types(name, df):
+    """Applies the dtypes the application expects from the typed Parquet copies (see utils.DATASET_SCHEMAS)."""
+    fixed_categories = {
+        'pangkat_gol': PANGKAT_GOL_OPTIONS,
+        'jabatan_sekarang': JABATAN_OPTIONS,
+        'unit_kerja': UNIT_KERJA_OPTIONS,
+        'pendidikan_terakhir': PENDIDIKAN_OPTIONS,
+        'tipe_relasi': TIPE_RELASI_OPTIONS
+    }
+    df = df.copy()
+    for column, categories in fixed_categories.items():
+        if column in df:
+            df[column] = pd.Categorical(df[column], categories=categories)
+    if name == 'asn':
+        df['nama'] = df['nama'].astype('string')
+        df[['kinerja_2023', 'potensi', 'lama_bekerja_thn']] = df[['kinerja_2023', 'potensi', 'lama_bekerja_thn']].astype('int16')
+    if name == 'lhkpn':
+        df['tahun_lapor'] = df['tahun_lapor'].astype('int16')
+    if name == 'sentimen':
+        # The review texts repeat heavily, so they are stored as dictionary-encoded strings
+        df['ulasan_naratif'] = df['ulasan_naratif'].astype('category')
+    if name == 'slik':
+        df['kualitas_debitur_buruk'] = df['kualitas_debitur_buruk'] == 'Y'
+    return df
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Membuat data dummy SIMANTRA dalam skala apa pun.")
+    parser.add_argument('--num-asn', type=int, default=100, help=f"Jumlah ASN (2 hingga {MAX_NUM_ASN:,}).")
+    parser.add_argument('--relation-density', type=float, default=1.5, help="Rata-rata jumlah relasi per ASN.")
+    parser.add_argument('--reviews-per-asn', type=int, default=3, help="Jumlah ulasan naratif per ASN.")
+    parser.add_argument('--lhkpn-fraction', type=float, default=0.2, help="Proporsi ASN yang memiliki data LHKPN.")
+    parser.add_argument('--anomaly-rate', type=float, default=0.25, help="Proporsi ASN ber-LHKPN yang mengalami lonjakan kekayaan.")
+    parser.add_argument('--seed', type=int, default=42, help="Seed agar data dapat direproduksi.")
+    parser.add_argument('--chunk-size', type=int, default=250_000, help="Jumlah ASN per chunk.")
+    parser.add_argument('--processes', type=int, default=None, help="Jumlah proses worker (default: semua core).")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv', help="Format file keluaran.")
+    parser.add_argument('--output-dir', default='data', help="Direktori keluaran.")
+    args = parser.parse_args()
+    # Every relation links two different ASN
+    if not 2 <= args.num_asn <= MAX_NUM_ASN:
+        parser.error(f"--num-asn harus antara 2 dan {MAX_NUM_ASN:,}.")
+    return args
 
 def main():
     """Main function to generate and save all dummy data files."""
-    print("Membuat direktori 'data' jika belum ada...")
-    os.makedirs('data', exist_ok=True)
-
-    # Generate ASN data
-    print("Membuat data_asn.csv...")
-    df_asn = create_data_asn(100)
-    df_asn.to_csv('data/data_asn.csv', index=False)
-    all_asn_ids = df_asn['id_asn'].tolist()
-
-    # Generate LHKPN data for a subset of ASN
-    print("Membuat data_lhkpn.csv...")
-    lhkpn_asn_ids = random.sample(all_asn_ids, 20)
-    df_lhkpn = create_data_lhkpn(lhkpn_asn_ids)
-    df_lhkpn.to_csv('data/data_lhkpn.csv', index=False)
-
-    # Generate relation data
-    print("Membuat data_relasi.csv...")
-    df_relasi = create_data_relasi(all_asn_ids)
-    df_relasi.to_csv('data/data_relasi.csv', index=False)
-
-    # Generate sentiment data
-    print("Membuat data_sentimen.csv...")
-    df_sentimen = create_data_sentimen(all_asn_ids)
-    df_sentimen.to_csv('data/data_sentimen.csv', index=False)
-
-    # Generate SLIK data
-    print("Membuat data_slik.csv...")
-    df_slik = create_data_slik(all_asn_ids)
-    df_slik.to_csv('data/data_slik.csv', index=False)
-
-    print("\nSemua file data dummy berhasil dibuat di dalam folder 'data/'.")
+    args = parse_args()
+    config = {
+        'num_asn': args.num_asn,
+        'relation_density': args.relation_density,
+        'reviews_per_asn': args.reviews_per_asn,
+        'lhkpn_fraction': args.lhkpn_fraction,
+        'anomaly_rate': args.anomaly_rate
+    }
+
+    print(f"Membuat direktori '{args.output_dir}' jika belum ada...")
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    # Chunk boundaries and per-chunk seeds do not depend on the number of processes,
+    # so the same seed always yields the same files
+    boundaries = list(range(1, args.num_asn + 1, args.chunk_size)) + [args.num_asn + 1]
+    seed_seqs = np.random.SeedSequence(args.seed).spawn(len(boundaries) - 1)
+    name_pools = create_name_pools(args.seed)
+    tasks = [
+        (start, end, seed_seq, config, name_pools)
+        for start, end, seed_seq in zip(boundaries[:-1], boundaries[1:], seed_seqs)
+    ]
+
+    writers = {
+        name: ChunkWriter(os.path.join(args.output_dir, f'data_{name}.{args.format}'), args.format)
+        for name in ['asn', 'lhkpn', 'relasi', 'sentimen', 'slik']
+    }
+    print(f"Membuat data untuk {args.num_asn} ASN dalam {len(tasks)} chunk...")
+    processes = args.processes or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        # At most two chunks per worker are in flight, so finished chunks cannot pile up in
+        # memory while the writer falls behind; results are written in chunk order
+        pending = deque()
+        remaining = iter(tasks)
+        for task in islice(remaining, 2 * processes):
+            pending.append(executor.submit(generate_chunk, task))
+        for i in range(1, len(tasks) + 1):
+            chunk = pending.popleft().result()
+            next_task = next(remaining, None)
+            if next_task is not None:
+                pending.append(executor.submit(generate_chunk, next_task))
+            for name, df in chunk.items():
+                writers[name].write(df if args.format == 'csv' else to_parquet_types(name, df))
+            del chunk
+            print(f"- Chunk {i}/{len(tasks)} selesai")
+
+    for name, writer in writers.items():
+        writer.close()
+        print(f"{writer.path}: {writer.rows} baris")
+
+    print(f"\nSemua file data dummy berhasil dibuat di dalam folder '{args.output_dir}/'.")
     print("Jalankan 'pip install -r requirements.txt' dan 'streamlit run 1_🏠_Home.py' untuk memulai aplikasi.")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
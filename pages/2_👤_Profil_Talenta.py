@@ -1,7 +1,11 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from utils import load_data, load_sentiment_analyzer, analyze_sentiment, create_career_matrix_plot, analyze_financial_health
+from utils.instrumentation import begin_rerun, end_rerun, section
+from utils.models import promotion_metrics
+from utils.plots import create_career_matrix_plot
+from utils.risk import FINANCIAL_REASONS, load_asn_repository
+from utils.search import select_asn
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -9,37 +13,37 @@ st.set_page_config(
     page_icon="👤",
     layout="wide"
 )
+begin_rerun("profil_talenta")
 
 # --- Header ---
 st.title("👤 Profil Talenta 360°")
 st.markdown("Halaman ini menyajikan analisis mendalam mengenai profil setiap ASN, termasuk rekomendasi karier dan pengembangan diri.")
 
 # --- Load Data ---
-df_asn = load_data('data/data_asn.csv')
-df_sentimen = load_data('data/data_sentimen.csv')
-df_slik = load_data('data/data_slik.csv')
+# Shared, indexed view of the merged ASN/SLIK table and the reviews
+with section('profil.load_data'):
+    repo = load_asn_repository()
 
-if df_asn.empty or df_sentimen.empty or df_slik.empty:
+if repo is None:
     st.warning("Data tidak dapat dimuat. Pastikan file 'data_asn.csv', 'data_sentimen.csv', dan 'data_slik.csv' ada.")
 else:
-    df_asn_merged = pd.merge(df_asn, df_slik, on='id_asn', how='left')
     # --- Sidebar for ASN Selection ---
     with st.sidebar:
         st.header("Filter Profil")
-        # Create a name to id mapping for easier lookup
-        asn_name_map = df_asn_merged.set_index('nama')['id_asn'].to_dict()
-        selected_asn_name = st.selectbox(
-            "Pilih Nama ASN:",
-            options=sorted(df_asn_merged['nama'].unique())
-        )
-        selected_asn_id = asn_name_map[selected_asn_name]
+        # Only the best matches of the prebuilt name/NIP index are sent to the browser
+        selected_asn_id = select_asn(repo.search_index, "Pilih Nama ASN:", key="profil_select")
+
+    # Get selected ASN data
+    asn_data = repo.get_asn(selected_asn_id) if selected_asn_id is not None else None
+    if asn_data is None:
+        st.info("Tidak ada ASN yang dapat ditampilkan.")
+        end_rerun()
+        st.stop()
+    selected_asn_name = asn_data['nama']
 
     # --- Main Content ---
     st.header(f"Analisis Profil: {selected_asn_name}")
 
-    # Get selected ASN data
-    asn_data = df_asn_merged[df_asn_merged['id_asn'] == selected_asn_id].iloc[0]
-
     # Display basic info
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -53,22 +57,19 @@ else:
 
     # --- Promotion Metrics ---
     col_promo1, col_promo2 = st.columns(2)
+    # Generated dynamically from the ASN ID, potential and performance; shared with the scoring API
+    prob_promosi, syarat_promosi = promotion_metrics(asn_data['id_asn'], asn_data['potensi'], asn_data['kinerja_2023'])
     with col_promo1:
-        # Generate dynamic value based on ASN ID and potential
-        np.random.seed(asn_data['id_asn'])
-        prob_promosi = int(60 + (asn_data['potensi'] - 60) * 0.4 + np.random.randint(0, 10))
         st.metric("Probabilitas Promosi", f"{prob_promosi}%", help="Dihasilkan secara dinamis berdasarkan profil ASN")
     with col_promo2:
-        # Generate dynamic value based on ASN ID and performance
-        np.random.seed(asn_data['id_asn'] + 1) # Use different seed
-        syarat_promosi = int(70 + (asn_data['kinerja_2023'] - 60) * 0.3 + np.random.randint(0, 10))
         st.metric("Pemenuhan Syarat Promosi", f"{syarat_promosi}%", help="Dihasilkan secara dinamis berdasarkan profil ASN")
 
     st.divider()
     
     # --- Early Warning System Status ---
     st.subheader("Status Peringatan Dini (EWS)")
-    atensi, reason = analyze_financial_health(asn_data)
+    # Computed for every ASN by the batch EWS pass
+    atensi, reason = bool(asn_data['atensi_keuangan']), FINANCIAL_REASONS[asn_data['kode_alasan_keuangan']]
     if atensi:
         st.error(f"🔴 **Perlu Atensi**\n\n**Alasan:** {reason}")
     else:
@@ -120,38 +121,18 @@ else:
             """)
 
         with col_rec2:
-            st.plotly_chart(create_career_matrix_plot(asn_data), use_container_width=True)
+            with section('profil.career_plot'):
+                st.plotly_chart(create_career_matrix_plot(asn_data), use_container_width=True)
 
     with tab2:
         st.subheader("Analisis Sentimen dan Rekomendasi Pengembangan")
         
-        # Load sentiment model
-        with st.spinner('Menganalisis sentimen ulasan...'):
-            analyzer = load_sentiment_analyzer()
-        
-        # Filter sentiment data for the selected ASN
-        asn_reviews = df_sentimen[df_sentimen['id_asn'] == selected_asn_id]
-
-        if not asn_reviews.empty:
-            # Combine all reviews into one text block for overall analysis
-            full_text_reviews = ". ".join(asn_reviews['ulasan_naratif'].tolist())
-            # Analyze sentiment for each review and average the score
-            total_compound_score = 0
-            reviews_list = asn_reviews['ulasan_naratif'].tolist()
-            for review in reviews_list:
-                total_compound_score += analyzer.polarity_scores(review)['compound']
-            
-            avg_compound_score = total_compound_score / len(reviews_list)
-
-            if avg_compound_score >= 0.05:
-                sentiment = "Positif"
-                sentiment_color = "green"
-            elif avg_compound_score <= -0.05:
-                sentiment = "Negatif"
-                sentiment_color = "red"
-            else:
-                sentiment = "Netral"
-                sentiment_color = "orange"
+        # Sentiment scores are precomputed per ASN in the repository
+        if asn_data['jumlah_ulasan'] > 0:
+            avg_compound_score = asn_data['skor_sentimen']
+            sentiment = asn_data['sentimen']
+            sentiment_color = {"Positif": "green", "Negatif": "red"}.get(sentiment, "orange")
+            reviews_list = repo.get_reviews(selected_asn_id)['ulasan_naratif'].tolist()
 
             st.markdown(f"**Sentimen Ulasan Kinerja Keseluruhan:** <span style='color:{sentiment_color}; font-weight:bold;'>{sentiment}</span> (Skor: {avg_compound_score:.2f})", unsafe_allow_html=True)
 
@@ -176,4 +157,6 @@ else:
                 rekomendasi_belajar = f"Tingkatkan keahlian teknis dengan: **{np.random.choice(technical_path)}**."
                 st.success(rekomendasi_belajar)
         else:
-            st.info("Tidak ada data ulasan kinerja naratif yang ditemukan untuk ASN ini.")
\ No newline at end of file
+            st.info("Tidak ada data ulasan kinerja naratif yang ditemukan untuk ASN ini.")
+
+end_rerun()
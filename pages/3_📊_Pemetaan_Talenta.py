@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from utils import load_data, load_classification_model
+from utils.instrumentation import begin_rerun, end_rerun, section
+from utils.models import TALENT_DENSITY_BINS, TALENT_TABLE_SORT_COLUMNS, load_talent_density, load_talent_pools, load_talent_table_rows
+from utils.plots import TALENT_POOL_COLORS, TALENT_SCATTER_POINT_LIMIT, create_talent_density_plot
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -9,72 +11,93 @@ st.set_page_config(
     page_icon="📊",
     layout="wide"
 )
+begin_rerun("pemetaan_talenta")
+
+# Column headers of the detail table
+TABLE_LABELS = {
+    'nama': 'Nama',
+    'nip': 'NIP',
+    'jabatan_sekarang': 'Jabatan',
+    'unit_kerja': 'Unit Kerja',
+    'kinerja_2023': 'Kinerja',
+    'potensi': 'Potensi',
+    'talent_pool': 'Talent Pool'
+}
+
+def score_range_filter(label: str, bounds: tuple) -> tuple:
+    """Range slider over the score bounds; with a single distinct score there is nothing to choose."""
+    low, high = (int(v) for v in bounds)
+    # st.slider rejects equal minimum and maximum values
+    if low == high:
+        st.caption(f"Semua ASN memiliki skor {label.lower()} {low}.")
+        return low, high
+    return st.slider(f"Rentang Skor {label}:", low, high, value=(low, high))
 
 # --- Header ---
 st.title("📊 Pemetaan Talent Pool")
 st.markdown("Halaman ini memvisualisasikan pemetaan ASN ke dalam *talent pool* berdasarkan kinerja dan potensi menggunakan model klasifikasi.")
 
 # --- Load Data and Model ---
-df_asn = load_data('data/data_asn.csv')
+# Every ASN is classified once per model and data version; reruns only read the shared table
+with st.spinner('Memuat model AI dan memproses data...'), section('pemetaan.load_data'):
+    talent_pools = load_talent_pools()
 
-if df_asn.empty:
+if talent_pools is None:
     st.warning("Data ASN tidak dapat dimuat. Pastikan file 'data_asn.csv' ada.")
 else:
-    with st.spinner('Memuat model AI dan memproses data...'):
-        model = load_classification_model()
-        
-        # Predict talent pool for each ASN
-        # In a real scenario, features would be properly scaled and selected.
-        # Here, we use the raw scores for demonstration.
-        # Convert to numpy array to avoid feature name warning
-        features = df_asn[['kinerja_2023', 'potensi']].values
-        predictions = model.predict(features)
-        pool_map = {0: 'Solid Contributor', 1: 'High Potential', 2: 'Low Performer'}
-        df_asn['talent_pool'] = [pool_map.get(p, 'N/A') for p in predictions]
-
     # --- Main Content ---
     st.header("Visualisasi Sebaran Talenta ASN")
 
     # --- Sidebar for filtering ---
     with st.sidebar:
         st.header("Filter Data")
-        talent_pool_options = ['Semua'] + sorted(df_asn['talent_pool'].unique())
+        talent_pool_options = ['Semua'] + talent_pools.pools
         selected_pool = st.selectbox(
             "Filter berdasarkan Talent Pool:",
             options=talent_pool_options
         )
 
+        # Score window of the map: it filters the plotted ASN (the axes follow the remaining
+        # points), it is not a viewport zoom and does not filter the detail table
+        st.subheader("Rentang Skor Peta")
+        st.caption("Hanya ASN dengan skor di dalam rentang ini yang ditampilkan pada peta.")
+        kinerja_range = score_range_filter("Kinerja", talent_pools.bounds['kinerja_2023'])
+        potensi_range = score_range_filter("Potensi", talent_pools.bounds['potensi'])
+
     # Filter data based on selection for both plot and dataframe
-    if selected_pool == 'Semua':
-        filtered_df = df_asn
-    else:
-        filtered_df = df_asn[df_asn['talent_pool'] == selected_pool]
+    pool = None if selected_pool == 'Semua' else selected_pool
 
     # --- Interactive Scatter Plot ---
-    fig = px.scatter(
-        filtered_df, # Use the filtered dataframe
-        x='kinerja_2023',
-        y='potensi',
-        color='talent_pool',
-        hover_name='nama',
-        hover_data=['jabatan_sekarang', 'unit_kerja'],
-        color_discrete_map={
-            'High Potential': '#4a90e2',      # Primary Blue
-            'Solid Contributor': '#87ceeb',   # Light Blue/Sky
-            'Low Performer': '#e74c3c'       # Soft Red
-        },
-        title='Peta Kinerja vs Potensi ASN'
-    )
-    fig.update_layout(
-        xaxis_title="Skor Kinerja",
-        yaxis_title="Skor Potensi",
-        legend_title="Talent Pool",
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font_color='#dbeeff'
-    )
-    fig.update_traces(marker=dict(size=12, opacity=0.8))
-    st.plotly_chart(fig, use_container_width=True)
+    # Large selections are drawn from per-cell counts, cached per filter; narrow ones as exact points
+    with section('pemetaan.density'):
+        density = load_talent_density(pool, kinerja_range, potensi_range)
+    jumlah_titik = int(density['jumlah'].sum())
+    if jumlah_titik > TALENT_SCATTER_POINT_LIMIT:
+        fig = create_talent_density_plot(density, talent_pools.pools, kinerja_range, potensi_range, TALENT_DENSITY_BINS)
+        st.caption(f"{jumlah_titik:,} ASN ditampilkan sebagai peta kepadatan. Persempit filter atau rentang skor hingga "
+                   f"{TALENT_SCATTER_POINT_LIMIT:,} ASN atau kurang untuk melihat setiap ASN.")
+    else:
+        fig = px.scatter(
+            talent_pools.window(pool, kinerja_range, potensi_range),
+            x='kinerja_2023',
+            y='potensi',
+            color='talent_pool',
+            hover_name='nama',
+            hover_data=['jabatan_sekarang', 'unit_kerja'],
+            color_discrete_map=TALENT_POOL_COLORS,
+            title='Peta Kinerja vs Potensi ASN'
+        )
+        fig.update_layout(
+            xaxis_title="Skor Kinerja",
+            yaxis_title="Skor Potensi",
+            legend_title="Talent Pool",
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            font_color='#dbeeff'
+        )
+        fig.update_traces(marker=dict(size=12, opacity=0.8))
+    with section('pemetaan.scatter_plot'):
+        st.plotly_chart(fig, use_container_width=True)
 
     # --- Legend and Explanation ---
     with st.expander("ℹ️ Lihat Penjelasan Metodologi"):
@@ -94,12 +117,39 @@ else:
     st.divider()
 
     # --- Filterable Dataframe ---
+    # Filtering, search and sorting run on the shared table; only the visible page is sent
     st.header("Detail Data ASN")
-    
-    # Rename column for display
-    display_df = filtered_df.rename(columns={'kinerja_2023': 'Kinerja'})
-    display_df['nip'] = display_df['nip'].astype(str)
-    st.dataframe(
-        display_df[['nama', 'nip', 'jabatan_sekarang', 'unit_kerja', 'Kinerja', 'potensi', 'talent_pool']],
-        use_container_width=True
-    )
\ No newline at end of file
+
+    col_search, col_unit, col_jabatan = st.columns(3)
+    search = col_search.text_input("Cari nama atau NIP:")
+    units = col_unit.multiselect("Unit Kerja:", options=talent_pools.options['unit_kerja'])
+    jabatan = col_jabatan.multiselect("Jabatan:", options=talent_pools.options['jabatan_sekarang'])
+
+    col_sort, col_order, col_size = st.columns([2, 1, 1])
+    sort_by = col_sort.selectbox(
+        "Urutkan berdasarkan:",
+        options=TALENT_TABLE_SORT_COLUMNS,
+        format_func=lambda column: TABLE_LABELS[column]
+    )
+    descending = col_order.radio("Urutan:", options=["Naik", "Turun"], horizontal=True) == "Turun"
+    page_size = col_size.selectbox("Baris per halaman:", options=[25, 50, 100])
+
+    with section('pemetaan.table_query'):
+        filters = (('unit_kerja', tuple(units)), ('jabatan_sekarang', tuple(jabatan)))
+        positions = load_talent_table_rows(pool, filters, search, sort_by, descending)
+
+    if len(positions) == 0:
+        st.info("Tidak ada ASN yang sesuai dengan filter.")
+    else:
+        total_pages = -(-len(positions) // page_size)
+        page = st.number_input("Halaman:", min_value=1, max_value=total_pages, value=1)
+        page_df = talent_pools.page(positions, page - 1, page_size)
+
+        # Rename column for display
+        display_df = page_df[TALENT_TABLE_SORT_COLUMNS].rename(columns=TABLE_LABELS)
+        display_df['NIP'] = display_df['NIP'].astype(str)
+        st.dataframe(display_df, use_container_width=True, hide_index=True)
+        first = (page - 1) * page_size + 1
+        st.caption(f"Menampilkan {first:,}–{first + len(page_df) - 1:,} dari {len(positions):,} ASN (halaman {page} dari {total_pages:,}).")
+
+end_rerun()
@@ -1,9 +1,14 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from utils import load_data, load_anomaly_model, analyze_lhkpn_anomaly, create_network_graph, analyze_financial_health
+from utils.graph import load_relation_index, search_relation_paths, RELATION_RISK_WEIGHTS, EGO_GRAPH_EXPAND_LIMIT
+from utils.instrumentation import begin_rerun, end_rerun, section
+from utils.models import LHKPN_FEATURES
+from utils.risk import FINANCIAL_REASONS, load_asn_repository, load_ews_options, load_ego_layout, load_network_html, \
+    search_flagged_relation_paths
+from utils.search import select_asn
+from utils.clusters import CLUSTER_EDGE_TYPES, load_relation_clusters
 import streamlit.components.v1 as components
-import os
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -11,59 +16,98 @@ st.set_page_config(
     page_icon="🚨",
     layout="wide"
 )
+begin_rerun("early_warning_system")
 
 # --- Header ---
 st.title("🚨 Early Warning System")
 st.markdown("Sistem Peringatan Dini untuk mendeteksi potensi anomali dan risiko integritas secara proaktif.")
 
 # --- Load Data ---
-df_lhkpn = load_data('data/data_lhkpn.csv')
-df_relasi = load_data('data/data_relasi.csv')
-df_asn = load_data('data/data_asn.csv')
-df_slik = load_data('data/data_slik.csv') # Load the new SLIK data
+# Shared, indexed view of the merged ASN/SLIK table, the batch EWS scores and the LHKPN rows
+with section('ews.load_data'):
+    repo = load_asn_repository()
+    # Shared adjacency index over the relation data
+    relation_index = load_relation_index()
 
-if df_lhkpn.empty or df_relasi.empty or df_asn.empty or df_slik.empty:
+if repo is None or relation_index is None:
     st.warning("Satu atau lebih file data tidak dapat dimuat. Pastikan semua file data ada di direktori 'data/'.")
 else:
-    # Merge ASN and SLIK data for easier access
-    df_asn_merged = pd.merge(df_asn, df_slik, on='id_asn')
-
-    # Create mappings for names
-    asn_id_to_name = df_asn_merged.set_index('id_asn')['nama'].to_dict()
-    asn_name_to_id = df_asn_merged.set_index('nama')['id_asn'].to_dict()
+    risk_table = repo.asn
+    asn_id_to_name = repo.id_to_name
 
     # --- Sidebar for ASN Selection (Combined Filter) ---
     with st.sidebar:
         st.header("Filter ASN")
-        # Get a list of all ASN names available in any of the datasets for EWS
-        lhkpn_ids = set(df_lhkpn['id_asn'].unique())
-        relasi_ids = set(pd.unique(df_relasi[['id_asn_sumber', 'id_asn_target']].values.ravel('K')))
-        combined_ids = sorted(list(lhkpn_ids.union(relasi_ids)))
-        
-        available_names = sorted([asn_id_to_name.get(id) for id in combined_ids if asn_id_to_name.get(id) is not None])
-        
-        selected_name = st.selectbox(
-            "Pilih Nama ASN untuk dianalisis:",
-            options=available_names,
-            key="ews_select"
-        )
-        selected_id = asn_name_to_id[selected_name]
+        # Search index over the ASN available in the LHKPN or relation datasets, built per data version
+        available_index, relasi_ids = load_ews_options()
+
+        selected_id = select_asn(available_index, "Pilih Nama ASN untuk dianalisis:", key="ews_select")
+
+    if selected_id is None:
+        st.info("Tidak ada ASN dengan data LHKPN atau relasi yang dapat dianalisis.")
+        end_rerun()
+        st.stop()
+    selected_name = asn_id_to_name[selected_id]
 
     # --- Tabs for EWS Features ---
-    tab1, tab2, tab3 = st.tabs(["🔍 Deteksi Anomali LHKPN", "🕸️ Analisis Konflik Kepentingan", "💰 Analisis Keuangan & SLIK"])
+    tab_rank, tab1, tab2, tab_cluster, tab3 = st.tabs(["📋 Peringkat Risiko", "🔍 Deteksi Anomali LHKPN", "🕸️ Analisis Konflik Kepentingan", "🧩 Klaster Relasi", "💰 Analisis Keuangan & SLIK"])
+
+    # --- Tab 0: Ranked list of every flagged ASN ---
+    with tab_rank:
+        st.header("Peringkat Risiko Seluruh ASN")
+        # Counts and flagged positions are computed once per repository; only the visible page is sent
+        jumlah_terindikasi = len(repo.flagged_positions)
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("ASN Terindikasi", f"{jumlah_terindikasi} Orang")
+        col2.metric("Anomali LHKPN", f"{repo.ews_counts['anomali_lhkpn']} Orang")
+        col3.metric("Perlu Atensi Keuangan", f"{repo.ews_counts['atensi_keuangan']} Orang")
+
+        if jumlah_terindikasi == 0:
+            st.success("Tidak ada ASN yang terindikasi berisiko.")
+        else:
+            col_page, col_size = st.columns([3, 1])
+            page_size = col_size.selectbox("Baris per halaman:", options=[25, 50, 100], key="ews_page_size")
+            total_pages = -(-jumlah_terindikasi // page_size)
+            page = col_page.number_input("Halaman:", min_value=1, max_value=total_pages, value=1, key="ews_page")
+
+            display_cols = ['nama', 'nip', 'unit_kerja', 'jabatan_sekarang', 'anomali_lhkpn', 'yoy_maks', 'atensi_keuangan', 'jumlah_indikator']
+            display_cols += [c for c in ['risiko_jaringan', 'peringkat_jaringan'] if c in risk_table.columns]
+            with section('ews.risk_table'):
+                page_df = repo.flagged_page(page - 1, page_size)
+                display_df = page_df[display_cols]
+                display_df = display_df.assign(nip=display_df['nip'].astype(str))
+                st.dataframe(display_df, use_container_width=True, hide_index=True)
+            first = (page - 1) * page_size + 1
+            st.caption(f"Menampilkan {first:,}–{first + len(page_df) - 1:,} dari {jumlah_terindikasi:,} ASN (halaman {page} dari {total_pages:,}).")
+
+        # --- Network risk: indicators propagated over the weighted relations ---
+        st.subheader("Peringkat Risiko Jaringan")
+        if repo.network_ranking.empty:
+            st.info("Data relasi tidak tersedia untuk menghitung risiko jaringan.")
+        else:
+            st.markdown("Risiko dari anomali LHKPN dan atensi keuangan disebarkan melalui relasi (bobot sesuai jenis relasi) "
+                        "dengan *personalized PageRank*, sehingga ASN yang dekat dengan banyak ASN berisiko ikut terangkat.")
+            top_network = repo.network_ranking.head(20)
+            top_asn = risk_table.loc[top_network.index]
+            st.dataframe(pd.DataFrame({
+                'Peringkat': top_network['peringkat_jaringan'],
+                'Nama': top_asn['nama'],
+                'NIP': top_asn['nip'].astype(str),
+                'Unit Kerja': top_asn['unit_kerja'],
+                'Risiko Jaringan': top_network['risiko_jaringan'].round(3),
+                'Jumlah Indikator': top_asn['jumlah_indikator']
+            }), use_container_width=True, hide_index=True)
 
     # --- Tab 1: LHKPN Anomaly Detection ---
     with tab1:
         st.header("Deteksi Anomali Laporan Harta Kekayaan (LHKPN)")
 
-        # Filter LHKPN data for the selected ASN
-        df_asn_lhkpn = df_lhkpn[df_lhkpn['id_asn'] == selected_id].sort_values('tahun_lapor')
-
-        if not df_asn_lhkpn.empty:
-            with st.spinner("Menganalisis data LHKPN..."):
-                model = load_anomaly_model()
-                result_df, has_anomaly = analyze_lhkpn_anomaly(model, df_asn_lhkpn.copy())
+        # Read the precomputed LHKPN scores for the selected ASN
+        result_df = repo.get_lhkpn(selected_id)
 
+        if not result_df.empty:
+            has_anomaly = result_df['is_anomaly'].any()
             if has_anomaly:
                 st.warning(f"**Peringatan:** Terdeteksi potensi anomali pada laporan kekayaan {selected_name}.")
 
@@ -101,7 +145,7 @@ else:
 
             with st.expander("Lihat Data Detail dan Hasil Analisis"):
                 # Display only the relevant columns
-                display_cols = ['tahun_lapor', 'total_kekayaan', 'yoy_change', 'is_anomaly']
+                display_cols = ['tahun_lapor', 'total_kekayaan'] + LHKPN_FEATURES + ['is_anomaly']
                 st.dataframe(result_df[display_cols])
         else:
             st.info(f"Tidak ada data LHKPN yang ditemukan untuk {selected_name}.")
@@ -113,19 +157,30 @@ else:
         if selected_id not in relasi_ids:
             st.warning(f"Tidak ditemukan data relasi untuk {selected_name}.")
         else:
-            with st.spinner("Membuat visualisasi jaringan..."):
-                html_file_path = create_network_graph(df_relasi, selected_id, asn_id_to_name)
-            
-            try:
-                with open(html_file_path, 'r', encoding='utf-8') as f:
-                    source_code = f.read()
+            selected_asn = repo.get_asn(selected_id)
+            if selected_asn is not None and 'risiko_jaringan' in selected_asn:
+                col_score, col_rank = st.columns(2)
+                col_score.metric("Risiko Jaringan", f"{selected_asn['risiko_jaringan']:.3f}")
+                col_rank.metric("Peringkat Risiko Jaringan", f"{int(selected_asn['peringkat_jaringan']):,} dari {len(repo.network_ranking):,}")
+
+            # Large ego graphs are drawn at a level of detail: the riskiest neighbours, the rest collapsed per relation type
+            with section('ews.ego_layout'):
+                layout_nodes, _ = load_ego_layout(selected_id)
+            collapsed = layout_nodes[layout_nodes['jenis'] == 'ringkasan'].set_index('tipe_relasi')['jumlah']
+            expanded_types = ()
+            if not collapsed.empty:
+                shown = int((layout_nodes['jenis'] == 'asn').sum())
+                st.caption(f"{selected_name} memiliki {shown + int(collapsed.sum()):,} relasi langsung. Ditampilkan {shown:,} ASN "
+                           f"dengan prioritas risiko tertinggi; sisanya diringkas per jenis relasi.")
+                expanded_types = tuple(st.multiselect(
+                    f"Tampilkan rincian jenis relasi (maksimal {EGO_GRAPH_EXPAND_LIMIT} ASN per jenis):",
+                    options=collapsed.index.tolist(),
+                    format_func=lambda tipe: f"{tipe} ({collapsed[tipe]:,} ASN)",
+                    key="ews_expand_types"
+                ))
+            with st.spinner("Membuat visualisasi jaringan..."), section('ews.network_graph'):
+                source_code = load_network_html(selected_id, expanded_types)
                 components.html(source_code, height=610)
-            except FileNotFoundError:
-                st.error("Gagal membuat file visualisasi jaringan.")
-            finally:
-                # Clean up the temporary file
-                if os.path.exists(html_file_path):
-                    os.remove(html_file_path)
         
         st.info("""
         **Cara Membaca Graf:**
@@ -133,20 +188,122 @@ else:
         - **Node Biru:** Relasi langsung (kolega, teman, dll).
         - **Garis Merah:** Menandakan relasi 'Transaksi Keuangan' (potensi risiko tinggi).
         - **Garis Oranye:** Menandakan relasi 'Keluarga' (potensi konflik kepentingan).
+        - **Kotak Abu-abu:** Relasi yang diringkas per jenis karena jumlahnya besar; tampilkan rinciannya melalui pilihan di atas graf.
         """)
 
+        # --- Multi-hop path search ---
+        st.subheader("Penelusuran Jalur Relasi Multi-Hop")
+        if selected_id in relasi_ids:
+            col_mode, col_hop = st.columns([2, 1])
+            with col_mode:
+                path_mode = st.radio(
+                    "Telusuri jalur menuju:",
+                    options=["ASN terindikasi berisiko", "ASN tertentu"],
+                    horizontal=True
+                )
+            with col_hop:
+                max_hops = st.slider("Maksimum hop", min_value=1, max_value=4, value=2)
+
+            path_edge_types = st.multiselect(
+                "Jenis relasi yang ditelusuri:",
+                options=list(RELATION_RISK_WEIGHTS),
+                default=['Transaksi Keuangan', 'Keluarga']
+            )
+
+            target_id = None
+            if path_mode == "ASN tertentu":
+                # select_asn already explains why nothing can be selected
+                target_id = select_asn(available_index, "Pilih ASN tujuan:", key="ews_path_target")
+
+            if path_mode == "ASN terindikasi berisiko" or target_id is not None:
+                with st.spinner("Menelusuri jalur relasi..."):
+                    if target_id is None:
+                        # The flagged set is derived inside the cached search, so the cache key stays small
+                        paths, complete = search_flagged_relation_paths(selected_id, max_hops, tuple(path_edge_types))
+                    else:
+                        paths, complete = search_relation_paths(selected_id, (target_id,), max_hops, tuple(path_edge_types))
+
+                if not complete:
+                    st.warning("Penelusuran dihentikan karena batas waktu atau jumlah jalur tercapai; hasil mungkin belum lengkap.")
+                if paths.empty:
+                    st.success(f"Tidak ditemukan jalur hingga {max_hops} hop melalui relasi yang dipilih.")
+                else:
+                    display_paths = pd.DataFrame({
+                        'ASN Tujuan': paths['id_asn_tujuan'].map(asn_id_to_name),
+                        'Jumlah Hop': paths['jumlah_hop'],
+                        'Skor Risiko': paths['skor_risiko'].round(3),
+                        'Jalur': [" → ".join(asn_id_to_name.get(i, f"ID: {i}") for i in jalur) for jalur in paths['jalur']],
+                        'Jenis Relasi': [" → ".join(tipe) for tipe in paths['tipe_relasi']]
+                    })
+                    st.dataframe(display_paths, use_container_width=True, hide_index=True)
+
+    # --- Relation clusters: read from the offline stage, aggregated once per data version ---
+    with tab_cluster:
+        st.header("Klaster Relasi ASN")
+        st.markdown(f"ASN dikelompokkan berdasarkan relasi **{' dan '.join(CLUSTER_EDGE_TYPES)}**: komponen terhubung, "
+                    "lalu komunitas di dalamnya dengan *label propagation*.")
+        with section('ews.clusters'):
+            clusters = load_relation_clusters()
+
+        if clusters is None or clusters.summary.empty:
+            st.info("Tidak ada klaster relasi yang dapat dibentuk dari data relasi.")
+        else:
+            summary = clusters.summary
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Jumlah Klaster", f"{len(summary):,}")
+            col2.metric("ASN dalam Klaster", f"{len(clusters.members):,} Orang")
+            col3.metric("Klaster dengan ASN Terindikasi", f"{int((summary['jumlah_terindikasi'] > 0).sum()):,}")
+
+            # Ranked cluster summary, the clusters with the most flagged members first
+            st.subheader("Klaster dengan Anggota Terindikasi Terbanyak")
+            top_clusters = summary.head(20)
+            st.dataframe(pd.DataFrame({
+                'ID Klaster': top_clusters.index,
+                'ID Komponen': top_clusters['id_komponen'],
+                'Jumlah Anggota': top_clusters['jumlah_anggota'],
+                'Anggota Terindikasi': top_clusters['jumlah_terindikasi'],
+                'Anomali LHKPN': top_clusters['jumlah_anomali_lhkpn'],
+                'Atensi Keuangan': top_clusters['jumlah_atensi_keuangan'],
+                'Pertumbuhan Kekayaan (Rp)': top_clusters['pertumbuhan_kekayaan']
+            }), use_container_width=True, hide_index=True)
+
+            # Cluster of the selected ASN
+            st.subheader(f"Klaster {selected_name}")
+            id_klaster = clusters.cluster_of(selected_id)
+            if id_klaster is None:
+                st.info(f"{selected_name} tidak memiliki relasi {' atau '.join(CLUSTER_EDGE_TYPES)} sehingga tidak termasuk klaster mana pun.")
+            else:
+                cluster_row = summary.loc[id_klaster]
+                col1, col2, col3 = st.columns(3)
+                col1.metric("ID Klaster", f"{id_klaster}")
+                col2.metric("Anggota Terindikasi", f"{int(cluster_row['jumlah_terindikasi'])} dari {int(cluster_row['jumlah_anggota'])} Orang")
+                col3.metric("Pertumbuhan Kekayaan Klaster", f"Rp {cluster_row['pertumbuhan_kekayaan']:,.0f}")
+
+                members = clusters.get_members(id_klaster)
+                st.dataframe(pd.DataFrame({
+                    'Nama': members['nama'],
+                    'NIP': members['nip'].astype(str),
+                    'Unit Kerja': members['unit_kerja'],
+                    'Jabatan': members['jabatan_sekarang'],
+                    'Anomali LHKPN': members['anomali_lhkpn'],
+                    'Atensi Keuangan': members['atensi_keuangan'],
+                    'Jumlah Indikator': members['jumlah_indikator'],
+                    'Pertumbuhan Kekayaan (Rp)': members['pertumbuhan_kekayaan']
+                }), use_container_width=True, hide_index=True)
+
     # --- Tab 3: Financial & SLIK Analysis ---
     with tab3:
         st.header("Analisis Kewajaran Hutang dan Riwayat Kredit (SLIK)")
         
         # Get the full data for the selected ASN
-        asn_financial_data = df_asn_merged[df_asn_merged['id_asn'] == selected_id]
+        asn_financial_data = repo.get_asn(selected_id)
         
-        if asn_financial_data.empty:
+        if asn_financial_data is None:
             st.error(f"Data keuangan lengkap untuk {selected_name} tidak ditemukan.")
         else:
-            asn_financial_data = asn_financial_data.iloc[0]
-            atensi, reason = analyze_financial_health(asn_financial_data)
+            # Computed for every ASN by the batch EWS pass
+            atensi = bool(asn_financial_data['atensi_keuangan'])
+            reason = FINANCIAL_REASONS[asn_financial_data['kode_alasan_keuangan']]
             
             # Display the results
             st.subheader(f"Hasil Analisis untuk: {selected_name}")
@@ -164,4 +321,6 @@ else:
             if atensi:
                 st.error(f"🔴 **Status: Perlu Atensi**\n\n**Alasan:** {reason}")
             else:
-                st.success(f"🟢 **Status: Tidak Perlu Atensi**\n\n**Alasan:** {reason}")
\ No newline at end of file
+                st.success(f"🟢 **Status: Tidak Perlu Atensi**\n\n**Alasan:** {reason}")
+
+end_rerun()
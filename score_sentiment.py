@@ -0,0 +1,21 @@
+import argparse
+from utils.data import read_dataset
+from utils.sentiment import SENTIMENT_SCORE_PATH, update_sentiment_scores
+
+def main():
+    """Scores every distinct review text once and stores the results in the persistent score cache."""
+    parser = argparse.ArgumentParser(description="Menghitung skor sentimen seluruh ulasan naratif secara batch.")
+    parser.add_argument('--input', default='data/data_sentimen.csv', help="File data ulasan naratif.")
+    parser.add_argument('--output', default=SENTIMENT_SCORE_PATH, help="File cache skor sentimen (Parquet).")
+    parser.add_argument('--processes', type=int, default=None, help="Jumlah proses worker (default: semua core).")
+    args = parser.parse_args()
+
+    print(f"Membaca ulasan dari {args.input}...")
+    df_sentimen = read_dataset(args.input)
+
+    print("Menghitung skor sentimen untuk teks yang belum ada di cache...")
+    new_count = update_sentiment_scores(df_sentimen, args.output, processes=args.processes)
+    print(f"{new_count} teks unik baru dinilai dan disimpan ke {args.output}.")
+
+if __name__ == '__main__':
+    main()
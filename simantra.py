@@ -0,0 +1,66 @@
+import argparse
+import time
+from utils.batch import SCORE_CHUNK_SIZE, SCORE_OUTPUT_PATH, read_batch_datasets, score_all_asn, write_scores
+from utils.kpi import KPI_PATH, load_home_kpis
+from utils.models import load_anomaly_model, load_classification_model
+
+def score(args) -> None:
+    """Scores every ASN (or the given ids) without Streamlit and writes a single score table."""
+    print(f"Membaca dataset dari {args.data_dir}/...")
+    datasets = read_batch_datasets(args.data_dir)
+
+    # The same models the app loads: the latest artifacts, or the seeded in-process models
+    print("Memuat model...")
+    classifier = load_classification_model()
+    anomaly_model = load_anomaly_model()
+
+    print("Menilai talent pool, anomali LHKPN, kesehatan keuangan dan sentimen...")
+    start = time.perf_counter()
+    scored = score_all_asn(classifier, anomaly_model, datasets, ids=None if args.all else args.id,
+                           processes=args.workers, chunk_size=args.chunk_size)
+    write_scores(scored, args.output)
+    print(f"{len(scored)} ASN dinilai dalam {time.perf_counter() - start:.1f} detik dan disimpan ke {args.output}.")
+
+def kpi(args) -> None:
+    """Precomputes the Home page KPI counts, so the first Home render of every worker skips the models."""
+    counts = load_home_kpis()
+    if counts is None:
+        raise SystemExit("Data ASN tidak dapat dimuat; KPI tidak dihitung.")
+    print(f"KPI halaman Home disimpan ke {KPI_PATH}: {counts}")
+
+def serve(args) -> None:
+    """Serves the per-ASN answers over HTTP until interrupted."""
+    # Imported here so `score` does not load the API
+    from utils.api import run_api
+    run_api(args.host, args.port, max_batch_size=args.batch_size, max_batch_wait=args.batch_wait / 1000)
+
+def main():
+    """Command line entry point of the headless SIMANTRA analytics."""
+    parser = argparse.ArgumentParser(prog='simantra', description="Analitik SIMANTRA tanpa server web.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    score_parser = commands.add_parser('score', help="Menilai ASN secara batch dan menyimpan satu tabel skor.")
+    target = score_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--all', action='store_true', help="Nilai seluruh ASN.")
+    target.add_argument('--id', type=int, nargs='+', help="Nilai hanya ASN dengan id_asn berikut.")
+    score_parser.add_argument('--data-dir', default='data', help="Direktori dataset (data_asn.csv, data_slik.csv, dst.).")
+    score_parser.add_argument('--output', default=SCORE_OUTPUT_PATH, help="File tabel skor (.parquet atau .csv).")
+    score_parser.add_argument('--workers', type=int, default=None, help="Jumlah proses worker (default: semua core).")
+    score_parser.add_argument('--chunk-size', type=int, default=SCORE_CHUNK_SIZE, help="Jumlah ASN per tugas worker.")
+    score_parser.set_defaults(handler=score)
+
+    kpi_parser = commands.add_parser('kpi', help="Menghitung KPI halaman Home untuk data dan model saat ini.")
+    kpi_parser.set_defaults(handler=kpi)
+
+    serve_parser = commands.add_parser('serve', help="Menjalankan API penilaian per ASN di localhost.")
+    serve_parser.add_argument('--host', default='127.0.0.1', help="Alamat yang didengarkan (default: hanya localhost).")
+    serve_parser.add_argument('--port', type=int, default=8765, help="Port HTTP.")
+    serve_parser.add_argument('--batch-size', type=int, default=256, help="Jumlah permintaan maksimum per micro-batch model.")
+    serve_parser.add_argument('--batch-wait', type=float, default=2.0, help="Waktu tunggu maksimum sebuah micro-batch, dalam milidetik.")
+    serve_parser.set_defaults(handler=serve)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+if __name__ == '__main__':
+    main()
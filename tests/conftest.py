@@ -0,0 +1,7 @@
+"""Runs the tests against the repository root, where the utils package and data/ live."""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
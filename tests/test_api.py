@@ -0,0 +1,109 @@
+"""Scoring API over a real localhost socket: per-ASN answers, micro-batched predictions and error statuses."""
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+
+from utils.api import MAX_BODY_SIZE, ScoringService
+from utils.data import load_data
+from utils.models import assign_talent_pools, detect_lhkpn_anomalies, load_anomaly_model, load_classification_model
+
+async def _request(port, method, path, body=None, headers=None):
+    """Sends one request on a new connection; returns the status and the raw body."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    data = body if isinstance(body, bytes) else json.dumps(body).encode() if body is not None else b''
+    headers = {'Content-Length': str(len(data)), **(headers or {})}
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n".encode()
+        + ''.join(f'{name}: {value}\r\n' for name, value in headers.items()).encode() + b'\r\n' + data
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    response_headers = {}
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode().partition(':')
+        response_headers[name.strip().lower()] = value.strip()
+    payload = await reader.readexactly(int(response_headers['content-length']))
+    writer.close()
+    return status, payload
+
+def _serve(scenario):
+    """Runs `scenario(port)` against a service listening on a free localhost port."""
+    async def main():
+        service = ScoringService(max_batch_wait=0.01)
+        server = await service.start('127.0.0.1', 0)
+        try:
+            return await scenario(server.sockets[0].getsockname()[1])
+        finally:
+            server.close()
+            service.close()
+    return asyncio.run(main())
+
+def test_asn_profile():
+    async def scenario(port):
+        return await _request(port, 'GET', '/asn/1')
+    status, payload = _serve(scenario)
+    profile = json.loads(payload)
+    asn = load_data('data/data_asn.csv').set_index('id_asn').loc[1]
+    assert status == 200
+    assert (profile['id_asn'], profile['nama'], profile['nip']) == (1, asn['nama'], str(asn['nip']))
+    assert set(profile['ews']) == {'atensi_keuangan', 'alasan_keuangan', 'anomali_lhkpn', 'jumlah_indikator', 'risiko_jaringan'}
+
+def test_concurrent_predictions_match_offline_scoring():
+    df_asn = load_data('data/data_asn.csv')
+    df_lhkpn = load_data('data/data_lhkpn.csv')
+    pairs = [(float(k), float(p)) for k, p in df_asn[['kinerja_2023', 'potensi']].to_numpy()]
+    ids = df_asn['id_asn'].tolist()
+    profiles = df_asn.set_index('id_asn')[['pangkat_gol', 'unit_kerja', 'gaji_bulanan', 'lama_bekerja_thn']]
+
+    async def scenario(port):
+        talent_pool = [
+            _request(port, 'POST', '/prediksi/talent-pool', {'kinerja_2023': k, 'potensi': p}) for k, p in pairs
+        ]
+        lhkpn = [
+            _request(port, 'POST', '/prediksi/lhkpn', {
+                'laporan': df_lhkpn.loc[df_lhkpn['id_asn'] == id_asn, ['tahun_lapor', 'total_kekayaan']].to_dict('records'),
+                'profil': profiles.loc[id_asn].to_dict()
+            }) for id_asn in ids
+        ]
+        responses = await asyncio.gather(*talent_pool, *lhkpn)
+        metrics = await _request(port, 'GET', '/metrics')
+        return responses[:len(pairs)], responses[len(pairs):], metrics
+
+    talent_pool, lhkpn, (metrics_status, metrics) = _serve(scenario)
+
+    expected_pools = list(assign_talent_pools(load_classification_model(), pd.DataFrame(pairs, columns=['kinerja_2023', 'potensi'])))
+    assert [status for status, _ in talent_pool] == [200] * len(pairs)
+    assert [json.loads(payload)['talent_pool'] for _, payload in talent_pool] == expected_pools
+
+    # With the profile, a posted history is scored like the same ASN in the full offline pass
+    expected = detect_lhkpn_anomalies(load_anomaly_model(), df_lhkpn, df_asn).groupby('id_asn')['is_anomaly'].apply(list)
+    assert [status for status, _ in lhkpn] == [200] * len(ids)
+    flags = [[row['is_anomaly'] for row in json.loads(payload)['laporan']] for _, payload in lhkpn]
+    assert flags == [expected.get(id_asn, []) for id_asn in ids]
+
+    metrics = metrics.decode()
+    assert metrics_status == 200
+    for endpoint in ('prediksi_talent_pool', 'prediksi_lhkpn'):
+        assert f'endpoint="{endpoint}",quantile="0.99"' in metrics
+    # Concurrent requests were scored together
+    assert 'simantra_api_batch_size{model="talent_pool",quantile="0.99"}' in metrics
+
+@pytest.mark.parametrize('method, path, body, headers, status', [
+    ('GET', '/asn/999999999', None, None, 404),
+    ('GET', '/tidak-ada', None, None, 404),
+    ('GET', '/asn/abc', None, None, 400),
+    ('POST', '/prediksi/talent-pool', b'{bukan json', None, 400),
+    ('POST', '/prediksi/talent-pool', {'kinerja_2023': 80}, None, 400),
+    ('POST', '/prediksi/lhkpn', {'laporan': [{'tahun_lapor': 2020}]}, None, 400),
+    ('POST', '/prediksi/lhkpn', {'laporan': [], 'profil': {'pangkat_gol': 'III/a'}}, None, 400),
+    ('POST', '/prediksi/talent-pool', b'', {'Content-Length': '-1'}, 400),
+    ('POST', '/prediksi/talent-pool', b'', {'Content-Length': str(MAX_BODY_SIZE + 1)}, 413),
+])
+def test_error_statuses(method, path, body, headers, status):
+    async def scenario(port):
+        return await _request(port, method, path, body, headers)
+    response_status, payload = _serve(scenario)
+    assert response_status == status
+    assert 'galat' in json.loads(payload)
@@ -0,0 +1,14 @@
+"""Network rendering: the generated page must not reference any file outside itself."""
+import re
+
+from utils.data import load_data
+from utils.graph import create_network_graph, load_relation_index
+
+def test_network_html_has_no_external_assets():
+    df_asn = load_data('data/data_asn.csv')
+    source_id = int(load_data('data/data_relasi.csv')['id_asn_sumber'].iloc[0])
+    html = create_network_graph(load_relation_index(), source_id, dict(zip(df_asn['id_asn'], df_asn['nama'])))
+    assert re.search(r'<link\b[^>]*\shref\s*=', html, re.IGNORECASE) is None
+    assert re.search(r'<script\b[^>]*\ssrc\s*=', html, re.IGNORECASE) is None
+    # The inlined bundle still draws the graph
+    assert 'new vis.Network' in html
@@ -0,0 +1,28 @@
+"""Incremental LHKPN ledger: appended runs must match a full rescore, and empty runs must not touch it."""
+import os
+
+import pandas as pd
+
+from utils.data import load_data
+from utils.models import LHKPN_LEDGER_INFO, detect_lhkpn_anomalies, read_lhkpn_ledger, train_anomaly_model, update_lhkpn_ledger
+
+def test_incremental_runs_and_noop(tmp_path):
+    df_lhkpn = load_data('data/data_lhkpn.csv')
+    df_asn = load_data('data/data_asn.csv')
+    model = train_anomaly_model(df_lhkpn=df_lhkpn, df_asn=df_asn)
+    ledger_dir = str(tmp_path)
+    last_year = int(df_lhkpn['tahun_lapor'].max())
+
+    assert update_lhkpn_ledger(model, df_lhkpn[df_lhkpn['tahun_lapor'] < last_year], 1, df_asn, ledger_dir=ledger_dir) > 0
+    assert update_lhkpn_ledger(model, df_lhkpn, 1, df_asn, ledger_dir=ledger_dir) == (df_lhkpn['tahun_lapor'] == last_year).sum()
+    # Growth features come from the stored history; peer baselines are per run, so they are not compared
+    ledger, _ = read_lhkpn_ledger(1, ledger_dir=ledger_dir)
+    full = detect_lhkpn_anomalies(model, df_lhkpn, df_asn)
+    growth = ['id_asn', 'tahun_lapor', 'yoy_change', 'cagr_2_tahun', 'cagr_3_tahun']
+    ordered = [frame[growth].astype({'tahun_lapor': 'int64'}).sort_values(['id_asn', 'tahun_lapor']).reset_index(drop=True) for frame in (ledger, full)]
+    pd.testing.assert_frame_equal(*ordered, check_dtype=False)
+
+    info_path = os.path.join(ledger_dir, LHKPN_LEDGER_INFO)
+    before = (sorted(os.listdir(ledger_dir)), os.stat(info_path).st_mtime_ns)
+    assert update_lhkpn_ledger(model, df_lhkpn, 1, df_asn, ledger_dir=ledger_dir) == 0
+    assert (sorted(os.listdir(ledger_dir)), os.stat(info_path).st_mtime_ns) == before
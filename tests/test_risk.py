@@ -0,0 +1,40 @@
+"""Financial-health rules: the single-ASN path must agree with the batch pass behind the risk table."""
+import itertools
+
+import pandas as pd
+import pytest
+
+from utils.risk import FINANCIAL_DEBT_RATIO_LIMIT, FINANCIAL_HIGH_SALARY, FINANCIAL_REASONS, analyze_financial_health, \
+    analyze_financial_health_batch
+
+# Salaries and debts on and around both thresholds, plus the zero-salary edge case
+SALARIES = [0, 5_000_000, FINANCIAL_HIGH_SALARY, FINANCIAL_HIGH_SALARY + 1, 20_000_000]
+DEBT_RATIOS = [0, 1.0, FINANCIAL_DEBT_RATIO_LIMIT, FINANCIAL_DEBT_RATIO_LIMIT + 0.01, 20.0]
+SLIK_FLAGS = [True, False, 'Y', 'N']
+
+def _rows():
+    for gaji, ratio, flag in itertools.product(SALARIES, DEBT_RATIOS, SLIK_FLAGS):
+        hutang = ratio * gaji * 12 if gaji else ratio * 1_000_000_000
+        yield {'gaji_bulanan': gaji, 'total_hutang': hutang, 'kualitas_debitur_buruk': flag}
+
+def test_scalar_matches_batch():
+    # Missing salaries and debts must be treated alike on both paths
+    missing = [{'gaji_bulanan': gaji, 'total_hutang': hutang, 'kualitas_debitur_buruk': 'Y'}
+               for gaji, hutang in [(float('nan'), 1e9), (10_000_000, float('nan')), (float('nan'), float('nan'))]]
+    df = pd.DataFrame(list(_rows()) + missing)
+    batch = analyze_financial_health_batch(df)
+    for i, row in df.iterrows():
+        expected = (bool(batch.at[i, 'atensi']), FINANCIAL_REASONS[batch.at[i, 'kode_alasan']])
+        assert analyze_financial_health(row) == expected, row.to_dict()
+
+@pytest.mark.parametrize('row, atensi, kode', [
+    ({'gaji_bulanan': 5_000_000, 'total_hutang': 500_000_000, 'kualitas_debitur_buruk': 'Y'}, True, 'gaji_rendah_hutang_besar'),
+    ({'gaji_bulanan': 10_000_000, 'total_hutang': 1_000_000_000, 'kualitas_debitur_buruk': True}, True, 'hutang_besar'),
+    ({'gaji_bulanan': 10_000_000, 'total_hutang': 0, 'kualitas_debitur_buruk': 'Y'}, True, 'slik_buruk'),
+    ({'gaji_bulanan': 10_000_000, 'total_hutang': 1_000_000_000, 'kualitas_debitur_buruk': 'N'}, False, 'wajar'),
+])
+def test_reasons(row, atensi, kode):
+    assert analyze_financial_health(pd.Series(row)) == (atensi, FINANCIAL_REASONS[kode])
+
+def test_missing_data():
+    assert analyze_financial_health(pd.Series(dtype=object)) == (False, "Data keuangan tidak ditemukan.")
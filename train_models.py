@@ -0,0 +1,20 @@
+import argparse
+from utils.models import MODEL_DIR, MODEL_TRAINERS, save_model_artifact
+
+def main():
+    """Trains every model offline and saves each one as a new versioned artifact."""
+    parser = argparse.ArgumentParser(description="Melatih model SIMANTRA dan menyimpannya sebagai artefak berversi.")
+    parser.add_argument('--seed', type=int, default=42, help="Seed untuk data latih dan model.")
+    parser.add_argument('--model-dir', default=MODEL_DIR, help="Direktori tujuan artefak model.")
+    args = parser.parse_args()
+
+    for name, train in MODEL_TRAINERS.items():
+        print(f"Melatih model '{name}'...")
+        model = train(seed=args.seed)
+        artifact_path = save_model_artifact(model, name, {'seed': args.seed}, model_dir=args.model_dir)
+        print(f"- Disimpan ke {artifact_path}")
+
+    print("\nSemua model berhasil dilatih. Server Streamlit akan memuat versi terbaru pada rerun berikutnya.")
+
+if __name__ == '__main__':
+    main()
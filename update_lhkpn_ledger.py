@@ -0,0 +1,36 @@
+import argparse
+from utils.data import read_dataset
+from utils.models import ANOMALY_MODEL, LHKPN_LEDGER_DIR, anomaly_training_version, latest_model_version, load_anomaly_model, update_lhkpn_ledger
+
+def main():
+    """Scores only the LHKPN reports filed since the last run and appends them to the anomaly ledger."""
+    parser = argparse.ArgumentParser(description="Memperbarui ledger anomali LHKPN secara inkremental.")
+    parser.add_argument('--input', default='data/data_lhkpn.csv', help="File LHKPN berisi laporan baru (boleh berisi riwayat lengkap).")
+    parser.add_argument('--asn', default='data/data_asn.csv', help="File data ASN untuk baseline kelompok pangkat/unit dan gaji.")
+    parser.add_argument('--ledger-dir', default=LHKPN_LEDGER_DIR, help="Direktori ledger anomali LHKPN.")
+    parser.add_argument('--rebuild', action='store_true', help="Bangun ulang ledger dari awal.")
+    args = parser.parse_args()
+
+    # The same model the app loads: the latest artifact, or the in-process model fitted on the
+    # app's training data (not --input), recorded with its data version in the ledger
+    model_version = latest_model_version(ANOMALY_MODEL)
+    # The in-process model changes with its training data, which would rebuild the ledger on
+    # every data rewrite; only an explicit rebuild may use it
+    if model_version is None and not args.rebuild:
+        parser.error("Belum ada artefak model anomali. Jalankan 'python train_models.py' terlebih dahulu, "
+                     "atau gunakan --rebuild untuk membangun ledger dengan model yang dilatih di dalam proses.")
+    model = load_anomaly_model()
+
+    print(f"Membaca laporan LHKPN dari {args.input}...")
+    df_lhkpn = read_dataset(args.input)
+    df_asn = read_dataset(args.asn)
+
+    print("Menilai laporan yang belum ada di ledger...")
+    new_count = update_lhkpn_ledger(
+        model, df_lhkpn, model_version, df_asn, ledger_dir=args.ledger_dir, rebuild=args.rebuild,
+        training_data=anomaly_training_version(model_version)
+    )
+    print(f"{new_count} laporan baru dinilai dan ditambahkan ke {args.ledger_dir}.")
+
+if __name__ == '__main__':
+    main()
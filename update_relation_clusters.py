@@ -0,0 +1,22 @@
+import argparse
+from utils.clusters import CLUSTER_DIR, CLUSTER_EDGE_TYPES, update_relation_clusters
+from utils.data import data_version, read_dataset
+from utils.graph import RelationIndex
+
+def main():
+    """Detects the relation clusters offline and writes the membership table the EWS page reads."""
+    parser = argparse.ArgumentParser(description="Mendeteksi klaster relasi ASN dan menyimpan keanggotaannya.")
+    parser.add_argument('--input', default='data/data_relasi.csv', help="File data relasi antar ASN.")
+    parser.add_argument('--edge-types', nargs='+', default=list(CLUSTER_EDGE_TYPES), help="Jenis relasi yang membentuk klaster.")
+    parser.add_argument('--cluster-dir', default=CLUSTER_DIR, help="Direktori keluaran keanggotaan klaster.")
+    args = parser.parse_args()
+
+    print(f"Membaca data relasi dari {args.input}...")
+    relation_index = RelationIndex(read_dataset(args.input))
+
+    print(f"Mendeteksi klaster atas relasi {', '.join(args.edge_types)}...")
+    membership = update_relation_clusters(relation_index, data_version(args.input), tuple(args.edge_types), cluster_dir=args.cluster_dir)
+    print(f"{membership['id_klaster'].nunique()} klaster dengan {len(membership)} anggota disimpan ke {args.cluster_dir}.")
+
+if __name__ == '__main__':
+    main()
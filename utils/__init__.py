@@ -0,0 +1,97 @@
+"""
+Shared helpers of the SIMANTRA pages, split into submodules that are imported on first use:
+
+- `utils.data`: typed dataset loading and data versioning
+- `utils.models`: model training, versioned artifacts and LHKPN anomaly scoring
+- `utils.sentiment`: VADER scoring of the narrative reviews
+- `utils.plots`: Plotly figures
+- `utils.search`: prefix/trigram search over ASN names and NIPs
+- `utils.graph`: relation index, path search and network rendering (no dependency on the risk scores)
+- `utils.risk`: batch EWS scoring, risk-prioritized graph views and the indexed ASN repository
+- `utils.clusters`: relation cluster detection and cluster aggregates
+- `utils.kpi`: precomputed Home page KPI counts
+- `utils.instrumentation`: opt-in timings and cache statistics
+- `utils.runtime`: caches and error reporting that work with or without Streamlit
+- `utils.batch`: headless batch scoring of every ASN in worker processes
+- `utils.api`: local HTTP scoring API with micro-batched model calls
+
+Pages import from the submodule they need, so the Home page never pays for pyvis,
+Plotly or VADER. `from utils import name` keeps working and loads only the submodule
+that defines `name`. Only the page widgets import Streamlit, so batch jobs run the same
+analytics without it.
+"""
+import importlib
+
+SUBMODULES = ('instrumentation', 'runtime', 'data', 'models', 'sentiment', 'plots', 'search', 'graph', 'risk', 'clusters', 'kpi', 'batch', 'api')
+
+# Public name -> submodule defining it
+_EXPORTS = {
+    'instrumentation': [
+        'INSTRUMENTATION_ENABLED', 'METRICS_PATH', 'instrumentation_logger', 'section', 'timed', 'count_cache_miss',
+        'begin_rerun', 'end_rerun', 'rerun_summary', 'write_prometheus_metrics'
+    ],
+    'runtime': ['runtime_logger', 'cache_data', 'cache_resource', 'report_error'],
+    'data': [
+        'DATASET_SCHEMAS', 'read_csv_typed', 'convert_dataset', 'convert_all_datasets', 'read_dataset',
+        'file_signature', 'data_version', 'data_versions', 'load_data'
+    ],
+    'models': [
+        'MODEL_DIR', 'CLASSIFICATION_MODEL', 'ANOMALY_MODEL', 'MODEL_TRAINERS',
+        'train_classification_model', 'train_anomaly_model', 'latest_model_version',
+        'save_model_artifact', 'load_model_artifact', 'load_classification_model', 'anomaly_training_version', 'load_anomaly_model',
+        'ANOMALY_TRAINING_SOURCES', 'LHKPN_FEATURES', 'LHKPN_CAGR_WINDOWS', 'LHKPN_PEER_GROUPS', 'build_lhkpn_features',
+        'lhkpn_peer_statistics', 'load_lhkpn_peer_statistics',
+        'TALENT_POOL_LABELS', 'TALENT_POOL_FEATURES', 'TALENT_POOL_SOURCES', 'TALENT_DENSITY_BINS', 'TALENT_TABLE_FILTERS',
+        'TALENT_TABLE_SORT_COLUMNS', 'assign_talent_pools', 'TalentPoolTable', 'load_talent_pools', 'load_talent_density',
+        'load_talent_table_rows', 'get_talent_pool_prediction', 'promotion_metrics', 'flag_lhkpn_anomalies', 'detect_lhkpn_anomalies', 'analyze_lhkpn_anomaly',
+        'LHKPN_LEDGER_DIR', 'LHKPN_LEDGER_INFO', 'LHKPN_LEDGER_FORMAT', 'LHKPN_LEDGER_COLUMNS', 'empty_lhkpn_state',
+        'score_new_lhkpn_reports', 'read_lhkpn_ledger_info', 'read_lhkpn_ledger', 'update_lhkpn_ledger'
+    ],
+    'sentiment': [
+        'SENTIMENT_SCORE_PATH', 'analyze_sentiment', 'load_sentiment_analyzer', 'sentiment_labels',
+        'text_hash', 'score_texts', 'read_sentiment_scores', 'score_reviews', 'update_sentiment_scores',
+        'aggregate_sentiment'
+    ],
+    'plots': ['TALENT_SCATTER_POINT_LIMIT', 'TALENT_POOL_COLORS', 'create_career_matrix_plot', 'create_talent_density_plot'],
+    'search': ['SEARCH_LIMIT', 'NameSearchIndex', 'select_asn'],
+    'graph': [
+        'RELATION_RISK_WEIGHTS', 'NETWORK_RISK_DAMPING', 'RelationIndex', 'load_relation_index', 'search_relation_paths',
+        'EGO_GRAPH_NODE_LIMIT', 'EGO_GRAPH_EXPAND_LIMIT', 'build_ego_layout', 'create_network_graph'
+    ],
+    'risk': [
+        'FINANCIAL_REASONS', 'FINANCIAL_HIGH_SALARY', 'FINANCIAL_DEBT_RATIO_LIMIT', 'analyze_financial_health_batch', 'analyze_financial_health',
+        'build_risk_table', 'RISK_TABLE_SOURCES', 'load_risk_table', 'NETWORK_RISK_SOURCES', 'build_network_risk',
+        'load_network_risk', 'ASNRepository',
+        'ASN_REPOSITORY_SOURCES', 'load_asn_repository', 'EWS_OPTIONS_SOURCES', 'load_ews_options', 'ledger_version',
+        'search_flagged_relation_paths', 'load_ego_layout', 'load_network_html'
+    ],
+    'clusters': [
+        'CLUSTER_EDGE_TYPES', 'CLUSTER_DIR', 'CLUSTER_MEMBERSHIP', 'CLUSTER_INFO', 'CLUSTER_MEMBER_COLUMNS',
+        'detect_relation_clusters', 'read_relation_clusters', 'update_relation_clusters', 'wealth_growth',
+        'summarize_clusters', 'RelationClusters', 'load_relation_clusters'
+    ],
+    'kpi': ['KPI_PATH', 'KPI_SOURCES', 'kpi_version', 'read_kpi_counts', 'compute_kpi_counts', 'write_kpi_counts', 'load_home_kpis'],
+    'batch': [
+        'BATCH_DATASETS', 'SCORE_OUTPUT_PATH', 'SCORE_CHUNK_SIZE', 'SCORE_COLUMNS', 'read_batch_datasets',
+        'score_asn_chunk', 'score_all_asn', 'write_scores'
+    ],
+    'api': [
+        'API_HOST', 'API_PORT', 'BATCH_MAX_SIZE', 'BATCH_MAX_WAIT', 'METRICS_WINDOW', 'MicroBatcher',
+        'LatencyMetrics', 'ApiError', 'ScoringService', 'run_api'
+    ]
+}
+_NAME_TO_MODULE = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_NAME_TO_MODULE)
+
+def __getattr__(name: str):
+    module = _NAME_TO_MODULE.get(name)
+    if module is None:
+        raise AttributeError(f"module 'utils' has no attribute '{name}'")
+    value = getattr(importlib.import_module(f'utils.{module}'), name)
+    # Later lookups hit the package namespace directly
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
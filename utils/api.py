@@ -0,0 +1,401 @@
+"""Local HTTP scoring API: the per-ASN answers of the Profil Talenta page, with micro-batched model calls."""
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.models import TALENT_POOL_FEATURES, assign_talent_pools, build_lhkpn_features, flag_lhkpn_anomalies, \
+    load_anomaly_model, load_classification_model, load_lhkpn_peer_statistics, load_talent_pools, promotion_metrics
+from utils.risk import FINANCIAL_REASONS, load_asn_repository
+from utils.runtime import runtime_logger
+
+# --- Micro-Batching ---
+
+# Localhost only by default: the API has no authentication
+API_HOST = '127.0.0.1'
+API_PORT = 8765
+# A micro-batch is closed when it is full or this many seconds after its first request
+BATCH_MAX_SIZE = 256
+BATCH_MAX_WAIT = 0.002
+# Latest observations kept per metric for the percentiles
+METRICS_WINDOW = 10_000
+# Larger request bodies are refused with 413 without being read
+MAX_BODY_SIZE = 1 << 20
+_REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large', 500: 'Internal Server Error',
+    503: 'Service Unavailable'
+}
+
+class ApiError(Exception):
+    """A request the API answers with an HTTP error status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class MicroBatcher:
+    """
+    Collects concurrent single-item requests into one call of `batch_function`, which takes a
+    list of items and returns their results in the same order. A batch is closed when it holds
+    `max_size` items or `max_wait` seconds after its first item, and runs in a worker thread so
+    the event loop keeps accepting requests; those form the next batch. Closing the batcher
+    fails every request still waiting with a 503 ApiError.
+    """
+
+    def __init__(self, batch_function: Callable[[List[Any]], List[Any]], max_size: int = BATCH_MAX_SIZE,
+                 max_wait: float = BATCH_MAX_WAIT):
+        self.batch_function = batch_function
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self.batch_sizes = deque(maxlen=METRICS_WINDOW)
+        self._queue = None
+        self._task = None
+        self._running = []
+        self._closed = False
+
+    async def submit(self, item: Any) -> Any:
+        """Queues one item and waits for its result."""
+        if self._closed:
+            raise ApiError(503, "Server sedang dihentikan.")
+        loop = asyncio.get_running_loop()
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+        future = loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    async def _next_batch(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            self.batch_sizes.append(len(batch))
+            self._running = batch
+            try:
+                results = await loop.run_in_executor(None, self.batch_function, [item for item, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def close(self) -> None:
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        # The batch being scored and the queued requests would otherwise wait forever
+        waiting = list(self._running)
+        while self._queue is not None and not self._queue.empty():
+            waiting.append(self._queue.get_nowait())
+        for _, future in waiting:
+            if not future.done():
+                future.set_exception(ApiError(503, "Server sedang dihentikan."))
+
+# --- Latency Metrics ---
+
+class LatencyMetrics:
+    """Request latencies per endpoint: totals since start and p50/p99 over the latest METRICS_WINDOW requests."""
+
+    def __init__(self):
+        self._latest: Dict[str, deque] = {}
+        self._count: Dict[str, int] = {}
+        self._sum: Dict[str, float] = {}
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        self._latest.setdefault(endpoint, deque(maxlen=METRICS_WINDOW)).append(seconds)
+        self._count[endpoint] = self._count.get(endpoint, 0) + 1
+        self._sum[endpoint] = self._sum.get(endpoint, 0.0) + seconds
+
+    def percentiles(self, endpoint: str) -> Tuple[float, float]:
+        """p50 and p99 latency of an endpoint in seconds."""
+        p50, p99 = np.percentile(np.fromiter(self._latest[endpoint], dtype=float), [50, 99])
+        return float(p50), float(p99)
+
+    def prometheus_lines(self) -> List[str]:
+        """The latencies as a Prometheus summary, in the format of `write_prometheus_metrics`."""
+        lines = [
+            '# HELP simantra_api_request_seconds Latency of the scoring API requests.',
+            '# TYPE simantra_api_request_seconds summary'
+        ]
+        for endpoint in sorted(self._latest):
+            p50, p99 = self.percentiles(endpoint)
+            lines += [
+                f'simantra_api_request_seconds{{endpoint="{endpoint}",quantile="0.5"}} {p50:.6f}',
+                f'simantra_api_request_seconds{{endpoint="{endpoint}",quantile="0.99"}} {p99:.6f}',
+                f'simantra_api_request_seconds_sum{{endpoint="{endpoint}"}} {self._sum[endpoint]:.6f}',
+                f'simantra_api_request_seconds_count{{endpoint="{endpoint}"}} {self._count[endpoint]}'
+            ]
+        return lines
+
+# --- Scoring Service ---
+
+# Optional ASN profile of a posted LHKPN history, as in data_asn.csv; it enables the peer and salary features
+LHKPN_PROFILE_FIELDS = {'pangkat_gol': str, 'unit_kerja': str, 'gaji_bulanan': float, 'lama_bekerja_thn': float}
+
+def _json_value(value: Any) -> Any:
+    """Plain JSON value of a table cell: NumPy scalars unwrapped, missing values as null."""
+    if value is None or (isinstance(value, float) and np.isnan(value)) or value is pd.NA:
+        return None
+    return value.item() if isinstance(value, np.generic) else value
+
+class ScoringService:
+    """
+    Answers per-ASN requests over HTTP on localhost:
+
+    - `GET /asn/<id_asn>`: talent pool, promotion metrics, EWS status and sentiment of an ASN,
+      read from the shared precomputed tables (no model call)
+    - `POST /prediksi/talent-pool` with `{"kinerja_2023": .., "potensi": ..}`: talent pool of a
+      score pair, classified in micro-batches
+    - `POST /prediksi/lhkpn` with `{"laporan": [{"tahun_lapor": .., "total_kekayaan": ..}, ..]}`:
+      anomaly flags of a report history, scored in micro-batches. With an optional `"profil"`
+      holding the LHKPN_PROFILE_FIELDS, the peer features compare the history with the reports of
+      all ASN of the same rank or unit and year, and the salary feature is computed; without
+      it those features are left empty and only the growth features reach the model.
+    - `GET /metrics`: p50/p99 latency per endpoint and micro-batch sizes, Prometheus text format
+    - `GET /health`
+
+    Unexpected failures are logged and answered with status 500 instead of dropping the connection.
+    """
+
+    def __init__(self, max_batch_size: int = BATCH_MAX_SIZE, max_batch_wait: float = BATCH_MAX_WAIT):
+        self.classifier = load_classification_model()
+        self.anomaly_model = load_anomaly_model()
+        self.talent_pool_batcher = MicroBatcher(self._classify_batch, max_batch_size, max_batch_wait)
+        self.lhkpn_batcher = MicroBatcher(self._score_lhkpn_batch, max_batch_size, max_batch_wait)
+        self.metrics = LatencyMetrics()
+        # Build the shared tables before the first request instead of during it
+        load_asn_repository()
+        load_talent_pools()
+        load_lhkpn_peer_statistics()
+
+    # --- Handlers ---
+
+    def profile(self, id_asn: int) -> Dict[str, Any]:
+        """What the Profil Talenta page shows for one ASN, from the cached tables of the current data version."""
+        repo = load_asn_repository()
+        asn = repo.get_asn(id_asn) if repo is not None else None
+        if asn is None:
+            raise ApiError(404, f"ASN dengan id_asn {id_asn} tidak ditemukan.")
+        talent_pools = load_talent_pools()
+        prob_promosi, syarat_promosi = promotion_metrics(id_asn, asn['potensi'], asn['kinerja_2023'])
+        return {
+            'id_asn': id_asn,
+            'nama': asn['nama'],
+            'nip': str(asn['nip']),
+            'jabatan_sekarang': asn['jabatan_sekarang'],
+            'unit_kerja': asn['unit_kerja'],
+            'talent_pool': talent_pools.get_pool(id_asn) if talent_pools is not None else 'N/A',
+            'probabilitas_promosi': prob_promosi,
+            'pemenuhan_syarat_promosi': syarat_promosi,
+            'ews': {
+                'atensi_keuangan': bool(asn['atensi_keuangan']),
+                'alasan_keuangan': FINANCIAL_REASONS[asn['kode_alasan_keuangan']],
+                'anomali_lhkpn': bool(asn['anomali_lhkpn']),
+                'jumlah_indikator': int(asn['jumlah_indikator']),
+                'risiko_jaringan': _json_value(asn.get('risiko_jaringan'))
+            },
+            'sentimen': {
+                'skor': _json_value(asn['skor_sentimen']),
+                'label': _json_value(asn['sentimen']),
+                'jumlah_ulasan': int(asn['jumlah_ulasan'])
+            }
+        }
+
+    def _classify_batch(self, items: List[Tuple[float, float]]) -> List[str]:
+        """One classifier call for the score pairs of a micro-batch."""
+        return list(assign_talent_pools(self.classifier, pd.DataFrame(items, columns=TALENT_POOL_FEATURES)))
+
+    def _score_lhkpn_batch(self, items: List[Tuple[pd.DataFrame, Dict[str, Any]]]) -> List[List[Dict[str, Any]]]:
+        """
+        One anomaly model call for the (report history, profile or None) pairs of a micro-batch; each
+        history gets its own key. Peer features use the statistics of all stored reports.
+        """
+        reports = pd.concat([history.assign(id_asn=key) for key, (history, _) in enumerate(items)], ignore_index=True)
+        profiles = pd.DataFrame(
+            [dict(profile or {}, id_asn=key) for key, (_, profile) in enumerate(items)], columns=['id_asn', *LHKPN_PROFILE_FIELDS]
+        )
+        peer_statistics = load_lhkpn_peer_statistics()
+        if peer_statistics is None or profiles[list(LHKPN_PROFILE_FIELDS)].isna().all(axis=None):
+            features = build_lhkpn_features(reports)
+        else:
+            features = build_lhkpn_features(reports, profiles, peer_statistics=peer_statistics)
+        scored = flag_lhkpn_anomalies(self.anomaly_model, features)
+        columns = ['tahun_lapor', 'total_kekayaan', 'yoy_change', 'rule_anomaly', 'model_anomaly', 'is_anomaly']
+        results = [[] for _ in items]
+        for key, row in zip(scored['id_asn'].tolist(), scored[columns].to_dict('records')):
+            results[key].append({column: _json_value(value) for column, value in row.items()})
+        return results
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[str, int, str, bytes]:
+        """Routes one request; returns the endpoint name for the metrics, the status, the content type and the body."""
+        parts = path.split('?', 1)[0].strip('/').split('/')
+        try:
+            if method == 'GET' and len(parts) == 2 and parts[0] == 'asn':
+                if not parts[1].isdigit():
+                    raise ApiError(400, "id_asn harus berupa bilangan bulat.")
+                # The table lookups run in a worker thread, so the event loop keeps feeding the batchers
+                profile = await asyncio.get_running_loop().run_in_executor(None, self.profile, int(parts[1]))
+                return 'asn', *self._json(200, profile)
+            if method == 'POST' and parts == ['prediksi', 'talent-pool']:
+                request = self._read_json(body)
+                try:
+                    item = (float(request['kinerja_2023']), float(request['potensi']))
+                except (KeyError, TypeError, ValueError):
+                    raise ApiError(400, "Body harus berisi angka 'kinerja_2023' dan 'potensi'.")
+                return 'prediksi_talent_pool', *self._json(200, {'talent_pool': await self.talent_pool_batcher.submit(item)})
+            if method == 'POST' and parts == ['prediksi', 'lhkpn']:
+                request = self._read_json(body)
+                try:
+                    history = pd.DataFrame(request['laporan'], columns=['tahun_lapor', 'total_kekayaan']).astype('int64')
+                except (KeyError, TypeError, ValueError):
+                    raise ApiError(400, "Body harus berisi 'laporan': daftar objek dengan 'tahun_lapor' dan 'total_kekayaan'.")
+                profile = self._read_profile(request.get('profil'))
+                laporan = await self.lhkpn_batcher.submit((history, profile))
+                return 'prediksi_lhkpn', *self._json(200, {'laporan': laporan, 'anomali': any(row['is_anomaly'] for row in laporan)})
+            if method == 'GET' and parts == ['metrics']:
+                return 'metrics', 200, 'text/plain; version=0.0.4', ('\n'.join(self.prometheus_lines()) + '\n').encode('utf-8')
+            if method == 'GET' and parts == ['health']:
+                return 'health', *self._json(200, {'status': 'ok'})
+            raise ApiError(404, f"Endpoint {method} {path} tidak dikenal.")
+        except ApiError as e:
+            return 'galat', *self._json(e.status, {'galat': str(e)})
+        except Exception:
+            runtime_logger.exception("Permintaan %s %s gagal diproses.", method, path)
+            return 'galat_internal', *self._json(500, {'galat': "Terjadi kesalahan internal saat memproses permintaan."})
+
+    def prometheus_lines(self) -> List[str]:
+        lines = self.metrics.prometheus_lines()
+        lines += [
+            '# HELP simantra_api_batch_size Number of requests per micro-batch of a model.',
+            '# TYPE simantra_api_batch_size summary'
+        ]
+        for model, batcher in [('talent_pool', self.talent_pool_batcher), ('lhkpn', self.lhkpn_batcher)]:
+            if batcher.batch_sizes:
+                sizes = np.fromiter(batcher.batch_sizes, dtype=float)
+                lines += [
+                    f'simantra_api_batch_size{{model="{model}",quantile="0.5"}} {np.percentile(sizes, 50):.1f}',
+                    f'simantra_api_batch_size{{model="{model}",quantile="0.99"}} {np.percentile(sizes, 99):.1f}',
+                ]
+        return lines
+
+    @staticmethod
+    def _read_profile(profile: Any) -> Dict[str, Any]:
+        """The posted ASN profile with its fields converted, or None when there is none."""
+        if profile is None:
+            return None
+        try:
+            return {field: convert(profile[field]) for field, convert in LHKPN_PROFILE_FIELDS.items()}
+        except (KeyError, TypeError, ValueError):
+            raise ApiError(400, f"'profil' harus berisi {', '.join(repr(field) for field in LHKPN_PROFILE_FIELDS)}.")
+
+    @staticmethod
+    def _read_json(body: bytes) -> Any:
+        try:
+            return json.loads(body or b'null')
+        except ValueError:
+            raise ApiError(400, "Body bukan JSON yang valid.")
+
+    @staticmethod
+    def _json(status: int, payload: Any) -> Tuple[int, str, bytes]:
+        return status, 'application/json', json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+    # --- HTTP/1.1 over asyncio streams ---
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serves the requests of one keep-alive connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                start = time.perf_counter()
+                content_length = headers.get('content-length', '0')
+                length = int(content_length) if content_length.isascii() and content_length.isdigit() else None
+                if length is None or length > MAX_BODY_SIZE:
+                    # The body is left unread, so the connection cannot be reused
+                    error = ApiError(400, "Content-Length tidak valid.") if length is None else \
+                        ApiError(413, f"Body melebihi batas {MAX_BODY_SIZE} byte.")
+                    await self._respond(writer, *self._json(error.status, {'galat': str(error)}), keep_alive=False)
+                    self.metrics.record('galat', time.perf_counter() - start)
+                    break
+                body = await reader.readexactly(length)
+
+                endpoint, status, content_type, payload = await self.dispatch(method, target, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await self._respond(writer, status, content_type, payload, keep_alive)
+                self.metrics.record(endpoint, time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # Idle connection still open when the server shuts down
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, content_type: str, payload: bytes, keep_alive: bool) -> None:
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}\r\n"
+            f"Content-Type: {content_type}\r\nContent-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + payload
+        )
+        await writer.drain()
+
+    async def start(self, host: str = API_HOST, port: int = API_PORT) -> asyncio.AbstractServer:
+        """Starts listening; port 0 picks a free port, readable from the returned server's sockets."""
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def close(self) -> None:
+        self.talent_pool_batcher.close()
+        self.lhkpn_batcher.close()
+
+def run_api(host: str = API_HOST, port: int = API_PORT, max_batch_size: int = BATCH_MAX_SIZE,
+            max_batch_wait: float = BATCH_MAX_WAIT) -> None:
+    """Runs the scoring API until interrupted."""
+    async def main():
+        service = ScoringService(max_batch_size, max_batch_wait)
+        server = await service.start(host, port)
+        print(f"API penilaian SIMANTRA berjalan di http://{host}:{server.sockets[0].getsockname()[1]}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            # Requests still waiting for a micro-batch are answered with 503
+            service.close()
+    asyncio.run(main())
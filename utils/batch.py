@@ -0,0 +1,137 @@
+"""Headless batch scoring of every ASN in worker processes, for nightly jobs and benchmarks."""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+from utils.data import read_dataset
+from utils.instrumentation import timed
+from utils.models import assign_talent_pools, build_lhkpn_features, flag_lhkpn_anomalies
+from utils.risk import analyze_financial_health_batch
+from utils.sentiment import aggregate_sentiment, read_sentiment_scores, score_reviews
+
+# scikit-learn is only imported when the models are loaded
+if TYPE_CHECKING:
+    from sklearn.ensemble import IsolationForest, RandomForestClassifier
+
+# --- Batch Scoring ---
+
+# Datasets of a full scoring run, relative to the data directory
+BATCH_DATASETS = {name: f'data_{name}.csv' for name in ['asn', 'slik', 'lhkpn', 'sentimen']}
+# Single output table of a scoring run, one row per ASN
+SCORE_OUTPUT_PATH = 'data/skor_asn.parquet'
+# ASN per task of the worker pool
+SCORE_CHUNK_SIZE = 50_000
+SCORE_COLUMNS = [
+    'id_asn', 'nama', 'nip', 'unit_kerja', 'jabatan_sekarang', 'talent_pool',
+    'anomali_lhkpn', 'jumlah_laporan_anomali', 'yoy_maks',
+    'atensi_keuangan', 'kode_alasan_keuangan', 'rasio_hutang_gaji', 'jumlah_indikator',
+    'skor_sentimen', 'sentimen', 'jumlah_ulasan'
+]
+
+def read_batch_datasets(data_dir: str = 'data') -> Dict[str, pd.DataFrame]:
+    """Reads every dataset of a scoring run from `data_dir`, from the columnar copies when they are current."""
+    return {name: read_dataset(os.path.join(data_dir, file_name)) for name, file_name in BATCH_DATASETS.items()}
+
+def score_asn_chunk(classifier: 'RandomForestClassifier', anomaly_model: 'IsolationForest', asn: pd.DataFrame,
+                    lhkpn_features: pd.DataFrame) -> pd.DataFrame:
+    """
+    Scores one chunk of the merged ASN/SLIK table: talent pool, financial-health rules and the
+    LHKPN anomaly flags of its reports, whose features are already computed over the whole
+    population (the peer z-scores need every ASN). Returns one row per ASN of the chunk.
+    """
+    financial = analyze_financial_health_batch(asn)
+    scored = asn[['id_asn', 'nama', 'nip', 'unit_kerja', 'jabatan_sekarang']].copy()
+    scored['talent_pool'] = assign_talent_pools(classifier, asn)
+    scored['atensi_keuangan'] = financial['atensi']
+    scored['kode_alasan_keuangan'] = financial['kode_alasan']
+    scored['rasio_hutang_gaji'] = financial['rasio_hutang_gaji']
+
+    reports = flag_lhkpn_anomalies(anomaly_model, lhkpn_features)
+    lhkpn_summary = reports.groupby('id_asn').agg(
+        anomali_lhkpn=('is_anomaly', 'any'),
+        jumlah_laporan_anomali=('is_anomaly', 'sum'),
+        yoy_maks=('yoy_change', 'max')
+    )
+    scored = scored.join(lhkpn_summary, on='id_asn')
+    scored['anomali_lhkpn'] = scored['anomali_lhkpn'].fillna(False).astype(bool)
+    scored['jumlah_laporan_anomali'] = scored['jumlah_laporan_anomali'].fillna(0).astype(int)
+    # Same indicators as the EWS risk table
+    scored['jumlah_indikator'] = scored['anomali_lhkpn'].astype(int) + scored['atensi_keuangan'].astype(int)
+    return scored
+
+_worker_models = None
+
+def _init_worker(classifier: 'RandomForestClassifier', anomaly_model: 'IsolationForest') -> None:
+    """Receives the models once per worker process instead of once per chunk."""
+    global _worker_models
+    _worker_models = (classifier, anomaly_model)
+
+def _score_chunk_in_worker(chunk) -> pd.DataFrame:
+    asn, lhkpn_features = chunk
+    return score_asn_chunk(*_worker_models, asn, lhkpn_features)
+
+@timed('score_all_asn')
+def score_all_asn(classifier: 'RandomForestClassifier', anomaly_model: 'IsolationForest', datasets: Dict[str, pd.DataFrame],
+                  ids: Iterable[int] = None, score_cache: pd.DataFrame = None, processes: int = None,
+                  chunk_size: int = SCORE_CHUNK_SIZE) -> pd.DataFrame:
+    """
+    Runs every analysis over the ASN population (or only the ASN in `ids`) and returns a
+    single table of SCORE_COLUMNS ordered by id_asn. The ASN are split into chunks of
+    `chunk_size` scored by a pool of worker processes; `processes=1` scores in the current
+    process. Reviews are scored through `score_reviews`, reusing `score_cache` (the persistent
+    sentiment scores by default) and scoring missing texts with the same number of processes.
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    df_asn = datasets['asn']
+    asn = pd.merge(df_asn, datasets['slik'], on='id_asn', how='left').sort_values('id_asn', kind='stable')
+    # Features over every report, so the peer groups stay complete when only some ASN are scored
+    lhkpn_features = build_lhkpn_features(datasets['lhkpn'], df_asn)
+    if ids is not None:
+        ids = np.fromiter(ids, dtype=np.int64)
+        asn = asn[asn['id_asn'].isin(ids)]
+        lhkpn_features = lhkpn_features[lhkpn_features['id_asn'].isin(ids)]
+    asn = asn.reset_index(drop=True)
+
+    # Chunks of whole ASN: the reports of every chunk are one slice of the features sorted by id_asn
+    report_ids = lhkpn_features['id_asn'].to_numpy()
+    chunks = []
+    for start in range(0, len(asn), chunk_size):
+        chunk = asn.iloc[start:start + chunk_size]
+        first, last = chunk['id_asn'].iloc[0], chunk['id_asn'].iloc[-1]
+        lo = np.searchsorted(report_ids, first, side='left')
+        hi = np.searchsorted(report_ids, last, side='right')
+        chunks.append((chunk, lhkpn_features.iloc[lo:hi]))
+    if not chunks:
+        return pd.DataFrame(columns=SCORE_COLUMNS)
+
+    if processes <= 1 or len(chunks) <= 1:
+        parts = [score_asn_chunk(classifier, anomaly_model, *chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(processes, len(chunks)), initializer=_init_worker,
+                                 initargs=(classifier, anomaly_model)) as executor:
+            parts = list(executor.map(_score_chunk_in_worker, chunks))
+    scored = pd.concat(parts, ignore_index=True)
+
+    df_sentimen = datasets['sentimen']
+    if ids is not None:
+        df_sentimen = df_sentimen[df_sentimen['id_asn'].isin(ids)]
+    if score_cache is None:
+        score_cache = read_sentiment_scores()
+    scored_reviews, _ = score_reviews(df_sentimen, score_cache, processes=processes)
+    scored = scored.join(aggregate_sentiment(scored_reviews), on='id_asn')
+    scored['jumlah_ulasan'] = scored['jumlah_ulasan'].fillna(0).astype(int)
+    return scored[SCORE_COLUMNS]
+
+def write_scores(scored: pd.DataFrame, output_path: str = SCORE_OUTPUT_PATH) -> None:
+    """Writes the score table as Parquet, or CSV for a .csv path, replacing the previous table atomically."""
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    tmp_path = f'{output_path}.tmp'
+    if output_path.endswith('.csv'):
+        scored.to_csv(tmp_path, index=False)
+    else:
+        scored.to_parquet(tmp_path, engine='pyarrow', index=False)
+    os.replace(tmp_path, output_path)
@@ -0,0 +1,158 @@
+"""Relation clusters: offline community detection over the relation graph and cached cluster aggregates."""
+import json
+import os
+from datetime import datetime, timezone
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.data import data_version, data_versions, file_signature
+from utils.graph import RelationIndex, load_relation_index
+from utils.instrumentation import count_cache_miss, timed
+from utils.models import ANOMALY_MODEL, latest_model_version
+from utils.risk import NETWORK_RISK_SOURCES, ledger_version, load_risk_table
+from utils.runtime import cache_resource
+
+# --- Cluster Detection ---
+
+# Relation types clusters are formed over: the ties that carry the most integrity risk
+CLUSTER_EDGE_TYPES = ('Transaksi Keuangan', 'Keluarga')
+# Output of the offline stage: the membership table and the relation data version it was computed from
+CLUSTER_DIR = 'data/klaster_relasi'
+CLUSTER_MEMBERSHIP = 'anggota.parquet'
+CLUSTER_INFO = 'klaster.json'
+
+@timed('detect_relation_clusters')
+def detect_relation_clusters(relation_index: RelationIndex, edge_types: Tuple[str, ...] = CLUSTER_EDGE_TYPES) -> pd.DataFrame:
+    """
+    Assigns every ASN with at least one relation of `edge_types` to its connected component
+    and its community (`RelationIndex.detect_communities`). Both ids start at 0 for the largest group.
+    """
+    components, communities = relation_index.detect_communities(list(edge_types))
+    linked = communities >= 0
+    return pd.DataFrame({
+        'id_asn': relation_index.node_ids[linked],
+        'id_komponen': components[linked],
+        'id_klaster': communities[linked]
+    })
+
+def read_relation_clusters(relation_version: Tuple, edge_types: Tuple[str, ...] = CLUSTER_EDGE_TYPES,
+                           cluster_dir: str = CLUSTER_DIR) -> pd.DataFrame:
+    """
+    Returns the membership table written by the offline stage.
+    Returns None when there is none, or it was computed from other relation data or relation types.
+    """
+    try:
+        with open(os.path.join(cluster_dir, CLUSTER_INFO), encoding='utf-8') as f:
+            info = json.load(f)
+    except FileNotFoundError:
+        return None
+    # Compare in JSON form, where the version tuples are stored as lists
+    if info['relation_version'] != json.loads(json.dumps(relation_version)) or info['edge_types'] != list(edge_types):
+        return None
+    return pd.read_parquet(os.path.join(cluster_dir, CLUSTER_MEMBERSHIP), engine='pyarrow')
+
+def update_relation_clusters(relation_index: RelationIndex, relation_version: Tuple, edge_types: Tuple[str, ...] = CLUSTER_EDGE_TYPES,
+                             cluster_dir: str = CLUSTER_DIR) -> pd.DataFrame:
+    """Offline stage: detects the clusters and writes the membership table with its metadata."""
+    membership = detect_relation_clusters(relation_index, edge_types)
+    os.makedirs(cluster_dir, exist_ok=True)
+    membership.to_parquet(os.path.join(cluster_dir, CLUSTER_MEMBERSHIP), engine='pyarrow', index=False)
+
+    info = {
+        'relation_version': relation_version,
+        'edge_types': list(edge_types),
+        'clusters': int(membership['id_klaster'].max() + 1) if len(membership) else 0,
+        'members': len(membership),
+        'created_at': datetime.now(timezone.utc).isoformat()
+    }
+    info_path = os.path.join(cluster_dir, CLUSTER_INFO)
+    with open(f'{info_path}.tmp', 'w', encoding='utf-8') as f:
+        json.dump(info, f, indent=2)
+    os.replace(f'{info_path}.tmp', info_path)
+    return membership
+
+# --- Cluster Aggregates ---
+
+CLUSTER_MEMBER_COLUMNS = ['nama', 'nip', 'unit_kerja', 'jabatan_sekarang', 'anomali_lhkpn', 'atensi_keuangan', 'jumlah_indikator']
+
+def wealth_growth(scored_lhkpn: pd.DataFrame) -> pd.Series:
+    """Change of total wealth between the first and the last LHKPN report of every ASN."""
+    reports = scored_lhkpn.sort_values(['id_asn', 'tahun_lapor'], kind='stable').groupby('id_asn')['total_kekayaan']
+    return (reports.last() - reports.first()).astype(float)
+
+@timed('summarize_clusters')
+def summarize_clusters(membership: pd.DataFrame, risk_table: pd.DataFrame, scored_lhkpn: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Joins the EWS indicators and wealth growth to the cluster members and aggregates them.
+    Returns the members, sorted by cluster, and one summary row per cluster, indexed by
+    id_klaster and ranked from the cluster with the most flagged members.
+    """
+    members = membership.join(risk_table.set_index('id_asn')[CLUSTER_MEMBER_COLUMNS], on='id_asn')
+    members['pertumbuhan_kekayaan'] = members['id_asn'].map(wealth_growth(scored_lhkpn)).fillna(0.0)
+    members['terindikasi'] = members['jumlah_indikator'].fillna(0) > 0
+    members = members.sort_values(['id_klaster', 'jumlah_indikator'], ascending=[True, False], kind='stable').reset_index(drop=True)
+
+    summary = members.groupby('id_klaster').agg(
+        id_komponen=('id_komponen', 'first'),
+        jumlah_anggota=('id_asn', 'size'),
+        jumlah_terindikasi=('terindikasi', 'sum'),
+        jumlah_anomali_lhkpn=('anomali_lhkpn', 'sum'),
+        jumlah_atensi_keuangan=('atensi_keuangan', 'sum'),
+        pertumbuhan_kekayaan=('pertumbuhan_kekayaan', 'sum')
+    )
+    summary = summary.sort_values(['jumlah_terindikasi', 'jumlah_anggota'], ascending=False, kind='stable')
+    return members, summary
+
+class RelationClusters:
+    """
+    Read-only cluster view shared by every session: the summary per cluster and the members
+    of every cluster as a positional slice, so the EWS page renders a cluster without
+    running the detection.
+    """
+
+    def __init__(self, members: pd.DataFrame, summary: pd.DataFrame):
+        self.members = members
+        self.summary = summary
+        keys, starts, counts = np.unique(members['id_klaster'].to_numpy(), return_index=True, return_counts=True)
+        self._offsets = dict(zip(keys.tolist(), zip(starts.tolist(), (starts + counts).tolist())))
+        self._cluster_of = dict(zip(members['id_asn'].tolist(), members['id_klaster'].tolist()))
+
+    def cluster_of(self, id_asn: int) -> int:
+        """Cluster of an ASN, or None when it has no relation of the cluster types."""
+        return self._cluster_of.get(id_asn)
+
+    def get_members(self, id_klaster: int) -> pd.DataFrame:
+        """Members of one cluster, the most flagged first."""
+        start, stop = self._offsets.get(id_klaster, (0, 0))
+        return self.members.iloc[start:stop]
+
+@timed('load_relation_clusters')
+def load_relation_clusters() -> RelationClusters:
+    """
+    Returns the shared cluster view, rebuilt when the source data, the anomaly model, the LHKPN
+    ledger or the offline cluster output changes. Clusters come from the offline stage when it
+    matches the relation data, otherwise they are detected in-process.
+    Returns None when the relation or risk data cannot be loaded.
+    """
+    return _load_relation_clusters_version(
+        data_versions(*NETWORK_RISK_SOURCES),
+        latest_model_version(ANOMALY_MODEL),
+        ledger_version(),
+        file_signature(os.path.join(CLUSTER_DIR, CLUSTER_INFO))
+    )
+
+@cache_resource(max_entries=2)
+@count_cache_miss('load_relation_clusters')
+def _load_relation_clusters_version(versions: Tuple, model_version: int, ledger_version: Tuple, cluster_version: Tuple) -> RelationClusters:
+    """Builds the cluster view; the arguments are only part of the cache key."""
+    relation_index = load_relation_index()
+    scored_lhkpn, risk_table = load_risk_table()
+    if relation_index is None or risk_table.empty:
+        return None
+
+    membership = read_relation_clusters(data_version('data/data_relasi.csv'))
+    if membership is None:
+        membership = detect_relation_clusters(relation_index)
+    return RelationClusters(*summarize_clusters(membership, risk_table, scored_lhkpn))
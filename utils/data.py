@@ -0,0 +1,127 @@
+"""Typed dataset loading, columnar conversion and data versioning."""
+import os
+from typing import Dict, Tuple
+
+import pandas as pd
+
+from utils.instrumentation import count_cache_miss, timed
+from utils.runtime import cache_data, report_error
+
+# --- Data Loading Functions ---
+
+# Column types of every dataset, keyed by the file name without the 'data_' prefix.
+# Repeated labels are stored as categoricals and the SLIK flag as a real boolean.
+DATASET_SCHEMAS: Dict[str, Dict[str, str]] = {
+    'asn': {
+        'id_asn': 'int64',
+        'nama': 'string',
+        'nip': 'int64',
+        'pangkat_gol': 'category',
+        'jabatan_sekarang': 'category',
+        'unit_kerja': 'category',
+        'kinerja_2023': 'int16',
+        'potensi': 'int16',
+        'pendidikan_terakhir': 'category',
+        'lama_bekerja_thn': 'int16',
+        'gaji_bulanan': 'int64',
+        'total_hutang': 'int64'
+    },
+    'lhkpn': {
+        'id_asn': 'int64',
+        'tahun_lapor': 'int16',
+        'total_kekayaan': 'int64'
+    },
+    'relasi': {
+        'id_asn_sumber': 'int64',
+        'id_asn_target': 'int64',
+        'tipe_relasi': 'category'
+    },
+    'sentimen': {
+        'id_asn': 'int64',
+        'ulasan_naratif': 'category'
+    },
+    'slik': {
+        'id_asn': 'int64',
+        'kualitas_debitur_buruk': 'bool'
+    }
+}
+
+def _dataset_name(file_path: str) -> str:
+    """Maps 'data/data_asn.csv' (or its .parquet copy) to the schema key 'asn'."""
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    return stem[len('data_'):] if stem.startswith('data_') else stem
+
+def _columnar_path(csv_path: str) -> str:
+    """Returns the path of the converted columnar copy of a CSV file."""
+    return os.path.splitext(csv_path)[0] + '.parquet'
+
+def read_csv_typed(csv_path: str) -> pd.DataFrame:
+    """Parses a dataset CSV straight into the dtypes of DATASET_SCHEMAS."""
+    schema = DATASET_SCHEMAS.get(_dataset_name(csv_path), {})
+    # The SLIK flag is written as 'Y'/'N' in the CSV files
+    return pd.read_csv(csv_path, dtype=schema, true_values=['Y'], false_values=['N'])
+
+def convert_dataset(csv_path: str) -> str:
+    """Converts one dataset CSV into a typed Parquet file next to it and returns its path."""
+    parquet_path = _columnar_path(csv_path)
+    read_csv_typed(csv_path).to_parquet(parquet_path, engine='pyarrow', index=False)
+    return parquet_path
+
+def convert_all_datasets(data_dir: str = 'data') -> list:
+    """Converts every known dataset found in `data_dir` into the columnar format."""
+    converted = []
+    for name in DATASET_SCHEMAS:
+        csv_path = os.path.join(data_dir, f'data_{name}.csv')
+        if os.path.exists(csv_path):
+            converted.append(convert_dataset(csv_path))
+    return converted
+
+def read_dataset(file_path: str) -> pd.DataFrame:
+    """
+    Reads a dataset from its columnar copy when one exists and is not older than the CSV,
+    otherwise falls back to parsing the CSV.
+    """
+    parquet_path = _columnar_path(file_path)
+    if os.path.exists(parquet_path) and (
+        not os.path.exists(file_path) or os.path.getmtime(parquet_path) >= os.path.getmtime(file_path)
+    ):
+        try:
+            return pd.read_parquet(parquet_path, engine='pyarrow', memory_map=True)
+        except ImportError:
+            pass
+    return read_csv_typed(file_path)
+
+def file_signature(path: str) -> Tuple:
+    """Modification time and size of a file, or None when it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def data_version(file_path: str) -> Tuple:
+    """
+    Fingerprint of a dataset on disk: modification time and size of the CSV and of its
+    columnar copy. Any rewrite of either file produces a new version.
+    """
+    return (file_signature(file_path), file_signature(_columnar_path(file_path)))
+
+def data_versions(*file_paths: str) -> Tuple:
+    """Combined fingerprint of several datasets, used to key derived artifacts."""
+    return tuple(data_version(path) for path in file_paths)
+
+@timed('load_data')
+def load_data(file_path: str) -> pd.DataFrame:
+    """Loads a dataset with caching, reloading it only when the file on disk has changed."""
+    return _load_data_version(file_path, data_version(file_path))
+
+# Room for the current and the previous version of every dataset
+@cache_data(max_entries=2 * len(DATASET_SCHEMAS))
+@count_cache_miss('load_data')
+def _load_data_version(file_path: str, version: Tuple) -> pd.DataFrame:
+    """Cached loader; `version` is only part of the cache key."""
+    try:
+        return read_dataset(file_path)
+    except FileNotFoundError:
+        report_error(f"File tidak ditemukan: {file_path}. Pastikan file tersebut ada di direktori 'data/'. Jalankan 'python create_dummy_data.py' terlebih dahulu.")
+        return pd.DataFrame()
@@ -0,0 +1,544 @@
+"""Relation graph index, multi-hop path search and network rendering."""
+import re
+import time
+from typing import TYPE_CHECKING, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.data import data_version, load_data
+from utils.instrumentation import count_cache_miss, timed
+from utils.runtime import cache_data, cache_resource
+
+# SciPy is only imported when risk is propagated
+if TYPE_CHECKING:
+    from scipy.sparse import csr_matrix
+
+# --- Relation Graph Index ---
+
+# Risk carried by one relation of each type; a path scores the product of its relations.
+# Money and family ties weigh the most.
+RELATION_RISK_WEIGHTS = {
+    'Transaksi Keuangan': 1.0,
+    'Keluarga': 0.9,
+    'Proyek Bersama': 0.5,
+    'Kolega 1 Unit': 0.3,
+    'Alumni Pelatihan': 0.2
+}
+
+# Probability that the risk walk follows another relation instead of restarting at a seed
+NETWORK_RISK_DAMPING = 0.85
+
+class RelationIndex:
+    """
+    Compact undirected adjacency over the relation dataset in CSR form: the neighbours of
+    the node at position `p` are `indices[indptr[p]:indptr[p + 1]]`, with the relation type
+    of each edge stored as a small integer code in `edge_type`. Built once per data version;
+    neighbourhood queries are slices instead of a full graph rebuild.
+    """
+
+    def __init__(self, df_relasi: pd.DataFrame):
+        tipe = df_relasi['tipe_relasi'].astype('category')
+        self.edge_types = [str(label) for label in tipe.cat.categories]
+
+        sumber = df_relasi['id_asn_sumber'].to_numpy(dtype=np.int64)
+        target = df_relasi['id_asn_target'].to_numpy(dtype=np.int64)
+        self.node_ids = np.unique(np.concatenate([sumber, target]))
+        n = len(self.node_ids)
+        low = np.searchsorted(self.node_ids, np.minimum(sumber, target))
+        high = np.searchsorted(self.node_ids, np.maximum(sumber, target))
+
+        # Collapse repeated pairs like an undirected nx.Graph does, where the last relation wins:
+        # the first occurrence of a pair key in the reversed arrays is its last row
+        pair_key = (low * n + high)[::-1]
+        _, first = np.unique(pair_key, return_index=True)
+        last = len(pair_key) - 1 - first
+        u, v = low[last], high[last]
+        codes = tipe.cat.codes.to_numpy()[last]
+        self.num_edges = len(last)
+
+        # Every edge is stored in both directions, self-loops only once
+        not_loop = u != v
+        src = np.concatenate([u, v[not_loop]])
+        dst = np.concatenate([v, u[not_loop]])
+        types = np.concatenate([codes, codes[not_loop]])
+        order = np.argsort(src, kind='stable')
+
+        self.indices = dst[order].astype(np.int32)
+        self.edge_type = types[order]
+        self.indptr = np.zeros(len(self.node_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=len(self.node_ids)), out=self.indptr[1:])
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    def position(self, id_asn: int) -> int:
+        """Position of an ASN in the index, or None when it has no relation."""
+        pos = int(np.searchsorted(self.node_ids, id_asn))
+        if pos < len(self.node_ids) and self.node_ids[pos] == id_asn:
+            return pos
+        return None
+
+    def lookup(self, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Aligned positions of the given ids and whether each id is present in the index."""
+        ids = ids.astype(np.int64)
+        pos = np.searchsorted(self.node_ids, ids)
+        found = pos < len(self.node_ids)
+        found[found] = self.node_ids[pos[found]] == ids[found]
+        return pos, found
+
+    def positions(self, ids) -> np.ndarray:
+        """Positions of the given ids that are present in the index."""
+        ids = np.fromiter(ids, dtype=np.int64) if not isinstance(ids, np.ndarray) else ids
+        pos, found = self.lookup(ids)
+        return np.unique(pos[found])
+
+    def __contains__(self, id_asn: int) -> bool:
+        return self.position(id_asn) is not None
+
+    def degree(self, id_asn: int) -> int:
+        pos = self.position(id_asn)
+        return 0 if pos is None else int(self.indptr[pos + 1] - self.indptr[pos])
+
+    def neighbors(self, id_asn: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the ids of the direct neighbours of an ASN and the relation type codes."""
+        pos = self.position(id_asn)
+        if pos is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=self.edge_type.dtype)
+        start, stop = self.indptr[pos], self.indptr[pos + 1]
+        return self.node_ids[self.indices[start:stop]], self.edge_type[start:stop]
+
+    def _gather_rows(self, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Concatenates the adjacency rows of `positions`; returns source positions and edge offsets."""
+        starts = self.indptr[positions]
+        counts = self.indptr[positions + 1] - starts
+        row_offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        return np.repeat(positions, counts), row_offsets + np.arange(int(counts.sum()))
+
+    @timed('RelationIndex.ego_graph')
+    def ego_graph(self, id_asn: int) -> Tuple[np.ndarray, pd.DataFrame]:
+        """
+        Radius-1 ego graph of an ASN, equivalent to `nx.ego_graph(G, id_asn, radius=1)`:
+        the node ids, and the relations among them as an edge list.
+        """
+        pos = self.position(id_asn)
+        if pos is None:
+            return np.array([id_asn]), pd.DataFrame(columns=['id_asn_sumber', 'id_asn_target', 'tipe_relasi'])
+
+        members = np.union1d([pos], self.indices[self.indptr[pos]:self.indptr[pos + 1]])
+        return self.node_ids[members], self.induced_edges(members)
+
+    def induced_edges(self, members: np.ndarray) -> pd.DataFrame:
+        """Relations among the nodes at the sorted positions `members`, each edge once, as an edge list."""
+        src, offsets = self._gather_rows(members)
+        dst = self.indices[offsets]
+        keep = (src <= dst) & np.isin(dst, members)
+        return pd.DataFrame({
+            'id_asn_sumber': self.node_ids[src[keep]],
+            'id_asn_target': self.node_ids[dst[keep]],
+            'tipe_relasi': np.asarray(self.edge_types, dtype=object)[self.edge_type[offsets[keep]]]
+        })
+
+    def _allowed_codes(self, edge_types: list) -> np.ndarray:
+        """Type codes of the relation types a query may traverse (all types when None)."""
+        if edge_types is None:
+            return None
+        return np.array([self.edge_types.index(t) for t in edge_types if t in self.edge_types], dtype=self.edge_type.dtype)
+
+    def _bfs_distances(self, start_positions: np.ndarray, max_hops: int, allowed_codes: np.ndarray = None) -> np.ndarray:
+        """Hop distance of every node from the nearest start node, -1 beyond `max_hops`."""
+        dist = np.full(self.num_nodes, -1, dtype=np.int32)
+        dist[start_positions] = 0
+        frontier = start_positions
+        for hop in range(1, max_hops + 1):
+            _, offsets = self._gather_rows(frontier)
+            if allowed_codes is not None:
+                offsets = offsets[np.isin(self.edge_type[offsets], allowed_codes)]
+            reached = np.unique(self.indices[offsets])
+            frontier = reached[dist[reached] < 0]
+            if len(frontier) == 0:
+                break
+            dist[frontier] = hop
+        return dist
+
+    @timed('RelationIndex.find_paths')
+    def find_paths(self, source_id: int, target_ids, max_hops: int = 3, edge_types: list = None,
+                   weights: Dict[str, float] = None, time_budget: float = 2.0, max_paths: int = 500) -> Tuple[pd.DataFrame, bool]:
+        """
+        Finds the simple paths of at most `max_hops` relations from one ASN to any ASN of `target_ids`,
+        optionally only through the given relation types.
+
+        Hop distances are first computed from both ends with vectorized BFS, so the depth-first
+        enumeration only visits nodes that still lie on a short enough path to a target.
+        Each path is scored by the product of its relation weights (RELATION_RISK_WEIGHTS by default).
+        Returns the paths ranked by score and whether the search finished within
+        `time_budget` seconds and `max_paths` results.
+        """
+        deadline = time.perf_counter() + time_budget
+        weights = RELATION_RISK_WEIGHTS if weights is None else weights
+        columns = ['id_asn_tujuan', 'jumlah_hop', 'skor_risiko', 'jalur', 'tipe_relasi']
+
+        source = self.position(source_id)
+        target_positions = self.positions(target_ids)
+        target_positions = target_positions[target_positions != source]
+        if source is None or len(target_positions) == 0:
+            return pd.DataFrame(columns=columns), True
+
+        allowed_codes = self._allowed_codes(edge_types)
+        dist_from_source = self._bfs_distances(np.array([source]), max_hops, allowed_codes)
+        dist_to_target = self._bfs_distances(target_positions, max_hops, allowed_codes)
+        on_short_path = (dist_from_source >= 0) & (dist_to_target >= 0) & (dist_from_source + dist_to_target <= max_hops)
+        is_target = np.zeros(self.num_nodes, dtype=bool)
+        is_target[target_positions] = True
+        type_weights = np.array([weights.get(t, 0.1) for t in self.edge_types])
+
+        results = []
+        complete = True
+        # Each stack entry: (node position, path positions, edge type codes along the path)
+        stack = [(source, [source], [])]
+        while stack:
+            if time.perf_counter() > deadline or len(results) >= max_paths:
+                complete = False
+                break
+            node, path, codes = stack.pop()
+            if len(path) > 1 and is_target[node]:
+                results.append((path, codes))
+            depth = len(path) - 1
+            if depth == max_hops:
+                continue
+
+            start, stop = self.indptr[node], self.indptr[node + 1]
+            nbrs = self.indices[start:stop]
+            nbr_codes = self.edge_type[start:stop]
+            # Prune neighbours that cannot reach a target within the remaining hops
+            keep = on_short_path[nbrs] & (depth + 1 + dist_to_target[nbrs] <= max_hops)
+            if allowed_codes is not None:
+                keep &= np.isin(nbr_codes, allowed_codes)
+            for nbr, code in zip(nbrs[keep].tolist(), nbr_codes[keep].tolist()):
+                if nbr not in path:
+                    stack.append((nbr, path + [nbr], codes + [code]))
+
+        rows = []
+        for path, codes in results:
+            rows.append({
+                'id_asn_tujuan': int(self.node_ids[path[-1]]),
+                'jumlah_hop': len(codes),
+                'skor_risiko': float(np.prod(type_weights[codes])),
+                'jalur': self.node_ids[path].tolist(),
+                'tipe_relasi': [self.edge_types[c] for c in codes]
+            })
+        paths = pd.DataFrame(rows, columns=columns)
+        paths = paths.sort_values(['skor_risiko', 'jumlah_hop'], ascending=[False, True], kind='stable').reset_index(drop=True)
+        return paths, complete
+
+    def weight_matrix(self, weights: Dict[str, float] = None) -> 'csr_matrix':
+        """Symmetric SciPy CSR matrix of the relation weights (RELATION_RISK_WEIGHTS by default), sharing the index arrays."""
+        from scipy.sparse import csr_matrix
+        weights = RELATION_RISK_WEIGHTS if weights is None else weights
+        type_weights = np.array([weights.get(t, 0.0) for t in self.edge_types], dtype=float)
+        return csr_matrix((type_weights[self.edge_type], self.indices, self.indptr), shape=(self.num_nodes, self.num_nodes))
+
+    def _typed_edges(self, edge_types: list = None, weights: Dict[str, float] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Source positions, target positions and weights of the stored edges of the given relation types."""
+        weights = RELATION_RISK_WEIGHTS if weights is None else weights
+        type_weights = np.array([weights.get(t, 0.0) for t in self.edge_types], dtype=float)
+        src = np.repeat(np.arange(self.num_nodes), np.diff(self.indptr))
+        keep = np.ones(len(self.indices), dtype=bool)
+        allowed_codes = self._allowed_codes(edge_types)
+        if allowed_codes is not None:
+            keep = np.isin(self.edge_type, allowed_codes)
+        return src[keep], self.indices[keep].astype(np.int64), type_weights[self.edge_type[keep]]
+
+    @timed('RelationIndex.detect_communities')
+    def detect_communities(self, edge_types: list = None, weights: Dict[str, float] = None, max_iter: int = 30,
+                           seed: int = 42) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Connected components and communities of the graph restricted to the given relation types.
+        Communities come from weighted label propagation: every node takes the label with the
+        highest total relation weight among its neighbours, its own label counting half the
+        lightest relation weight. Each round updates a random half of the nodes, which keeps
+        the vectorized rounds from oscillating, until no node would change its label.
+        Returns the component and community label of every node position, both numbered from
+        the largest group and -1 for nodes without a relation of those types.
+        """
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.csgraph import connected_components
+
+        n = self.num_nodes
+        src, dst, edge_weights = self._typed_edges(edge_types, weights)
+        linked = np.bincount(src, minlength=n) > 0
+        _, components = connected_components(csr_matrix((edge_weights, (src, dst)), shape=(n, n)), directed=False)
+
+        nodes = np.flatnonzero(linked)
+        own_weight = np.full(len(nodes), edge_weights.min() / 2 if len(edge_weights) else 0.0)
+        pair_src = np.concatenate([src, nodes])
+        pair_weights = np.concatenate([edge_weights, own_weight])
+        labels = np.arange(n)
+        rng = np.random.default_rng(seed)
+        for _ in range(max_iter):
+            # Total weight of every (node, neighbour label) pair; the best label per node wins,
+            # ties going to the smallest label
+            pair_key = pair_src * n + np.concatenate([labels[dst], labels[nodes]])
+            keys, inverse = np.unique(pair_key, return_inverse=True)
+            totals = np.bincount(inverse, weights=pair_weights)
+            key_src, key_label = keys // n, keys % n
+            # Keys are sorted by node, then label: the first maximum of each node's run wins
+            starts = np.flatnonzero(np.r_[True, key_src[1:] != key_src[:-1]])
+            run = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(keys)]))
+            is_max = np.flatnonzero(totals == np.maximum.reduceat(totals, starts)[run])
+            first = is_max[np.r_[True, run[is_max][1:] != run[is_max][:-1]]]
+            best = labels.copy()
+            best[key_src[first]] = key_label[first]
+
+            changing = best != labels
+            if not changing.any():
+                break
+            update = changing & (rng.random(n) < 0.5)
+            labels[update] = best[update]
+
+        return _number_by_size(components, linked), _number_by_size(labels, linked)
+
+    @timed('RelationIndex.propagate_risk')
+    def propagate_risk(self, seeds: pd.Series, damping: float = NETWORK_RISK_DAMPING, weights: Dict[str, float] = None,
+                       tol: float = 1e-8, max_iter: int = 200) -> np.ndarray:
+        """
+        Personalized PageRank of every node, restarting at the ASN of `seeds` (id -> seed risk)
+        in proportion to their risk and walking each relation in proportion to its weight.
+        Runs as power iteration on the sparse weight matrix. Returns one score per node
+        position, summing to 1, or zeros when no seed has a relation.
+        """
+        restart = np.zeros(self.num_nodes)
+        seeds = seeds[seeds > 0]
+        positions, found = self.lookup(seeds.index.to_numpy())
+        np.add.at(restart, positions[found], seeds.to_numpy(dtype=float)[found])
+        if restart.sum() == 0:
+            return restart
+        restart /= restart.sum()
+
+        matrix = self.weight_matrix(weights)
+        strength = np.asarray(matrix.sum(axis=1)).ravel()
+        dangling = strength == 0
+        inverse_strength = np.divide(1.0, strength, out=np.zeros_like(strength), where=~dangling)
+
+        # The matrix is symmetric, so spreading r along the rows is matrix @ (r / strength);
+        # mass of nodes without weighted relations restarts at the seeds
+        has_dangling = dangling.any()
+        scores = restart.copy()
+        for _ in range(max_iter):
+            spread = matrix @ (scores * inverse_strength)
+            if has_dangling:
+                spread += scores[dangling].sum() * restart
+            updated = damping * spread + (1 - damping) * restart
+            converged = np.abs(updated - scores).sum() < tol
+            scores = updated
+            if converged:
+                break
+        return scores
+
+def _number_by_size(labels: np.ndarray, members: np.ndarray) -> np.ndarray:
+    """Renumbers the labels of the `members` nodes 0, 1, ... from the largest group; other nodes get -1."""
+    numbered = np.full(len(labels), -1, dtype=np.int64)
+    unique, inverse, counts = np.unique(labels[members], return_inverse=True, return_counts=True)
+    rank = np.empty(len(unique), dtype=np.int64)
+    rank[np.lexsort((unique, -counts))] = np.arange(len(unique))
+    numbered[members] = rank[inverse]
+    return numbered
+
+@timed('load_relation_index')
+def load_relation_index() -> RelationIndex:
+    """
+    Returns the shared RelationIndex, rebuilt only when the relation dataset changes.
+    Returns None when the dataset cannot be loaded.
+    """
+    return _load_relation_index_version(data_version('data/data_relasi.csv'))
+
+@cache_resource(max_entries=2)
+@count_cache_miss('load_relation_index')
+def _load_relation_index_version(version: Tuple) -> RelationIndex:
+    """Builds the relation index; `version` is only part of the cache key."""
+    df_relasi = load_data('data/data_relasi.csv')
+    if df_relasi.empty:
+        return None
+    return RelationIndex(df_relasi)
+
+@timed('search_relation_paths')
+def search_relation_paths(source_id: int, target_ids: Tuple[int, ...], max_hops: int, edge_types: Tuple[str, ...]) -> Tuple[pd.DataFrame, bool]:
+    """Runs `RelationIndex.find_paths` on the shared index, cached per query and relation data version."""
+    return _search_relation_paths_version(source_id, target_ids, max_hops, edge_types, data_version('data/data_relasi.csv'))
+
+@cache_data(max_entries=64)
+@count_cache_miss('search_relation_paths')
+def _search_relation_paths_version(source_id: int, target_ids: Tuple[int, ...], max_hops: int, edge_types: Tuple[str, ...], version: Tuple) -> Tuple[pd.DataFrame, bool]:
+    """Cached path search; `version` is only part of the cache key."""
+    relation_index = load_relation_index()
+    if relation_index is None:
+        return pd.DataFrame(), True
+    return relation_index.find_paths(source_id, target_ids, max_hops=max_hops, edge_types=list(edge_types) or None)
+
+# --- Network Rendering ---
+
+# Tags that load external files: CDN assets and the relative ../node_modules/vis paths pyvis
+# still emits, which never resolve inside the component iframe. The vis.js bundle itself is
+# inlined by pyvis, so the page needs none of them.
+_EXTERNAL_ASSET_PATTERN = re.compile(
+    r'<link\b[^>]*\shref\s*=[^>]*>|<script\b[^>]*\ssrc\s*=[^>]*>\s*</script>',
+    re.IGNORECASE
+)
+
+# Neighbours of an ego graph drawn as individual nodes; past this the rest is collapsed per relation type
+EGO_GRAPH_NODE_LIMIT = 50
+# Neighbours of one relation type drawn when the user expands its collapsed node
+EGO_GRAPH_EXPAND_LIMIT = 200
+# Spacing between neighbours on the layout ring, in vis.js canvas pixels
+_RING_SPACING = 45
+
+@timed('build_ego_layout')
+def build_ego_layout(relation_index: 'RelationIndex', selected_asn_id: int, priority: pd.Series = None,
+                     expanded_types: Tuple[str, ...] = (), node_limit: int = EGO_GRAPH_NODE_LIMIT,
+                     expand_limit: int = EGO_GRAPH_EXPAND_LIMIT) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Level-of-detail layout of the radius-1 ego graph of an ASN, with fixed coordinates so the
+    browser does not simulate physics. Every neighbour is grouped under its riskiest relation
+    type to the ASN and ranked by `priority` (indexed by id_asn, higher first), then by the
+    weight of that relation type. The top `node_limit` neighbours, plus the top `expand_limit`
+    of every type in `expanded_types`, are drawn individually; the others are collapsed into
+    one node per relation type. The node count is bounded whatever the degree of the ASN.
+
+    Returns the nodes (`id`, `jenis` of 'pusat', 'asn' or 'ringkasan', `tipe_relasi`, `jumlah`,
+    `x`, `y`) and the edges (`sumber`, `target`, `tipe_relasi`, `jumlah`). Collapsed nodes have
+    string ids of the form 'ringkasan:<tipe_relasi>'.
+    """
+    pos = relation_index.position(selected_asn_id)
+    center = pd.DataFrame({'id': [selected_asn_id], 'jenis': ['pusat'], 'tipe_relasi': [None], 'jumlah': [1], 'x': [0.0], 'y': [0.0]})
+    if pos is None:
+        return center, pd.DataFrame(columns=['sumber', 'target', 'tipe_relasi', 'jumlah'])
+
+    start, stop = relation_index.indptr[pos], relation_index.indptr[pos + 1]
+    neighbours = relation_index.indices[start:stop].astype(np.int64)
+    codes = relation_index.edge_type[start:stop]
+    not_loop = neighbours != pos
+    neighbours, codes = neighbours[not_loop], codes[not_loop]
+
+    # One entry per neighbour, under its riskiest relation type to the selected ASN
+    type_weights = np.array([RELATION_RISK_WEIGHTS.get(t, 0.0) for t in relation_index.edge_types])
+    order = np.lexsort((-type_weights[codes], neighbours))
+    first = np.r_[True, neighbours[order][1:] != neighbours[order][:-1]]
+    neighbours, codes = neighbours[order][first], codes[order][first]
+
+    # Risk priority first, then the weight of the relation type, then the id for a stable order
+    ids = relation_index.node_ids[neighbours]
+    scores = np.zeros(len(ids)) if priority is None else priority.reindex(ids).fillna(0).to_numpy(dtype=float)
+    rank = np.lexsort((ids, -type_weights[codes], -scores))
+    neighbours, codes, ids = neighbours[rank], codes[rank], ids[rank]
+
+    visible = np.arange(len(ids)) < node_limit
+    for tipe in expanded_types:
+        if tipe in relation_index.edge_types:
+            of_type = np.flatnonzero(codes == relation_index.edge_types.index(tipe))
+            visible[of_type[:expand_limit]] = True
+
+    # Sectors per relation type, riskiest type first, sized by the slots they need
+    groups = []
+    for code in sorted(np.unique(codes).tolist(), key=lambda c: -type_weights[c]):
+        of_type = codes == code
+        groups.append((relation_index.edge_types[code], ids[of_type & visible], int((of_type & ~visible).sum())))
+    slots = sum(len(shown) + (hidden > 0) for _, shown, hidden in groups)
+    radius = max(250.0, slots * _RING_SPACING / (2 * np.pi))
+
+    node_rows, edge_rows = [center], []
+    angle = 0.0
+    for tipe, shown, hidden in groups:
+        sector = 2 * np.pi * (len(shown) + (hidden > 0)) / slots
+        if len(shown):
+            # Alternate between two rings so neighbouring labels do not overlap
+            angles = angle + sector * (np.arange(len(shown)) + 0.5) / (len(shown) + (hidden > 0))
+            radii = radius + 60.0 * (np.arange(len(shown)) % 2)
+            node_rows.append(pd.DataFrame({'id': shown, 'jenis': 'asn', 'tipe_relasi': tipe, 'jumlah': 1,
+                                           'x': radii * np.cos(angles), 'y': radii * np.sin(angles)}))
+        if hidden:
+            # The collapsed node sits outside the ring, at the end of its sector
+            node_id = f'ringkasan:{tipe}'
+            middle = angle + sector * (len(shown) + 0.5) / (len(shown) + 1)
+            node_rows.append(pd.DataFrame({'id': [node_id], 'jenis': ['ringkasan'], 'tipe_relasi': [tipe], 'jumlah': [hidden],
+                                           'x': [(radius + 180.0) * np.cos(middle)], 'y': [(radius + 180.0) * np.sin(middle)]}))
+            edge_rows.append(pd.DataFrame({'sumber': [selected_asn_id], 'target': [node_id], 'tipe_relasi': [tipe], 'jumlah': [hidden]}))
+        angle += sector
+    nodes = pd.concat(node_rows, ignore_index=True)
+
+    # Relations among the drawn ASN, including those between neighbours
+    members = np.sort(np.r_[pos, neighbours[visible]])
+    induced = relation_index.induced_edges(members)
+    edge_rows.insert(0, pd.DataFrame({
+        'sumber': induced['id_asn_sumber'],
+        'target': induced['id_asn_target'],
+        'tipe_relasi': induced['tipe_relasi'],
+        'jumlah': 1
+    }))
+    return nodes, pd.concat(edge_rows, ignore_index=True)
+
+@timed('create_network_graph')
+def create_network_graph(relation_index: 'RelationIndex', selected_asn_id: int, asn_map: Dict, priority: pd.Series = None,
+                         expanded_types: Tuple[str, ...] = (), layout: Tuple[pd.DataFrame, pd.DataFrame] = None) -> str:
+    """
+    Creates an interactive social network graph and returns it as a self-contained HTML string.
+    The vis.js assets are inlined from the local pyvis installation, so no internet access is needed.
+    Nodes are placed at the coordinates of `build_ego_layout` (or the given `layout`) with
+    physics disabled, so large ego graphs render without a browser-side simulation.
+    """
+    if layout is None:
+        layout = build_ego_layout(relation_index, selected_asn_id, priority, expanded_types)
+    nodes, edges = layout
+
+    # pyvis and its templates are only imported when a graph is actually rendered
+    from pyvis.network import Network
+    net = Network(
+        height="600px",
+        width="100%",
+        bgcolor="#FFFFFF",
+        font_color="black",
+        directed=False,
+        cdn_resources='in_line'
+    )
+    
+    # Define colors for risk
+    risk_color_map = {
+        'Transaksi Keuangan': 'red',
+        'Keluarga': 'orange'
+    }
+
+    # Plain Python values: pyvis only accepts int or str node ids
+    for node, jenis, tipe_relasi, jumlah, x, y in zip(*(nodes[column].tolist() for column in nodes.columns)):
+        if jenis == 'ringkasan':
+            label = f"{tipe_relasi}: {jumlah:,} ASN lainnya"
+            net.add_node(node, label=label, title=f"{label} (diringkas)", color='lightgrey', shape='box', x=x, y=y, physics=False)
+            continue
+        nama = asn_map.get(node, f"ASN ID: {node}")
+        title = f"Nama: {nama}"
+        color = 'skyblue' if node != selected_asn_id else 'lime'
+        net.add_node(node, label=nama, title=title, color=color, size=20 if node == selected_asn_id else 15, x=x, y=y, physics=False)
+
+    for sumber, target, tipe_relasi, jumlah in zip(*(edges[column].tolist() for column in edges.columns)):
+        color = risk_color_map.get(tipe_relasi, 'grey')
+        width = 3 if color != 'grey' else 1
+        edge_title = f"Relasi: {tipe_relasi}"
+        if jumlah > 1:
+            # Collapsed relations: thicker with the number of ASN behind them
+            width += float(np.log10(jumlah))
+            edge_title += f" ({jumlah:,} ASN)"
+        net.add_edge(sumber, target, title=edge_title, color=color, width=width)
+
+    net.set_options("""
+    var options = {
+      "physics": {
+        "enabled": false
+      },
+      "interaction": {
+        "hideEdgesOnDrag": true
+      }
+    }
+    """)
+    
+    # Render in memory instead of writing a file that concurrent sessions would share
+    html = net.generate_html()
+    return _EXTERNAL_ASSET_PATTERN.sub('', html)
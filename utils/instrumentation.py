@@ -0,0 +1,186 @@
+"""Opt-in timing, cache hit/miss and memory instrumentation of the hot paths and page sections."""
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# --- Instrumentation ---
+
+# Off by default: with SIMANTRA_INSTRUMENTATION unset the decorators below return the
+# function unchanged and `section` is a shared no-op context manager.
+INSTRUMENTATION_ENABLED = os.environ.get('SIMANTRA_INSTRUMENTATION', '') not in ('', '0')
+METRICS_PATH = os.environ.get('SIMANTRA_METRICS_PATH', 'metrics/simantra.prom')
+
+instrumentation_logger = logging.getLogger('simantra.instrumentation')
+
+_NO_OP_SECTION = contextlib.nullcontext()
+# Names of the functions wrapped by `count_cache_miss`, shown in the cache table
+_CACHED_FUNCTIONS = set()
+# Process-wide totals exported to the Prometheus text file
+_metrics_lock = threading.Lock()
+_totals: Dict[str, Dict[str, float]] = {'seconds': {}, 'calls': {}, 'misses': {}}
+# Per-rerun records of the current script thread
+_rerun = threading.local()
+
+def _current_rss() -> int:
+    """Resident set size of this process in bytes, or 0 where /proc is not available."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return 0
+
+def _add(table: Dict[str, float], name: str, value: float) -> None:
+    table[name] = table.get(name, 0) + value
+
+def _record(name: str, seconds: float = 0.0, memory: int = 0, calls: int = 0, misses: int = 0) -> None:
+    with _metrics_lock:
+        _add(_totals['seconds'], name, seconds)
+        _add(_totals['calls'], name, calls)
+        _add(_totals['misses'], name, misses)
+    records = getattr(_rerun, 'records', None)
+    if records is not None:
+        entry = records.setdefault(name, {'detik': 0.0, 'memori_mb': 0.0, 'panggilan': 0, 'cache_miss': 0})
+        entry['detik'] += seconds
+        entry['memori_mb'] += memory / 2**20
+        entry['panggilan'] += calls
+        entry['cache_miss'] += misses
+
+class _TimedSection:
+    """Records the wall time and resident memory delta of a block under `name`."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self._memory = _current_rss()
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        _record(self.name, seconds=time.perf_counter() - self._start, memory=_current_rss() - self._memory, calls=1)
+
+def section(name: str):
+    """Context manager timing a page section or any other block."""
+    return _TimedSection(name) if INSTRUMENTATION_ENABLED else _NO_OP_SECTION
+
+def timed(name: str):
+    """Decorator timing every call of a function under `name`."""
+    def decorator(func):
+        if not INSTRUMENTATION_ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _TimedSection(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def count_cache_miss(name: str):
+    """
+    Decorator placed under `cache_data`/`cache_resource`: the wrapped body only runs
+    on a cache miss. Hits are the calls of the `timed` wrapper with the same name minus the misses.
+    """
+    def decorator(func):
+        if not INSTRUMENTATION_ENABLED:
+            return func
+        _CACHED_FUNCTIONS.add(name)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            _record(name, misses=1)
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def begin_rerun(page: str) -> None:
+    """Starts collecting the timings of one script run of `page`."""
+    if not INSTRUMENTATION_ENABLED:
+        return
+    _rerun.page = page
+    _rerun.records = {}
+    _rerun.memory = _current_rss()
+    _rerun.start = time.perf_counter()
+
+def rerun_summary() -> pd.DataFrame:
+    """Timings, cache hits/misses and memory deltas collected since `begin_rerun`."""
+    records = getattr(_rerun, 'records', None) or {}
+    summary = pd.DataFrame.from_dict(records, orient='index')
+    if summary.empty:
+        return summary
+    is_cached = summary.index.isin(list(_CACHED_FUNCTIONS))
+    summary['cache_hit'] = np.where(is_cached, summary['panggilan'] - summary['cache_miss'], 0)
+    return summary.sort_values('detik', ascending=False)
+
+def write_prometheus_metrics(path: str = METRICS_PATH) -> None:
+    """Writes the process-wide totals in the Prometheus text exposition format."""
+    with _metrics_lock:
+        totals = {kind: dict(values) for kind, values in _totals.items()}
+    lines = [
+        '# HELP simantra_section_seconds_total Total wall time spent in an instrumented function or page section.',
+        '# TYPE simantra_section_seconds_total counter'
+    ]
+    lines += [f'simantra_section_seconds_total{{name="{name}"}} {value:.6f}' for name, value in sorted(totals['seconds'].items())]
+    lines += [
+        '# HELP simantra_section_calls_total Number of calls of an instrumented function or page section.',
+        '# TYPE simantra_section_calls_total counter'
+    ]
+    lines += [f'simantra_section_calls_total{{name="{name}"}} {int(value)}' for name, value in sorted(totals['calls'].items())]
+    lines += [
+        '# HELP simantra_cache_misses_total Number of cache misses of a cached function.',
+        '# TYPE simantra_cache_misses_total counter'
+    ]
+    lines += [f'simantra_cache_misses_total{{name="{name}"}} {int(totals["misses"].get(name, 0))}' for name in sorted(_CACHED_FUNCTIONS)]
+    lines += [
+        '# HELP simantra_cache_hits_total Number of cache hits of a cached function.',
+        '# TYPE simantra_cache_hits_total counter'
+    ]
+    lines += [f'simantra_cache_hits_total{{name="{name}"}} {int(totals["calls"].get(name, 0) - totals["misses"].get(name, 0))}' for name in sorted(_CACHED_FUNCTIONS)]
+    lines += [
+        '# HELP simantra_process_resident_memory_bytes Resident memory of the Streamlit process.',
+        '# TYPE simantra_process_resident_memory_bytes gauge',
+        f'simantra_process_resident_memory_bytes {_current_rss()}'
+    ]
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    # Written next to the target and renamed so a scraper never reads a partial file
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace(tmp_path, path)
+
+def end_rerun() -> None:
+    """Logs the finished run, refreshes the metrics file and shows the admin panel in the sidebar."""
+    if not INSTRUMENTATION_ENABLED or getattr(_rerun, 'records', None) is None:
+        return
+    total_seconds = time.perf_counter() - _rerun.start
+    memory_delta = (_current_rss() - _rerun.memory) / 2**20
+    summary = rerun_summary()
+
+    instrumentation_logger.info(json.dumps({
+        'page': _rerun.page,
+        'total_s': round(total_seconds, 6),
+        'memory_delta_mb': round(memory_delta, 2),
+        'sections': {name: {key: round(float(value), 6) for key, value in row.items()} for name, row in summary.iterrows()}
+    }))
+    try:
+        write_prometheus_metrics()
+    except OSError as e:
+        instrumentation_logger.warning(f"Gagal menulis metrik ke {METRICS_PATH}: {e}")
+
+    import streamlit as st
+    with st.sidebar.expander("⏱️ Panel Admin: Waktu Eksekusi"):
+        col1, col2 = st.columns(2)
+        col1.metric("Total Rerun", f"{total_seconds * 1000:.0f} ms")
+        col2.metric("Delta Memori", f"{memory_delta:+.1f} MB")
+        if summary.empty:
+            st.caption("Belum ada bagian yang terukur pada rerun ini.")
+        else:
+            st.dataframe(summary.round(4), use_container_width=True)
+    _rerun.records = None
@@ -0,0 +1,77 @@
+"""Precomputed Home page KPI counts, so a fresh worker renders Home without loading any model."""
+import json
+import os
+from typing import Any, Dict
+
+from utils.data import data_versions, file_signature
+from utils.instrumentation import timed
+from utils.models import ANOMALY_MODEL, CLASSIFICATION_MODEL, LHKPN_LEDGER_DIR, LHKPN_LEDGER_INFO, anomaly_training_version, \
+    latest_model_version
+
+# Written next to the datasets; replaced whenever one of the inputs below changes
+KPI_PATH = 'data/kpi_home.json'
+# Datasets of the risk table and the talent pools the counts come from
+KPI_SOURCES = ('data/data_asn.csv', 'data/data_slik.csv', 'data/data_lhkpn.csv')
+
+def kpi_version() -> Dict[str, Any]:
+    """Versions of the datasets, models and LHKPN ledger behind the counts, in JSON form."""
+    anomaly_version = latest_model_version(ANOMALY_MODEL)
+    version = {
+        'data': data_versions(*KPI_SOURCES),
+        'anomaly_model': anomaly_version,
+        'anomaly_training_data': anomaly_training_version(anomaly_version),
+        'classification_model': latest_model_version(CLASSIFICATION_MODEL),
+        'ledger': file_signature(os.path.join(LHKPN_LEDGER_DIR, LHKPN_LEDGER_INFO))
+    }
+    # Version tuples are stored as lists
+    return json.loads(json.dumps(version))
+
+def read_kpi_counts(version: Dict[str, Any], path: str = KPI_PATH) -> Dict[str, int]:
+    """Returns the stored counts, or None when there are none or they were computed for another version."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            stored = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    return stored['counts'] if stored.get('version') == version else None
+
+def compute_kpi_counts() -> Dict[str, int]:
+    """
+    Counts the KPIs from the shared risk table and talent pools, loading both (and with them the
+    models). Returns None when the ASN data cannot be loaded.
+    """
+    from utils.models import load_talent_pools
+    from utils.risk import load_risk_table
+    _, risk_table = load_risk_table()
+    talent_pools = load_talent_pools()
+    if risk_table.empty or talent_pools is None:
+        return None
+    return {
+        'jumlah_asn': len(risk_table),
+        'jumlah_risiko': int((risk_table['jumlah_indikator'] > 0).sum()),
+        'jumlah_high_potential': talent_pools.count('High Potential')
+    }
+
+def write_kpi_counts(counts: Dict[str, int], version: Dict[str, Any], path: str = KPI_PATH) -> None:
+    """Stores the counts with the version they were computed for, replacing the previous file atomically."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'version': version, 'counts': counts}, f, indent=2)
+    os.replace(f'{path}.tmp', path)
+
+@timed('load_home_kpis')
+def load_home_kpis() -> Dict[str, int]:
+    """
+    Returns the Home KPI counts (`jumlah_asn`, `jumlah_risiko`, `jumlah_high_potential`).
+    They are read from KPI_PATH when it matches the current data, models and ledger; otherwise
+    they are computed once and stored there, so later cold starts of any worker skip the models.
+    Returns None when the ASN data cannot be loaded.
+    """
+    # Taken before computing, so data changing meanwhile makes the stored counts stale, not wrong
+    version = kpi_version()
+    counts = read_kpi_counts(version)
+    if counts is None:
+        counts = compute_kpi_counts()
+        if counts is not None:
+            write_kpi_counts(counts, version)
+    return counts
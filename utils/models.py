@@ -0,0 +1,649 @@
+"""Model training, versioned model artifacts and model-based scoring."""
+import json
+import os
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.data import data_versions, load_data, read_dataset
+from utils.instrumentation import count_cache_miss, timed
+from utils.runtime import cache_data, cache_resource
+
+# scikit-learn and joblib are only imported when a model is trained or loaded
+if TYPE_CHECKING:
+    from sklearn.ensemble import IsolationForest, RandomForestClassifier
+
+# --- Machine Learning Model Loading Functions ---
+
+# Versioned model artifacts live in models/<name>/v<N>.joblib with a v<N>.json metadata file
+MODEL_DIR = 'models'
+CLASSIFICATION_MODEL = 'talent_pool'
+ANOMALY_MODEL = 'lhkpn_anomaly'
+
+def train_classification_model(seed: int = 42) -> 'RandomForestClassifier':
+    """
+    Trains a dummy RandomForestClassifier.
+    The training data is drawn from a seeded generator, so every process gets the same model.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+    rng = np.random.default_rng(seed)
+    X = rng.random((100, 2)) * 100
+    y = rng.integers(0, 3, 100)
+    model = RandomForestClassifier(n_estimators=100, random_state=seed)
+    model.fit(X, y)
+    return model
+
+# Datasets the anomaly model is fitted on
+ANOMALY_TRAINING_SOURCES = ('data/data_lhkpn.csv', 'data/data_asn.csv')
+
+def train_anomaly_model(seed: int = 42, df_lhkpn: pd.DataFrame = None, df_asn: pd.DataFrame = None) -> 'IsolationForest':
+    """
+    Fits the LHKPN IsolationForest on the LHKPN_FEATURES of the actual reports,
+    read from ANOMALY_TRAINING_SOURCES unless the frames are given.
+    """
+    from sklearn.ensemble import IsolationForest
+    if df_lhkpn is None:
+        df_lhkpn, df_asn = (read_dataset(path) for path in ANOMALY_TRAINING_SOURCES)
+    features = build_lhkpn_features(df_lhkpn, df_asn)
+    model = IsolationForest(contamination=0.1, random_state=seed)
+    model.fit(_feature_values(features, LHKPN_FEATURES))
+    return model
+
+MODEL_TRAINERS = {
+    CLASSIFICATION_MODEL: train_classification_model,
+    ANOMALY_MODEL: train_anomaly_model
+}
+
+def latest_model_version(name: str, model_dir: str = MODEL_DIR) -> int:
+    """Returns the highest saved version of a model, or None when no artifact exists."""
+    try:
+        file_names = os.listdir(os.path.join(model_dir, name))
+    except FileNotFoundError:
+        return None
+    versions = [
+        int(file_name[1:-len('.joblib')]) for file_name in file_names
+        if file_name.startswith('v') and file_name.endswith('.joblib') and file_name[1:-len('.joblib')].isdigit()
+    ]
+    return max(versions) if versions else None
+
+def save_model_artifact(model: Any, name: str, training_info: Dict[str, Any], model_dir: str = MODEL_DIR) -> str:
+    """
+    Writes a model as the next version of `name` together with a JSON metadata file.
+    The artifact is stored uncompressed so it can be memory-mapped when loaded.
+    """
+    import joblib
+    import sklearn
+    version = (latest_model_version(name, model_dir) or 0) + 1
+    artifact_dir = os.path.join(model_dir, name)
+    os.makedirs(artifact_dir, exist_ok=True)
+
+    artifact_path = os.path.join(artifact_dir, f'v{version}.joblib')
+    joblib.dump(model, artifact_path)
+
+    metadata = {
+        'name': name,
+        'version': version,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'model_class': type(model).__name__,
+        'sklearn_version': sklearn.__version__,
+        'params': model.get_params(),
+        'training': training_info
+    }
+    with open(os.path.join(artifact_dir, f'v{version}.json'), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2, default=str)
+    return artifact_path
+
+def load_model_artifact(name: str, version: int = None, model_dir: str = MODEL_DIR) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Loads a saved model and its metadata (the latest version by default).
+    Arrays are memory-mapped read-only, so worker processes share the pages of one file.
+    """
+    if version is None:
+        version = latest_model_version(name, model_dir)
+    if version is None:
+        raise FileNotFoundError(f"Tidak ada artefak model '{name}' di direktori '{model_dir}'.")
+
+    import joblib
+    artifact_dir = os.path.join(model_dir, name)
+    model = joblib.load(os.path.join(artifact_dir, f'v{version}.joblib'), mmap_mode='r')
+    with open(os.path.join(artifact_dir, f'v{version}.json'), encoding='utf-8') as f:
+        metadata = json.load(f)
+    return model, metadata
+
+@cache_resource(max_entries=4)
+@count_cache_miss('load_model')
+def _load_model_version(name: str, version: int, training_data: Tuple = None) -> Any:
+    """
+    Loads one model version; without any saved artifact (version None) the model
+    is trained in-process like the offline job. `training_data` is only part of the cache key.
+    """
+    if version is None:
+        return MODEL_TRAINERS[name]()
+    model, _ = load_model_artifact(name, version)
+    return model
+
+@timed('load_model')
+def load_classification_model() -> 'RandomForestClassifier':
+    """Returns the latest saved talent-pool classifier, cached per artifact version."""
+    return _load_model_version(CLASSIFICATION_MODEL, latest_model_version(CLASSIFICATION_MODEL))
+
+def anomaly_training_version(model_version: int) -> Tuple:
+    """
+    Version of the data the anomaly model of `model_version` was fitted on, when that model is
+    trained in-process (no artifact): it changes whenever ANOMALY_TRAINING_SOURCES change.
+    None for a saved artifact, which is fixed by its version alone.
+    """
+    return data_versions(*ANOMALY_TRAINING_SOURCES) if model_version is None else None
+
+@timed('load_model')
+def load_anomaly_model() -> 'IsolationForest':
+    """Returns the latest saved LHKPN anomaly model, cached per artifact version."""
+    version = latest_model_version(ANOMALY_MODEL)
+    # A model trained in-process follows the data it was fitted on
+    return _load_model_version(ANOMALY_MODEL, version, anomaly_training_version(version))
+
+# --- LHKPN Anomaly Features ---
+
+# Features the anomaly model is fitted on and predicts from, one row per report
+LHKPN_FEATURES = ['yoy_change', 'cagr_2_tahun', 'cagr_3_tahun', 'z_yoy_pangkat', 'z_yoy_unit', 'rasio_kekayaan_gaji']
+# Number of earlier reports the compound growth windows reach back over
+LHKPN_CAGR_WINDOWS = (2, 3)
+# Peer groups of the z-score features; reports are compared within the same group and year
+LHKPN_PEER_GROUPS = {'z_yoy_pangkat': 'pangkat_gol', 'z_yoy_unit': 'unit_kerja'}
+# Bound of the feature values, so growth after a zero-wealth year stays finite for the model
+_FEATURE_LIMIT = 1e6
+
+def _feature_values(df: pd.DataFrame, columns: list) -> np.ndarray:
+    """Model input of the given feature columns, with missing values as 0 and bounded magnitude."""
+    values = np.nan_to_num(df[columns].to_numpy(dtype=float), nan=0.0, posinf=_FEATURE_LIMIT, neginf=-_FEATURE_LIMIT)
+    return np.clip(values, -_FEATURE_LIMIT, _FEATURE_LIMIT)
+
+def _peer_zscore(values: pd.Series, keys: list, baseline: pd.Series) -> pd.Series:
+    """Z-score of every value within its group; the mean and spread come from the `baseline` rows only."""
+    grouped = values.where(baseline).groupby(keys, sort=False, observed=True, dropna=False)
+    mean = grouped.transform('mean')
+    std = grouped.transform('std')
+    return ((values - mean) / std).where(std > 0, 0.0)
+
+def _stored_peer_zscore(values: pd.Series, keys: list, statistics: pd.DataFrame) -> pd.Series:
+    """Z-score of every value against the stored mean and spread of its group, as in `_peer_zscore`."""
+    group = statistics.reindex(pd.MultiIndex.from_arrays(keys))
+    mean, std = group['mean'].to_numpy(), group['std'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        zscore = (values.to_numpy(dtype=float) - mean) / std
+    return pd.Series(np.where(std > 0, zscore, 0.0), index=values.index)
+
+def build_lhkpn_features(df_lhkpn: pd.DataFrame, df_asn: pd.DataFrame = None, baseline: pd.Series = None,
+                         peer_statistics: Dict[str, pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Returns the LHKPN reports sorted by ASN and year with the LHKPN_FEATURES added, computed
+    with grouped, vectorized operations over all ASN at once:
+
+    - `yoy_change`: change against the previous report
+    - `cagr_2_tahun`, `cagr_3_tahun`: compound annual growth since 2 and 3 reports earlier
+    - `z_yoy_pangkat`, `z_yoy_unit`: `yoy_change` against reports of the same year and rank or unit
+    - `rasio_kekayaan_gaji`: wealth over the salary earned in all working years
+
+    Peer statistics use only the rows flagged in `baseline` (aligned to `df_lhkpn`), all rows by default,
+    or are taken from `peer_statistics` (see `lhkpn_peer_statistics`) when given.
+    Without `df_asn` the peer and salary features are left empty.
+    """
+    df = df_lhkpn.sort_values(['id_asn', 'tahun_lapor'], kind='stable')
+    by_asn = df.groupby('id_asn', sort=False)
+    kekayaan = df['total_kekayaan'].astype(float)
+    tahun = df['tahun_lapor'].astype(float)
+
+    df['yoy_change'] = by_asn['total_kekayaan'].pct_change()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for window in LHKPN_CAGR_WINDOWS:
+            ratio = kekayaan / by_asn['total_kekayaan'].shift(window).astype(float)
+            elapsed = tahun - by_asn['tahun_lapor'].shift(window).astype(float)
+            df[f'cagr_{window}_tahun'] = ratio ** (1 / elapsed) - 1
+
+    if df_asn is None:
+        for feature in list(LHKPN_PEER_GROUPS) + ['rasio_kekayaan_gaji']:
+            df[feature] = np.nan
+        return df
+
+    profile = df_asn.set_index('id_asn')
+    baseline = pd.Series(True, index=df.index) if baseline is None else baseline.loc[df.index]
+    for feature, column in LHKPN_PEER_GROUPS.items():
+        peer = df['id_asn'].map(profile[column])
+        if peer_statistics is None:
+            df[feature] = _peer_zscore(df['yoy_change'], [peer, df['tahun_lapor']], baseline)
+        else:
+            df[feature] = _stored_peer_zscore(df['yoy_change'], [peer, df['tahun_lapor']], peer_statistics[feature])
+
+    gaji_kumulatif = df['id_asn'].map(profile['gaji_bulanan'] * 12 * profile['lama_bekerja_thn'].clip(lower=1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df['rasio_kekayaan_gaji'] = kekayaan / gaji_kumulatif.astype(float)
+    return df
+
+def lhkpn_peer_statistics(df_lhkpn: pd.DataFrame, df_asn: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Mean and spread of `yoy_change` per peer group and year of every peer feature, indexed by
+    (group, `tahun_lapor`), so reports outside the population can be compared with it.
+    """
+    features = build_lhkpn_features(df_lhkpn, df_asn)
+    profile = df_asn.set_index('id_asn')
+    statistics = {}
+    for feature, column in LHKPN_PEER_GROUPS.items():
+        peer = features['id_asn'].map(profile[column])
+        statistics[feature] = features['yoy_change'].groupby([peer, features['tahun_lapor']], observed=True).agg(['mean', 'std'])
+    return statistics
+
+@timed('load_lhkpn_peer_statistics')
+def load_lhkpn_peer_statistics() -> Dict[str, pd.DataFrame]:
+    """
+    Returns the peer statistics of all LHKPN reports, recomputed only when the data changes.
+    Returns None when the data cannot be loaded. Callers must not mutate them.
+    """
+    return _load_lhkpn_peer_statistics_version(data_versions(*ANOMALY_TRAINING_SOURCES))
+
+@cache_resource(max_entries=2)
+@count_cache_miss('load_lhkpn_peer_statistics')
+def _load_lhkpn_peer_statistics_version(versions: Tuple) -> Dict[str, pd.DataFrame]:
+    """Computes the peer statistics; the argument is only part of the cache key."""
+    df_lhkpn, df_asn = (load_data(path) for path in ANOMALY_TRAINING_SOURCES)
+    if df_lhkpn.empty or df_asn.empty:
+        return None
+    return lhkpn_peer_statistics(df_lhkpn, df_asn)
+
+# --- Talent Pool Assignment ---
+
+# Talent pool label of every class of the classifier; predictions outside it become 'N/A'
+TALENT_POOL_LABELS = ['Solid Contributor', 'High Potential', 'Low Performer']
+TALENT_POOL_FEATURES = ['kinerja_2023', 'potensi']
+# Grid size of the kinerja x potensi density of the talent map
+TALENT_DENSITY_BINS = 40
+# Columns of the ASN detail table that can be filtered by value and sorted on the server
+TALENT_TABLE_FILTERS = ['unit_kerja', 'jabatan_sekarang']
+TALENT_TABLE_SORT_COLUMNS = ['nama', 'nip', 'jabatan_sekarang', 'unit_kerja', 'kinerja_2023', 'potensi', 'talent_pool']
+# Datasets the talent pool table is derived from
+TALENT_POOL_SOURCES = ('data/data_asn.csv',)
+
+@timed('assign_talent_pools')
+def assign_talent_pools(model: 'RandomForestClassifier', df_asn: pd.DataFrame) -> pd.Categorical:
+    """Classifies every ASN with a single batched predict and returns the talent pools as a categorical."""
+    # In a real scenario, features would be properly scaled and selected.
+    # Here, we use the raw scores for demonstration.
+    predictions = model.predict(df_asn[TALENT_POOL_FEATURES].to_numpy())
+    codes = np.where((predictions >= 0) & (predictions < len(TALENT_POOL_LABELS)), predictions, len(TALENT_POOL_LABELS))
+    return pd.Categorical.from_codes(codes.astype(int), categories=TALENT_POOL_LABELS + ['N/A'])
+
+class TalentPoolTable:
+    """
+    Read-only ASN table with its talent pool, built once per model and data version and
+    shared by every session. The rows of every pool are indexed up front, so filtering
+    is a positional take instead of a comparison over the whole table. Callers must not
+    mutate the returned frames.
+    """
+
+    def __init__(self, df_asn: pd.DataFrame, talent_pool: pd.Categorical):
+        self.asn = df_asn.assign(talent_pool=talent_pool).reset_index(drop=True)
+        self._groups = self.asn.groupby('talent_pool', observed=True, sort=True).indices
+        self._pool_by_id = dict(zip(self.asn['id_asn'].tolist(), self.asn['talent_pool'].tolist()))
+        # Pools that actually occur, in category order
+        self.pools = list(self._groups)
+        # (min, max) of every score, the full extent of the talent map
+        self.bounds = {column: (self.asn[column].min(), self.asn[column].max()) for column in TALENT_POOL_FEATURES}
+        # Filter choices of the detail table and the lowercase text it is searched on
+        self.options = {column: sorted(self.asn[column].dropna().unique().tolist()) for column in TALENT_TABLE_FILTERS}
+        self._search_text = (self.asn['nama'].str.lower() + '\n' + self.asn['nip'].astype(str)).to_numpy()
+        # Sort rank of every row per column, computed on first use
+        self._sort_ranks = {}
+
+    def count(self, pool: str) -> int:
+        """Number of ASN in a talent pool."""
+        return len(self._groups.get(pool, ()))
+
+    def filter(self, pool: str = None) -> pd.DataFrame:
+        """Rows of one talent pool, or every row when `pool` is None."""
+        if pool is None:
+            return self.asn
+        return self.asn.take(self._groups.get(pool, np.array([], dtype=int)))
+
+    def get_pool(self, id_asn: int) -> str:
+        """Talent pool of one ASN, or 'N/A' when the id is unknown."""
+        return self._pool_by_id.get(id_asn, 'N/A')
+
+    def _sort_rank(self, column: str) -> np.ndarray:
+        rank = self._sort_ranks.get(column)
+        if rank is None:
+            order = self.asn[column].argsort(kind='stable').to_numpy()
+            rank = np.empty(len(order), dtype=np.int64)
+            rank[order] = np.arange(len(order))
+            self._sort_ranks[column] = rank
+        return rank
+
+    def select(self, pool: str = None, filters: Dict[str, Tuple] = None, search: str = '', sort_by: str = None,
+               descending: bool = False) -> np.ndarray:
+        """
+        Positions of the rows in one talent pool (every pool when None) whose TALENT_TABLE_FILTERS
+        columns take one of the values in `filters` and whose name or NIP contains `search`,
+        ordered by `sort_by`.
+        """
+        mask = np.ones(len(self.asn), dtype=bool)
+        if pool is not None:
+            mask[:] = False
+            mask[self._groups.get(pool, [])] = True
+        for column, values in (filters or {}).items():
+            if values:
+                mask &= self.asn[column].isin(values).to_numpy()
+        positions = np.flatnonzero(mask)
+
+        needle = search.strip().lower()
+        if needle:
+            matches = pd.Series(self._search_text[positions]).str.contains(needle, regex=False).to_numpy()
+            positions = positions[matches]
+        if sort_by is not None:
+            rank = self._sort_rank(sort_by)[positions]
+            positions = positions[np.argsort(-rank if descending else rank, kind='stable')]
+        return positions
+
+    def page(self, positions: np.ndarray, page: int, page_size: int) -> pd.DataFrame:
+        """Rows of one page (0-based) of the `select` result."""
+        return self.asn.take(positions[page * page_size:(page + 1) * page_size])
+
+    def _in_window(self, df: pd.DataFrame, kinerja_range: Tuple, potensi_range: Tuple) -> np.ndarray:
+        kinerja = df['kinerja_2023'].to_numpy()
+        potensi = df['potensi'].to_numpy()
+        return (kinerja >= kinerja_range[0]) & (kinerja <= kinerja_range[1]) & (potensi >= potensi_range[0]) & (potensi <= potensi_range[1])
+
+    def window(self, pool: str, kinerja_range: Tuple, potensi_range: Tuple) -> pd.DataFrame:
+        """Rows of a talent pool (every pool when None) whose scores lie within both ranges."""
+        df = self.filter(pool)
+        return df[self._in_window(df, kinerja_range, potensi_range)]
+
+    def density(self, pool: str, kinerja_range: Tuple, potensi_range: Tuple, bins: int = TALENT_DENSITY_BINS) -> pd.DataFrame:
+        """
+        Counts the rows of `window` on a `bins` x `bins` grid over both ranges, with one count
+        column per talent pool. Returns one row per occupied cell with its grid position
+        (`bin_kinerja`, `bin_potensi`), its center (`kinerja_2023`, `potensi`) and `jumlah`.
+        """
+        df = self.filter(pool)
+        inside = self._in_window(df, kinerja_range, potensi_range)
+        cells = []
+        for column, (low, high) in zip(TALENT_POOL_FEATURES, (kinerja_range, potensi_range)):
+            width = (high - low) / bins if high > low else 1
+            cell = np.floor((df[column].to_numpy(dtype=float)[inside] - low) / width).astype(int)
+            # The upper edge belongs to the last cell
+            cells.append((np.clip(cell, 0, bins - 1), low, width))
+
+        (cell_x, low_x, width_x), (cell_y, low_y, width_y) = cells
+        codes = df['talent_pool'].cat.codes.to_numpy()[inside]
+        n_codes = len(df['talent_pool'].cat.categories)
+        counts = np.bincount((cell_y * bins + cell_x) * n_codes + codes, minlength=bins * bins * n_codes).reshape(bins * bins, n_codes)
+
+        occupied = np.flatnonzero(counts.sum(axis=1))
+        result = pd.DataFrame(counts[occupied], columns=df['talent_pool'].cat.categories)[self.pools]
+        result.insert(0, 'bin_kinerja', occupied % bins)
+        result.insert(1, 'bin_potensi', occupied // bins)
+        result.insert(2, 'kinerja_2023', low_x + (result['bin_kinerja'] + 0.5) * width_x)
+        result.insert(3, 'potensi', low_y + (result['bin_potensi'] + 0.5) * width_y)
+        result.insert(4, 'jumlah', counts[occupied].sum(axis=1))
+        return result
+
+@timed('load_talent_pools')
+def load_talent_pools() -> TalentPoolTable:
+    """
+    Returns the shared TalentPoolTable, rebuilt only when the ASN data or the classifier
+    artifact changes. Returns None when the ASN data cannot be loaded.
+    """
+    return _load_talent_pools_version(data_versions(*TALENT_POOL_SOURCES), latest_model_version(CLASSIFICATION_MODEL))
+
+@cache_resource(max_entries=2)
+@count_cache_miss('load_talent_pools')
+def _load_talent_pools_version(versions: Tuple, model_version: int) -> TalentPoolTable:
+    """Classifies every ASN; the arguments are only part of the cache key."""
+    df_asn = load_data('data/data_asn.csv')
+    if df_asn.empty:
+        return None
+    return TalentPoolTable(df_asn, assign_talent_pools(load_classification_model(), df_asn))
+
+@timed('load_talent_density')
+def load_talent_density(pool: str, kinerja_range: Tuple, potensi_range: Tuple) -> pd.DataFrame:
+    """Returns `TalentPoolTable.density` of the shared table, cached per filter and model/data version."""
+    return _load_talent_density_version(
+        data_versions(*TALENT_POOL_SOURCES), latest_model_version(CLASSIFICATION_MODEL), pool, kinerja_range, potensi_range
+    )
+
+@cache_data(max_entries=32)
+@count_cache_miss('load_talent_density')
+def _load_talent_density_version(versions: Tuple, model_version: int, pool: str, kinerja_range: Tuple, potensi_range: Tuple) -> pd.DataFrame:
+    """Aggregates one filter; `versions` and `model_version` are only part of the cache key."""
+    return load_talent_pools().density(pool, kinerja_range, potensi_range)
+
+@timed('load_talent_table_rows')
+def load_talent_table_rows(pool: str, filters: Tuple, search: str, sort_by: str, descending: bool) -> np.ndarray:
+    """
+    Returns `TalentPoolTable.select` of the shared table, cached per query and model/data version.
+    `filters` is a tuple of (column, values) pairs so it can be part of the cache key.
+    """
+    return _load_talent_table_rows_version(
+        data_versions(*TALENT_POOL_SOURCES), latest_model_version(CLASSIFICATION_MODEL), pool, filters, search, sort_by, descending
+    )
+
+@cache_data(max_entries=32)
+@count_cache_miss('load_talent_table_rows')
+def _load_talent_table_rows_version(versions: Tuple, model_version: int, pool: str, filters: Tuple, search: str,
+                                    sort_by: str, descending: bool) -> np.ndarray:
+    """Runs one table query; `versions` and `model_version` are only part of the cache key."""
+    return load_talent_pools().select(pool, dict(filters), search, sort_by, descending)
+
+# --- Business Logic & Analysis Functions ---
+
+def get_talent_pool_prediction(id_asn: int) -> str:
+    """Returns the talent pool of one ASN from the shared TalentPoolTable."""
+    talent_pools = load_talent_pools()
+    return talent_pools.get_pool(id_asn) if talent_pools is not None else 'N/A'
+
+def promotion_metrics(id_asn: int, potensi: int, kinerja: int) -> Tuple[int, int]:
+    """
+    Promotion probability and fulfilment of the promotion requirements, in percent, derived
+    from the potential and performance scores with a variation seeded by the ASN id, so the
+    Profil Talenta page and the scoring API report the same values.
+    """
+    prob_promosi = int(60 + (potensi - 60) * 0.4 + np.random.RandomState(id_asn).randint(0, 10))
+    syarat_promosi = int(70 + (kinerja - 60) * 0.3 + np.random.RandomState(id_asn + 1).randint(0, 10))
+    return prob_promosi, syarat_promosi
+
+def flag_lhkpn_anomalies(model: 'IsolationForest', df: pd.DataFrame) -> pd.DataFrame:
+    """Adds the rule, model and combined anomaly flags to reports that already have their features."""
+    # Rule-based anomaly: Year-over-Year increase > 150% (more robust)
+    df['rule_anomaly'] = df['yoy_change'] > 1.5
+
+    # Model-based anomaly over all features in one batched predict; artifacts saved before
+    # the feature pipeline were fitted on the Year-over-Year change alone
+    columns = LHKPN_FEATURES if getattr(model, 'n_features_in_', len(LHKPN_FEATURES)) == len(LHKPN_FEATURES) else ['yoy_change']
+    df['model_anomaly'] = model.predict(_feature_values(df, columns)) == -1 if len(df) else np.zeros(0, dtype=bool)
+
+    # Combine anomalies: An anomaly is only flagged if BOTH the rule and the model detect it.
+    # This makes the system much more selective.
+    df['is_anomaly'] = df['rule_anomaly'] & df['model_anomaly']
+    return df
+
+@timed('detect_lhkpn_anomalies')
+def detect_lhkpn_anomalies(model: 'IsolationForest', df_lhkpn: pd.DataFrame, df_asn: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Scores LHKPN reports of many ASN at once.
+    The features are computed per ASN and peer group with grouped operations and the
+    model is called once over all rows, so the cost does not grow with the
+    number of Python calls.
+    """
+    return flag_lhkpn_anomalies(model, build_lhkpn_features(df_lhkpn, df_asn))
+
+def analyze_lhkpn_anomaly(model: 'IsolationForest', df_asn_lhkpn: pd.DataFrame, df_asn: pd.DataFrame = None) -> Tuple[pd.DataFrame, bool]:
+    """Analyzes LHKPN data of a single ASN for anomalies using a model and simple rules."""
+    if df_asn_lhkpn.empty or len(df_asn_lhkpn) < 2:
+        return df_asn_lhkpn, False
+
+    result_df = detect_lhkpn_anomalies(model, df_asn_lhkpn, df_asn)
+    has_anomaly = result_df['is_anomaly'].any()
+    return result_df, has_anomaly
+
+# --- Incremental LHKPN Anomaly Ledger ---
+
+# Append-only record of scored LHKPN reports. Every update run adds one Parquet part with
+# the newly scored rows and a new snapshot of the per-ASN rolling state; 'ledger.json'
+# names the current parts, the state snapshot and the model version they were scored with.
+LHKPN_LEDGER_DIR = 'data/ledger_lhkpn'
+LHKPN_LEDGER_INFO = 'ledger.json'
+# Bumped whenever the columns of the ledger or its state change; older ledgers are rebuilt
+LHKPN_LEDGER_FORMAT = 2
+LHKPN_LEDGER_COLUMNS = ['id_asn', 'tahun_lapor', 'total_kekayaan'] + LHKPN_FEATURES + ['rule_anomaly', 'model_anomaly', 'is_anomaly']
+# Earlier reports kept per ASN so the growth windows of new reports reach into the history
+LHKPN_HISTORY_DEPTH = max(LHKPN_CAGR_WINDOWS)
+
+def empty_lhkpn_state() -> pd.DataFrame:
+    """
+    Per-ASN rolling state of the ledger, indexed by id_asn, before any report is scored:
+    `tahun_k`/`kekayaan_k` hold the k-th most recent report (k = 1 is the latest),
+    followed by the running counters.
+    """
+    history = {}
+    for k in range(1, LHKPN_HISTORY_DEPTH + 1):
+        history[f'tahun_{k}'] = pd.Series(dtype='Int64')
+        history[f'kekayaan_{k}'] = pd.Series(dtype='Int64')
+    return pd.DataFrame({
+        **history,
+        'jumlah_laporan': pd.Series(dtype='int64'),
+        'jumlah_anomali': pd.Series(dtype='int64'),
+        'yoy_maks': pd.Series(dtype=float)
+    }, index=pd.Index([], dtype='int64', name='id_asn'))
+
+@timed('score_new_lhkpn_reports')
+def score_new_lhkpn_reports(model: 'IsolationForest', df_lhkpn: pd.DataFrame, state: pd.DataFrame,
+                            df_asn: pd.DataFrame = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Scores only the reports filed after the last known year of each ASN in `state`.
+    The last reports kept in the state are put back in front of the new ones, so the growth
+    features equal a full recompute; peer baselines are computed over the reports of this run,
+    which matches a full recompute when a reporting year is scored in one run.
+    Returns the scored new rows and the updated state; already known years are skipped.
+    """
+    last_year = df_lhkpn['id_asn'].map(state['tahun_1'])
+    is_new = last_year.isna().to_numpy() | (df_lhkpn['tahun_lapor'] > last_year).fillna(False).to_numpy(dtype=bool)
+    new_reports = df_lhkpn.loc[is_new, ['id_asn', 'tahun_lapor', 'total_kekayaan']]
+
+    known = state[state.index.isin(new_reports['id_asn'].unique())]
+    history = pd.concat([
+        pd.DataFrame({'id_asn': known.index, 'tahun_lapor': known[f'tahun_{k}'], 'total_kekayaan': known[f'kekayaan_{k}']})
+        for k in range(1, LHKPN_HISTORY_DEPTH + 1)
+    ]).dropna()
+    reports = pd.concat([history.assign(baru=False), new_reports.assign(baru=True)], ignore_index=True)
+    reports = reports.astype({'id_asn': 'int64', 'tahun_lapor': 'int64', 'total_kekayaan': 'int64'})
+
+    features = build_lhkpn_features(reports, df_asn, baseline=reports['baru'])
+    scored = flag_lhkpn_anomalies(model, features[features['baru'].to_numpy()].copy())
+    scored = scored[LHKPN_LEDGER_COLUMNS].astype({
+        'tahun_lapor': df_lhkpn['tahun_lapor'].dtype,
+        'total_kekayaan': df_lhkpn['total_kekayaan'].dtype
+    })
+
+    # New history: the last reports of every ASN with new filings, most recent first
+    recent = features.groupby('id_asn', sort=False).tail(LHKPN_HISTORY_DEPTH)
+    rank = recent.groupby('id_asn', sort=False).cumcount(ascending=False) + 1
+    wide = recent.assign(k=rank.to_numpy()).pivot(index='id_asn', columns='k', values=['tahun_lapor', 'total_kekayaan'])
+    delta = pd.DataFrame(index=wide.index)
+    for k in range(1, LHKPN_HISTORY_DEPTH + 1):
+        for column, name in (('tahun_lapor', 'tahun'), ('total_kekayaan', 'kekayaan')):
+            values = wide[(column, k)] if (column, k) in wide.columns else pd.Series(np.nan, index=wide.index)
+            delta[f'{name}_{k}'] = values.astype('Int64')
+
+    grouped = scored.groupby('id_asn', sort=False)
+    previous = state.reindex(delta.index)
+    delta['jumlah_laporan'] = previous['jumlah_laporan'].fillna(0).astype('int64') + grouped.size().reindex(delta.index, fill_value=0)
+    delta['jumlah_anomali'] = previous['jumlah_anomali'].fillna(0).astype('int64') + grouped['is_anomaly'].sum().reindex(delta.index, fill_value=0).astype('int64')
+    delta['yoy_maks'] = np.fmax(previous['yoy_maks'], grouped['yoy_change'].max().reindex(delta.index))
+
+    new_state = pd.concat([state[~state.index.isin(delta.index)], delta])
+    new_state.index.name = 'id_asn'
+    return scored, new_state
+
+def read_lhkpn_ledger_info(ledger_dir: str = LHKPN_LEDGER_DIR) -> Dict[str, Any]:
+    """Returns the ledger metadata, or None when no ledger has been written yet."""
+    try:
+        with open(os.path.join(ledger_dir, LHKPN_LEDGER_INFO), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def _ledger_is_current(info: Dict[str, Any], model_version: int, training_data: Tuple) -> bool:
+    # Compare in JSON form, where the version tuples are stored as lists
+    return (
+        info is not None and info.get('format') == LHKPN_LEDGER_FORMAT and info['model_version'] == model_version
+        and info.get('training_data') == json.loads(json.dumps(training_data))
+    )
+
+def read_lhkpn_ledger(model_version: int, training_data: Tuple = None, ledger_dir: str = LHKPN_LEDGER_DIR) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Returns the scored rows and the rolling state of the ledger.
+    Returns None when there is no ledger, or it was scored with another model version or format,
+    or, for an in-process model, with a model fitted on other data (`anomaly_training_version`).
+    """
+    info = read_lhkpn_ledger_info(ledger_dir)
+    if not _ledger_is_current(info, model_version, training_data):
+        return None
+    parts = [pd.read_parquet(os.path.join(ledger_dir, part), engine='pyarrow') for part in info['parts']]
+    ledger = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=LHKPN_LEDGER_COLUMNS)
+    state = pd.read_parquet(os.path.join(ledger_dir, info['state']), engine='pyarrow')
+    return ledger, state
+
+def update_lhkpn_ledger(model: 'IsolationForest', df_lhkpn: pd.DataFrame, model_version: int, df_asn: pd.DataFrame = None,
+                        ledger_dir: str = LHKPN_LEDGER_DIR, rebuild: bool = False, training_data: Tuple = None) -> int:
+    """
+    Offline stage: scores the reports of `df_lhkpn` that are newer than the ledger and appends them.
+    The ledger is rebuilt from scratch when `rebuild` is set or the model version, its training
+    data (`anomaly_training_version`, for an in-process model) or the format changed.
+    A run that scores nothing on a current ledger writes nothing, so readers keep their caches.
+    Returns the number of newly scored reports.
+    """
+    info = read_lhkpn_ledger_info(ledger_dir)
+    # Run numbers keep increasing across rebuilds so a new file never overwrites a referenced one
+    run = (info['run'] if info is not None else 0) + 1
+    rebuild = rebuild or not _ledger_is_current(info, model_version, training_data)
+    if rebuild:
+        parts = []
+        state = empty_lhkpn_state()
+    else:
+        parts = list(info['parts'])
+        state = pd.read_parquet(os.path.join(ledger_dir, info['state']), engine='pyarrow')
+
+    scored, state = score_new_lhkpn_reports(model, df_lhkpn, state, df_asn)
+    if scored.empty and not rebuild:
+        return 0
+
+    # New files get names of their own and ledger.json is replaced last, so an interrupted
+    # run leaves the previous ledger intact
+    os.makedirs(ledger_dir, exist_ok=True)
+    if not scored.empty:
+        part = f'part-{run:05d}.parquet'
+        scored.to_parquet(os.path.join(ledger_dir, part), engine='pyarrow', index=False)
+        parts.append(part)
+    state_file = f'status-{run:05d}.parquet'
+    state.to_parquet(os.path.join(ledger_dir, state_file), engine='pyarrow')
+
+    new_info = {
+        'format': LHKPN_LEDGER_FORMAT,
+        'model_version': model_version,
+        'training_data': training_data,
+        'run': run,
+        'parts': parts,
+        'state': state_file,
+        'rows': int(state['jumlah_laporan'].sum()),
+        'updated_at': datetime.now(timezone.utc).isoformat()
+    }
+    info_path = os.path.join(ledger_dir, LHKPN_LEDGER_INFO)
+    with open(f'{info_path}.tmp', 'w', encoding='utf-8') as f:
+        json.dump(new_info, f, indent=2)
+    os.replace(f'{info_path}.tmp', info_path)
+
+    # Files no longer referenced: the previous state snapshot, or everything after a rebuild
+    referenced = set(parts) | {state_file, LHKPN_LEDGER_INFO}
+    for file_name in os.listdir(ledger_dir):
+        if file_name.endswith('.parquet') and file_name not in referenced:
+            os.remove(os.path.join(ledger_dir, file_name))
+    return len(scored)
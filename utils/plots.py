@@ -0,0 +1,88 @@
+"""Plotly figures shared by the pages."""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from utils.instrumentation import timed
+
+@timed('create_career_matrix_plot')
+def create_career_matrix_plot(asn_data: pd.Series) -> go.Figure:
+    """Creates a dynamic stacked bar chart for career probability based on ASN data."""
+    np.random.seed(asn_data['id_asn'])
+    years = [2025, 2026, 2027] # Use integers for years
+    
+    # Base probabilities
+    base_high = 10 + (asn_data['potensi'] - 50) / 2
+    base_medium = 40
+    base_low = 50 - base_high
+
+    # Generate probabilities for 3 years with some randomness
+    prob_high = [max(0, base_high + np.random.randint(-5, 5) + i*5) for i in range(3)]
+    prob_medium = [max(0, base_medium + np.random.randint(-10, 10) - i*2) for i in range(3)]
+    prob_low = [100 - ph - pm for ph, pm in zip(prob_high, prob_medium)]
+
+    fig = go.Figure()
+    # Updated color scheme for light theme
+    fig.add_trace(go.Bar(y=years, x=prob_low, name='Rendah', orientation='h', marker_color='#FF6B6B')) # Light Red
+    fig.add_trace(go.Bar(y=years, x=prob_medium, name='Sedang', orientation='h', marker_color='#FFD166')) # Light Yellow/Gold
+    fig.add_trace(go.Bar(y=years, x=prob_high, name='Tinggi', orientation='h', marker_color='#06D6A0')) # Light Green/Teal
+
+    fig.update_layout(
+        barmode='stack',
+        title_text='Matriks Probabilitas Waktu Promosi',
+        xaxis_title="Probabilitas (%)",
+        yaxis_title="Tahun",
+        legend_title="Tingkat Probabilitas",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='#F0F2F6', # Match secondary background
+        yaxis=dict(
+            tickmode='array',
+            tickvals=years,
+            ticktext=[str(y) for y in years]
+        )
+    )
+    return fig
+
+# --- Talent Map ---
+
+TALENT_POOL_COLORS = {
+    'High Potential': '#4a90e2',      # Primary Blue
+    'Solid Contributor': '#87ceeb',   # Light Blue/Sky
+    'Low Performer': '#e74c3c'       # Soft Red
+}
+# Above this many ASN the talent map is drawn from the binned density instead of single
+# markers, so the browser never receives one point (with hover data) per ASN
+TALENT_SCATTER_POINT_LIMIT = 5000
+
+@timed('create_talent_density_plot')
+def create_talent_density_plot(density: pd.DataFrame, pools: list, kinerja_range: tuple, potensi_range: tuple, bins: int) -> go.Figure:
+    """
+    Heatmap of the number of ASN per kinerja x potensi cell, from `TalentPoolTable.density`.
+    The hover of every cell lists its count per talent pool.
+    """
+    jumlah = np.full((bins, bins), np.nan)
+    jumlah[density['bin_potensi'], density['bin_kinerja']] = density['jumlah']
+    per_pool = np.zeros((bins, bins, len(pools)), dtype=int)
+    per_pool[density['bin_potensi'], density['bin_kinerja']] = density[pools].to_numpy()
+
+    width_x = (kinerja_range[1] - kinerja_range[0]) / bins or 1
+    width_y = (potensi_range[1] - potensi_range[0]) / bins or 1
+    hover_pools = ''.join(f"<br>{pool}: %{{customdata[{i}]:,}}" for i, pool in enumerate(pools))
+    fig = go.Figure(go.Heatmap(
+        x=kinerja_range[0] + (np.arange(bins) + 0.5) * width_x,
+        y=potensi_range[0] + (np.arange(bins) + 0.5) * width_y,
+        z=jumlah,
+        customdata=per_pool,
+        colorscale='Blues',
+        colorbar=dict(title='Jumlah ASN'),
+        hovertemplate="Kinerja: %{x:.1f}<br>Potensi: %{y:.1f}<br>Jumlah ASN: %{z:,}" + hover_pools + "<extra></extra>"
+    ))
+    fig.update_layout(
+        title='Peta Kepadatan Kinerja vs Potensi ASN',
+        xaxis_title="Skor Kinerja",
+        yaxis_title="Skor Potensi",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font_color='#dbeeff'
+    )
+    return fig
@@ -0,0 +1,397 @@
+"""Batch Early Warning System scoring, risk-prioritized relation views and the shared, indexed ASN repository."""
+import os
+from typing import TYPE_CHECKING, Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.data import data_version, data_versions, file_signature, load_data
+from utils.graph import RelationIndex, build_ego_layout, create_network_graph, load_relation_index
+from utils.instrumentation import count_cache_miss, timed
+from utils.models import ANOMALY_MODEL, LHKPN_LEDGER_DIR, LHKPN_LEDGER_INFO, anomaly_training_version, detect_lhkpn_anomalies, \
+    latest_model_version, load_anomaly_model, read_lhkpn_ledger, score_new_lhkpn_reports
+from utils.runtime import cache_data, cache_resource
+from utils.search import NameSearchIndex
+from utils.sentiment import SENTIMENT_SCORE_PATH, aggregate_sentiment, read_sentiment_scores, score_reviews
+
+if TYPE_CHECKING:
+    from sklearn.ensemble import IsolationForest
+
+# --- Financial Health Analysis ---
+
+# Reason codes produced by `analyze_financial_health_batch` and their display text
+FINANCIAL_REASONS = {
+    'wajar': "Profil keuangan dan riwayat kredit dalam batas wajar.",
+    'gaji_rendah_hutang_besar': "ASN memiliki gaji relatif rendah, namun total hutang sangat besar dan disertai riwayat kredit buruk (SLIK).",
+    'hutang_besar': "ASN memiliki total hutang yang besar dan riwayat kredit buruk (SLIK).",
+    'slik_buruk': "ASN memiliki riwayat kredit buruk (SLIK) meskipun rasio hutang terhadap gaji tergolong wajar.",
+}
+
+# Monthly salary above which an ASN counts as well paid
+FINANCIAL_HIGH_SALARY = 8000000
+# Debt over annual salary above which the debt counts as large
+FINANCIAL_DEBT_RATIO_LIMIT = 5.0
+
+def _financial_rules(gaji: Any, rasio_hutang_gaji: Any, flag_kualitas_Y: Any) -> Tuple[Any, Any]:
+    """
+    The financial-health rules, shared by the batch and the single-ASN path. Works element-wise
+    on aligned arrays and on plain scalars alike, so the single-ASN path pays no array overhead.
+    Returns the attention flags and the reason codes (positions in FINANCIAL_REASONS).
+    """
+    gaji_tinggi = gaji > FINANCIAL_HIGH_SALARY
+    hutang_besar = rasio_hutang_gaji > FINANCIAL_DEBT_RATIO_LIMIT
+
+    # Every case that needs attention requires a bad SLIK record
+    atensi = flag_kualitas_Y & (gaji_tinggi | hutang_besar)
+    # Integer codes follow the order of FINANCIAL_REASONS: 1 for a large debt on a normal salary,
+    # 2 for a large debt on a high salary, 3 for a bad record alone
+    kode_alasan = atensi * (3 - 2 * hutang_besar + (hutang_besar & gaji_tinggi))
+    return atensi, kode_alasan
+
+@timed('analyze_financial_health_batch')
+def analyze_financial_health_batch(df_asn_merged: pd.DataFrame) -> pd.DataFrame:
+    """
+    Analyzes the financial data of a whole merged ASN/SLIK frame with NumPy masks.
+    Returns `atensi`, `kode_alasan` (a key of FINANCIAL_REASONS) and `rasio_hutang_gaji`
+    columns aligned to the input index.
+    """
+    gaji = df_asn_merged['gaji_bulanan'].to_numpy(dtype=float)
+    gaji_tahunan = gaji * 12
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rasio_hutang_gaji = np.where(gaji_tahunan > 0, df_asn_merged['total_hutang'].to_numpy(dtype=float) / gaji_tahunan, 0.0)
+
+    # The flag is a boolean in the typed datasets and 'Y'/'N' in raw records
+    flag_kualitas_Y = df_asn_merged['kualitas_debitur_buruk'].isin([True, 'Y']).to_numpy(dtype=bool)
+    atensi, kode_alasan = _financial_rules(gaji, rasio_hutang_gaji, flag_kualitas_Y)
+    return pd.DataFrame({
+        'atensi': atensi,
+        'kode_alasan': pd.Categorical.from_codes(kode_alasan, categories=list(FINANCIAL_REASONS)),
+        'rasio_hutang_gaji': rasio_hutang_gaji
+    }, index=df_asn_merged.index)
+
+def analyze_financial_health(asn_financial_data: pd.Series) -> Tuple[bool, str]:
+    """
+    Analyzes the financial data of a single ASN with the rules of `analyze_financial_health_batch`.
+    The pages read the batch result from the repository instead; this is for one-off rows.
+    """
+    if asn_financial_data.empty:
+        return False, "Data keuangan tidak ditemukan."
+
+    gaji = float(asn_financial_data.get('gaji_bulanan', 0))
+    gaji_tahunan = gaji * 12
+    # A zero or missing salary gives a ratio of 0, as in the batch path
+    rasio_hutang_gaji = float(asn_financial_data.get('total_hutang', 0)) / gaji_tahunan if gaji_tahunan > 0 else 0.0
+    flag_kualitas_Y = asn_financial_data.get('kualitas_debitur_buruk', 'N') in (True, 'Y')
+
+    atensi, kode_alasan = _financial_rules(gaji, rasio_hutang_gaji, flag_kualitas_Y)
+    return bool(atensi), list(FINANCIAL_REASONS.values())[kode_alasan]
+
+# --- Batch Early Warning System ---
+
+@timed('build_risk_table')
+def build_risk_table(model: 'IsolationForest', df_asn: pd.DataFrame, df_slik: pd.DataFrame, df_lhkpn: pd.DataFrame,
+                     lhkpn_ledger: Tuple[pd.DataFrame, pd.DataFrame] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Scores the whole ASN population in one pass.
+    With an LHKPN ledger (scored rows and rolling state) only the reports filed after it are scored.
+    Returns the scored LHKPN rows and a per-ASN risk table ranked from the highest risk.
+    """
+    if lhkpn_ledger is None:
+        scored_lhkpn = detect_lhkpn_anomalies(model, df_lhkpn, df_asn)
+    else:
+        ledger_rows, ledger_state = lhkpn_ledger
+        new_rows, _ = score_new_lhkpn_reports(model, df_lhkpn, ledger_state, df_asn)
+        scored_lhkpn = pd.concat([ledger_rows, new_rows], ignore_index=True)
+
+    lhkpn_summary = scored_lhkpn.groupby('id_asn').agg(
+        anomali_lhkpn=('is_anomaly', 'any'),
+        yoy_maks=('yoy_change', 'max')
+    )
+
+    risk_table = pd.merge(df_asn, df_slik, on='id_asn', how='left')
+    financial = analyze_financial_health_batch(risk_table)
+    risk_table['atensi_keuangan'] = financial['atensi']
+    risk_table['kode_alasan_keuangan'] = financial['kode_alasan']
+    risk_table = risk_table.join(lhkpn_summary, on='id_asn')
+    risk_table['anomali_lhkpn'] = risk_table['anomali_lhkpn'].fillna(False).astype(bool)
+    risk_table['jumlah_indikator'] = risk_table['anomali_lhkpn'].astype(int) + risk_table['atensi_keuangan'].astype(int)
+
+    risk_table = risk_table.sort_values(
+        ['jumlah_indikator', 'anomali_lhkpn', 'yoy_maks'],
+        ascending=False,
+        na_position='last'
+    ).reset_index(drop=True)
+    return scored_lhkpn, risk_table
+
+# Datasets the risk table is derived from
+RISK_TABLE_SOURCES = ('data/data_asn.csv', 'data/data_slik.csv', 'data/data_lhkpn.csv')
+
+@timed('load_risk_table')
+def load_risk_table() -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Returns the cached batch EWS result, rebuilt only when one of its source datasets,
+    the anomaly model or the LHKPN ledger changes. The frames are shared by every session
+    instead of copied per rerun, so callers must not mutate them.
+    """
+    return _load_risk_table_version(data_versions(*RISK_TABLE_SOURCES), latest_model_version(ANOMALY_MODEL), ledger_version())
+
+def ledger_version() -> Tuple:
+    """Fingerprint of the LHKPN ledger; every update run replaces its info file."""
+    return file_signature(os.path.join(LHKPN_LEDGER_DIR, LHKPN_LEDGER_INFO))
+
+@cache_resource(max_entries=2)
+@count_cache_miss('load_risk_table')
+def _load_risk_table_version(versions: Tuple, model_version: int, ledger_version: Tuple) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Loads the source datasets and runs the batch EWS pass; the arguments are only part of the cache key."""
+    df_asn = load_data('data/data_asn.csv')
+    df_slik = load_data('data/data_slik.csv')
+    df_lhkpn = load_data('data/data_lhkpn.csv')
+    if df_asn.empty or df_slik.empty or df_lhkpn.empty:
+        return pd.DataFrame(), pd.DataFrame()
+
+    # A ledger scored with the current model spares rescoring the reports it already holds
+    lhkpn_ledger = read_lhkpn_ledger(model_version, anomaly_training_version(model_version))
+    return build_risk_table(load_anomaly_model(), df_asn, df_slik, df_lhkpn, lhkpn_ledger)
+
+# --- Network Risk Propagation ---
+
+# Datasets the network risk scores are derived from
+NETWORK_RISK_SOURCES = RISK_TABLE_SOURCES + ('data/data_relasi.csv',)
+
+@timed('build_network_risk')
+def build_network_risk(risk_table: pd.DataFrame, relation_index: RelationIndex) -> pd.DataFrame:
+    """
+    Spreads the batch EWS indicators over the relation graph: every ASN seeds risk equal to
+    its number of indicators, which then flows along the weighted relations
+    (`RelationIndex.propagate_risk`). Returns one row per ASN of the risk table, indexed by
+    id_asn, ranked from the highest risk:
+
+    - `risiko_jaringan`: the score relative to the highest one (0-1); 0 without relations
+    - `peringkat_jaringan`: the rank of that score, 1 being the highest
+    """
+    seeds = risk_table.set_index('id_asn')['jumlah_indikator']
+    scores = relation_index.propagate_risk(seeds)
+    if scores.max(initial=0) > 0:
+        scores = scores / scores.max()
+
+    positions, in_graph = relation_index.lookup(seeds.index.to_numpy())
+    risiko = np.zeros(len(seeds))
+    risiko[in_graph] = scores[positions[in_graph]]
+    network_risk = pd.DataFrame({'risiko_jaringan': risiko}, index=seeds.index)
+    network_risk['peringkat_jaringan'] = network_risk['risiko_jaringan'].rank(method='min', ascending=False).astype(int)
+    return network_risk.sort_values('peringkat_jaringan', kind='stable')
+
+@timed('load_network_risk')
+def load_network_risk() -> pd.DataFrame:
+    """
+    Returns the cached network risk of every ASN, recomputed only when one of its source
+    datasets, the anomaly model or the LHKPN ledger changes. Shared like `load_risk_table`,
+    so callers must not mutate it.
+    """
+    return _load_network_risk_version(data_versions(*NETWORK_RISK_SOURCES), latest_model_version(ANOMALY_MODEL), ledger_version())
+
+@cache_resource(max_entries=2)
+@count_cache_miss('load_network_risk')
+def _load_network_risk_version(versions: Tuple, model_version: int, ledger_version: Tuple) -> pd.DataFrame:
+    """Propagates the cached EWS indicators; the arguments are only part of the cache key."""
+    _, risk_table = load_risk_table()
+    relation_index = load_relation_index()
+    if risk_table.empty or relation_index is None:
+        return pd.DataFrame(columns=['risiko_jaringan', 'peringkat_jaringan'])
+    return build_network_risk(risk_table, relation_index)
+
+# --- Risk-Prioritized Relation Views ---
+
+def _risk_versions() -> Tuple:
+    """Versions of everything the EWS indicators and network risk derive from."""
+    return data_versions(*NETWORK_RISK_SOURCES), latest_model_version(ANOMALY_MODEL), ledger_version()
+
+@timed('search_flagged_relation_paths')
+def search_flagged_relation_paths(source_id: int, max_hops: int, edge_types: Tuple[str, ...]) -> Tuple[pd.DataFrame, bool]:
+    """
+    Runs `RelationIndex.find_paths` from one ASN towards every ASN flagged by the batch EWS.
+    The flagged set is derived inside the cached search, so the cache key is the query and the
+    risk versions rather than the tens of thousands of target ids.
+    """
+    return _search_flagged_relation_paths_version(source_id, max_hops, edge_types, _risk_versions())
+
+@cache_data(max_entries=64)
+@count_cache_miss('search_flagged_relation_paths')
+def _search_flagged_relation_paths_version(source_id: int, max_hops: int, edge_types: Tuple[str, ...], versions: Tuple) -> Tuple[pd.DataFrame, bool]:
+    """Cached path search; `versions` is only part of the cache key."""
+    relation_index = load_relation_index()
+    _, risk_table = load_risk_table()
+    if relation_index is None or risk_table.empty:
+        return pd.DataFrame(), True
+    targets = risk_table.loc[risk_table['jumlah_indikator'] > 0, 'id_asn'].to_numpy()
+    return relation_index.find_paths(source_id, targets, max_hops=max_hops, edge_types=list(edge_types) or None)
+
+@timed('load_ego_layout')
+def load_ego_layout(selected_asn_id: int, expanded_types: Tuple[str, ...] = ()) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Returns the level-of-detail layout of an ASN's ego graph (`build_ego_layout`), cached per
+    (ASN, expanded relation types) and recomputed when the relation or risk data changes.
+    Neighbours are prioritised by their EWS indicators, then by their network risk.
+    """
+    return _load_ego_layout_version(selected_asn_id, tuple(sorted(expanded_types)), _risk_versions())
+
+@cache_data(max_entries=256)
+@count_cache_miss('load_ego_layout')
+def _load_ego_layout_version(selected_asn_id: int, expanded_types: Tuple[str, ...], risk_versions: Tuple) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Computes the layout; `risk_versions` is only part of the cache key."""
+    _, risk_table = load_risk_table()
+    priority = None
+    if not risk_table.empty:
+        priority = risk_table.set_index('id_asn')['jumlah_indikator'].astype(float)
+        network_risk = load_network_risk()
+        if not network_risk.empty:
+            priority = priority.add(network_risk['risiko_jaringan'], fill_value=0)
+    return build_ego_layout(load_relation_index(), selected_asn_id, priority, expanded_types)
+
+@timed('load_network_html')
+def load_network_html(selected_asn_id: int, expanded_types: Tuple[str, ...] = ()) -> str:
+    """Returns the rendered network graph of an ASN, cached per (ASN, expanded relation types, data version)."""
+    return _load_network_html_version(
+        selected_asn_id,
+        tuple(sorted(expanded_types)),
+        _risk_versions(),
+        data_version('data/data_asn.csv')
+    )
+
+# Every page carries the ~700 KB inlined vis.js bundle, so keep the cache bounded
+@cache_data(max_entries=64)
+@count_cache_miss('load_network_html')
+def _load_network_html_version(selected_asn_id: int, expanded_types: Tuple[str, ...], risk_versions: Tuple, asn_version: Tuple) -> str:
+    """
+    Renders the network graph from the cached layout; the versions are only part of the cache key.
+    Names come from the cached ASN data for the layout's nodes only, so rendering does not build
+    the ASNRepository.
+    """
+    layout = load_ego_layout(selected_asn_id, expanded_types)
+    df_asn = load_data('data/data_asn.csv')
+    asn_map = {}
+    if not df_asn.empty:
+        names = df_asn[df_asn['id_asn'].isin(layout[0]['id'])]
+        asn_map = dict(zip(names['id_asn'].tolist(), names['nama'].tolist()))
+    return create_network_graph(load_relation_index(), selected_asn_id, asn_map, layout=layout)
+
+# --- Indexed ASN Repository ---
+
+def _group_offsets(sorted_keys: pd.Series) -> Dict[Any, Tuple[int, int]]:
+    """Maps every key of an already sorted column to the (start, stop) positions of its rows."""
+    keys, starts, counts = np.unique(sorted_keys.to_numpy(), return_index=True, return_counts=True)
+    return dict(zip(keys.tolist(), zip(starts.tolist(), (starts + counts).tolist())))
+
+class ASNRepository:
+    """
+    Read-only, indexed view over the ASN datasets, built once per data version and
+    shared by every session. Lookups are dictionary hits followed by a positional slice,
+    so no widget interaction has to scan a full table. Callers must not mutate the
+    returned frames.
+    """
+
+    def __init__(self, risk_table: pd.DataFrame, scored_lhkpn: pd.DataFrame, df_sentimen: pd.DataFrame, sentiment_summary: pd.DataFrame,
+                 network_risk: pd.DataFrame = None):
+        # The risk table already is the ASN/SLIK merge enriched with the EWS columns
+        self.asn = risk_table.join(sentiment_summary, on='id_asn').set_index('id_asn', drop=False)
+        self.asn['jumlah_ulasan'] = self.asn['jumlah_ulasan'].fillna(0).astype(int)
+
+        # ASN ordered by network risk, highest first (empty without relation data)
+        self.network_ranking = pd.DataFrame(columns=['risiko_jaringan', 'peringkat_jaringan'], index=pd.Index([], name='id_asn'))
+        if network_risk is not None and not network_risk.empty:
+            self.asn = self.asn.join(network_risk)
+            self.network_ranking = network_risk
+
+        self.lhkpn = scored_lhkpn.sort_values(['id_asn', 'tahun_lapor'], kind='stable').reset_index(drop=True)
+        self._lhkpn_offsets = _group_offsets(self.lhkpn['id_asn'])
+
+        self.sentimen = df_sentimen.sort_values('id_asn', kind='stable').reset_index(drop=True)
+        self._sentimen_offsets = _group_offsets(self.sentimen['id_asn'])
+
+        # Positions of the ASN with at least one EWS indicator and the counts of the ranking tab
+        self.flagged_positions = np.flatnonzero(self.asn['jumlah_indikator'].to_numpy() > 0)
+        self.ews_counts = {
+            'anomali_lhkpn': int(self.asn['anomali_lhkpn'].sum()),
+            'atensi_keuangan': int(self.asn['atensi_keuangan'].sum())
+        }
+
+        self.id_to_name = dict(zip(self.asn['id_asn'].tolist(), self.asn['nama'].tolist()))
+        # Names can repeat, so selections go through the search index and are keyed by id
+        self.search_index = NameSearchIndex(self.asn['id_asn'], self.asn['nama'], self.asn['nip'])
+
+    def get_asn(self, id_asn: int) -> pd.Series:
+        """Returns the merged ASN row, or None when the id is unknown."""
+        if id_asn not in self.id_to_name:
+            return None
+        return self.asn.loc[id_asn]
+
+    def get_lhkpn(self, id_asn: int) -> pd.DataFrame:
+        """Returns the scored LHKPN reports of one ASN, ordered by reporting year."""
+        start, stop = self._lhkpn_offsets.get(id_asn, (0, 0))
+        return self.lhkpn.iloc[start:stop]
+
+    def get_reviews(self, id_asn: int) -> pd.DataFrame:
+        """Returns the narrative reviews of one ASN."""
+        start, stop = self._sentimen_offsets.get(id_asn, (0, 0))
+        return self.sentimen.iloc[start:stop]
+
+    def flagged_page(self, page: int, page_size: int) -> pd.DataFrame:
+        """Rows of one page (0-based) of the ASN with at least one EWS indicator."""
+        return self.asn.take(self.flagged_positions[page * page_size:(page + 1) * page_size])
+
+# Datasets the repository is derived from
+ASN_REPOSITORY_SOURCES = NETWORK_RISK_SOURCES + ('data/data_sentimen.csv',)
+
+@timed('load_asn_repository')
+def load_asn_repository() -> ASNRepository:
+    """
+    Returns the shared ASNRepository, rebuilt only when one of its source datasets,
+    the anomaly model, the LHKPN ledger or the sentiment score cache changes.
+    Returns None when a source dataset other than the relation data cannot be loaded.
+    """
+    return _load_asn_repository_version(
+        data_versions(*ASN_REPOSITORY_SOURCES),
+        latest_model_version(ANOMALY_MODEL),
+        ledger_version(),
+        file_signature(SENTIMENT_SCORE_PATH)
+    )
+
+@cache_resource(max_entries=2)
+@count_cache_miss('load_asn_repository')
+def _load_asn_repository_version(versions: Tuple, model_version: int, ledger_version: Tuple, score_version: Tuple) -> ASNRepository:
+    """Builds the repository; the arguments are only part of the cache key."""
+    scored_lhkpn, risk_table = load_risk_table()
+    df_sentimen = load_data('data/data_sentimen.csv')
+    if risk_table.empty or df_sentimen.empty:
+        return None
+
+    # Texts missing from the persistent score cache are scored here but not written back;
+    # the offline 'score_sentiment.py' stage keeps the cache complete.
+    scored_reviews, _ = score_reviews(df_sentimen, read_sentiment_scores(), processes=1)
+    return ASNRepository(risk_table, scored_lhkpn, df_sentimen, aggregate_sentiment(scored_reviews), load_network_risk())
+
+# Datasets the EWS selection list is derived from
+EWS_OPTIONS_SOURCES = ('data/data_asn.csv', 'data/data_lhkpn.csv', 'data/data_relasi.csv')
+
+@timed('load_ews_options')
+def load_ews_options() -> Tuple[NameSearchIndex, frozenset]:
+    """
+    Returns the search index over the ASN that appear in the LHKPN or relation data,
+    and the set of ids that have at least one relation.
+    """
+    return _load_ews_options_version(data_versions(*EWS_OPTIONS_SOURCES))
+
+@cache_resource(max_entries=2)
+@count_cache_miss('load_ews_options')
+def _load_ews_options_version(versions: Tuple) -> Tuple[NameSearchIndex, frozenset]:
+    """Builds the EWS selection index; `versions` is only part of the cache key."""
+    df_asn = load_data('data/data_asn.csv')
+    df_lhkpn = load_data('data/data_lhkpn.csv')
+    df_relasi = load_data('data/data_relasi.csv')
+    if df_asn.empty or df_lhkpn.empty or df_relasi.empty:
+        return NameSearchIndex([], [], []), frozenset()
+
+    relasi_ids = pd.unique(df_relasi[['id_asn_sumber', 'id_asn_target']].values.ravel('K'))
+    combined_ids = np.union1d(df_lhkpn['id_asn'].unique(), relasi_ids)
+    available = df_asn[df_asn['id_asn'].isin(combined_ids)]
+    return NameSearchIndex(available['id_asn'], available['nama'], available['nip']), frozenset(relasi_ids.tolist())
@@ -0,0 +1,50 @@
+"""
+Streamlit-optional runtime hooks: caches and error reporting that use Streamlit inside the
+app and plain Python elsewhere, so batch jobs run the same code without the web server.
+"""
+import functools
+import logging
+import sys
+
+runtime_logger = logging.getLogger('simantra')
+
+def _in_streamlit() -> bool:
+    """True once the process has imported Streamlit, as every page does before importing utils."""
+    return 'streamlit' in sys.modules
+
+def _cache(kind: str, max_entries: int):
+    def decorator(func):
+        cached = None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            nonlocal cached
+            # Resolved on the first call, when it is known whether Streamlit is running
+            if cached is None:
+                if _in_streamlit():
+                    import streamlit as st
+                    cached = getattr(st, kind)(max_entries=max_entries)(func)
+                else:
+                    cached = functools.lru_cache(maxsize=max_entries)(func)
+            return cached(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def cache_data(max_entries: int = None):
+    """
+    `st.cache_data` inside the app; an in-process LRU cache of `max_entries` results elsewhere.
+    Outside Streamlit the cached object itself is returned, so callers must not mutate it.
+    """
+    return _cache('cache_data', max_entries)
+
+def cache_resource(max_entries: int = None):
+    """`st.cache_resource` inside the app; an in-process LRU cache of `max_entries` objects elsewhere."""
+    return _cache('cache_resource', max_entries)
+
+def report_error(message: str) -> None:
+    """Shows an error in the page, or logs it when running without Streamlit."""
+    if _in_streamlit():
+        import streamlit as st
+        st.error(message)
+    else:
+        runtime_logger.error(message)
@@ -0,0 +1,153 @@
+"""Prefix and trigram search over ASN names and NIPs, and the search box of the pages."""
+import re
+from collections import defaultdict
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+from utils.instrumentation import timed
+
+# Maximum number of matches a search box offers
+SEARCH_LIMIT = 20
+# Names and queries are split into lowercase word tokens; punctuation of titles is dropped
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+class NameSearchIndex:
+    """
+    Read-only search index over the names and NIPs of a set of ASN, built once per data
+    version. Every distinct lowercase name token is kept in a sorted array for prefix
+    lookups and in a trigram posting list for substring lookups, so a query touches the
+    token vocabulary instead of every ASN. Results are ASN ids, so ASN sharing a name
+    stay distinguishable.
+    """
+
+    def __init__(self, ids, names, nips):
+        self.ids = np.asarray(ids)
+        self.names = np.asarray(names, dtype=object)
+        self.nips = pd.Series(nips).astype(str).to_numpy(dtype=object)
+        self._row_of = pd.Index(self.ids)
+
+        # Rows in name order: the list shown for an empty query and the tie-break of matches
+        lowered = pd.Series(self.names).str.lower()
+        self._name_order = np.argsort(lowered.to_numpy(dtype=str), kind='stable')
+        self._name_rank = np.empty(len(self.ids), dtype=np.int64)
+        self._name_rank[self._name_order] = np.arange(len(self.ids))
+
+        # Distinct tokens in sorted order and the rows of every token, grouped by token
+        tokens = lowered.str.findall(_TOKEN_PATTERN).explode().dropna()
+        codes, uniques = pd.factorize(tokens)
+        order = np.argsort(uniques.to_numpy(dtype=str), kind='stable')
+        self._tokens = uniques.to_numpy(dtype=str)[order]
+        token_ids = np.empty(len(order), dtype=np.int64)
+        token_ids[order] = np.arange(len(order))
+        token_ids = token_ids[codes]
+        # Token ids of every row, in row order (CSR), to check further words of a query on few rows
+        self._row_tokens = token_ids
+        self._row_offsets = np.searchsorted(tokens.index.to_numpy(), np.arange(len(self.ids) + 1))
+        by_token = np.argsort(token_ids, kind='stable')
+        self._token_rows = tokens.index.to_numpy()[by_token]
+        self._token_offsets = np.searchsorted(token_ids[by_token], np.arange(len(self._tokens) + 1))
+
+        # Trigram -> sorted ids of the tokens containing it
+        postings = defaultdict(list)
+        for token_id, token in enumerate(self._tokens.tolist()):
+            for gram in {token[i:i + 3] for i in range(len(token) - 2)}:
+                postings[gram].append(token_id)
+        self._trigrams = {gram: np.array(members, dtype=np.int64) for gram, members in postings.items()}
+
+        # NIPs in sorted order for prefix lookups
+        self._nip_order = np.argsort(self.nips.astype(str), kind='stable')
+        self._sorted_nips = self.nips.astype(str)[self._nip_order]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _prefix_tokens(self, word: str) -> np.ndarray:
+        start, stop = np.searchsorted(self._tokens, [word, word + '\uffff'])
+        return np.arange(start, stop)
+
+    def _substring_tokens(self, word: str) -> np.ndarray:
+        """Tokens containing `word` anywhere; needs at least one trigram."""
+        grams = {word[i:i + 3] for i in range(len(word) - 2)}
+        if not grams:
+            return np.array([], dtype=np.int64)
+        candidates = reduce(np.intersect1d, (self._trigrams.get(gram, np.array([], dtype=np.int64)) for gram in grams))
+        return candidates[np.char.find(self._tokens[candidates], word) >= 0]
+
+    def _rows_of_tokens(self, token_ids: np.ndarray) -> np.ndarray:
+        if len(token_ids) == 0:
+            return np.array([], dtype=np.int64)
+        rows = [self._token_rows[self._token_offsets[t]:self._token_offsets[t + 1]] for t in token_ids.tolist()]
+        return np.unique(np.concatenate(rows))
+
+    def _rows_with_tokens(self, rows: np.ndarray, token_ids: np.ndarray) -> np.ndarray:
+        """Flags the given rows that have at least one of the tokens."""
+        starts = self._row_offsets[rows]
+        lengths = self._row_offsets[rows + 1] - starts
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        hits = np.isin(self._row_tokens[positions], token_ids)
+        return np.bincount(np.repeat(np.arange(len(rows)), lengths), weights=hits, minlength=len(rows)) > 0
+
+    @timed('name_search')
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> np.ndarray:
+        """
+        Returns the ids of at most `limit` ASN matching `query`, best match first.
+        A query of digits matches NIP prefixes. Otherwise every word must match a name token,
+        by prefix or, from three letters on, anywhere inside it; prefix matches rank first,
+        then names in alphabetical order. An empty query returns the first names.
+        """
+        query = query.strip().lower()
+        if not query:
+            return self.ids[self._name_order[:limit]]
+        if query.isdigit():
+            start = np.searchsorted(self._sorted_nips, query)
+            stop = np.searchsorted(self._sorted_nips, query + '\uffff')
+            return self.ids[self._nip_order[start:min(stop, start + limit)]]
+
+        words = _TOKEN_PATTERN.findall(query)
+        if not words:
+            return self.ids[:0]
+        # Start from the word with the fewest candidate rows; the other words are only checked on those
+        matches = []
+        for word in words:
+            prefix_ids = self._prefix_tokens(word)
+            substring_ids = np.setdiff1d(self._substring_tokens(word), prefix_ids, assume_unique=True)
+            token_ids = np.concatenate([prefix_ids, substring_ids])
+            size = (self._token_offsets[token_ids + 1] - self._token_offsets[token_ids]).sum()
+            matches.append((size, prefix_ids, substring_ids))
+        matches.sort(key=lambda match: match[0])
+
+        _, prefix_ids, substring_ids = matches[0]
+        matched = self._rows_of_tokens(np.concatenate([prefix_ids, substring_ids]))
+        # Number of words matched only inside a token instead of at its start
+        substring_words = (~self._rows_with_tokens(matched, prefix_ids)).astype(np.int64)
+        for _, prefix_ids, substring_ids in matches[1:]:
+            by_prefix = self._rows_with_tokens(matched, prefix_ids)
+            keep = by_prefix | self._rows_with_tokens(matched, substring_ids)
+            matched = matched[keep]
+            substring_words = substring_words[keep] + ~by_prefix[keep]
+        best = np.lexsort((self._name_rank[matched], substring_words))[:limit]
+        return self.ids[matched[best]]
+
+    def label(self, id_asn) -> str:
+        """Display label of one ASN: the name with its NIP, which tells apart ASN sharing a name."""
+        row = self._row_of.get_loc(id_asn)
+        return f"{self.names[row]} · NIP {self.nips[row]}"
+
+def select_asn(index: NameSearchIndex, label: str, key: str, limit: int = SEARCH_LIMIT):
+    """
+    Search box followed by a selectbox of the best matches; returns the selected ASN id.
+    Only the matches are sent to the browser. Without any match the first names are offered.
+    Returns None, after a notice, when the index holds no ASN at all.
+    """
+    import streamlit as st
+    if len(index) == 0:
+        st.info("Belum ada ASN yang dapat dipilih.")
+        return None
+    query = st.text_input("Cari nama atau NIP:", key=f"{key}_query", placeholder="Ketik nama atau NIP")
+    ids = index.search(query, limit)
+    if len(ids) == 0:
+        st.caption("Tidak ada ASN yang cocok dengan pencarian.")
+        ids = index.search('', limit)
+    return st.selectbox(label, options=ids.tolist(), format_func=index.label, key=key)
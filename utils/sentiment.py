@@ -0,0 +1,136 @@
+"""VADER sentiment scoring of the narrative reviews and its persistent score cache."""
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.instrumentation import count_cache_miss, timed
+from utils.runtime import cache_resource
+
+# VADER is only imported when texts actually have to be scored
+if TYPE_CHECKING:
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+# --- Sentiment Analysis ---
+
+def analyze_sentiment(analyzer: 'SentimentIntensityAnalyzer', text: str) -> Dict[str, Any]:
+    """Analyzes sentiment of a given text using VADER."""
+    scores = analyzer.polarity_scores(text)
+    compound = scores['compound']
+    
+    if compound >= 0.05:
+        sentiment = "Positif"
+    elif compound <= -0.05:
+        sentiment = "Negatif"
+    else:
+        sentiment = "Netral"
+        
+    return {"sentiment": sentiment, "score": compound}
+
+@timed('load_sentiment_analyzer')
+@cache_resource()
+@count_cache_miss('load_sentiment_analyzer')
+def load_sentiment_analyzer() -> 'SentimentIntensityAnalyzer':
+    """Loads and caches the VADER sentiment analyzer."""
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
+
+# --- Batch Sentiment Scoring ---
+
+# Persistent compound scores of every distinct review text, keyed by text hash
+SENTIMENT_SCORE_PATH = 'data/skor_sentimen.parquet'
+
+def sentiment_labels(compound: np.ndarray) -> np.ndarray:
+    """Vectorized version of the thresholds used by `analyze_sentiment`."""
+    return np.select([compound >= 0.05, compound <= -0.05], ["Positif", "Negatif"], default="Netral")
+
+def text_hash(text: str) -> str:
+    """Stable key of a review text in the score cache."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+_worker_analyzer = None
+
+def _score_text_chunk(texts: list) -> list:
+    """Scores a chunk of texts inside a worker process, creating its analyzer once."""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        _worker_analyzer = SentimentIntensityAnalyzer()
+    return [_worker_analyzer.polarity_scores(text)['compound'] for text in texts]
+
+def score_texts(texts: list, processes: int = None, chunk_size: int = 2000) -> np.ndarray:
+    """
+    Computes the VADER compound score of every text.
+    Large inputs are split into chunks and scored by a pool of worker processes;
+    `processes=1` scores in the current process.
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes <= 1 or len(texts) <= chunk_size:
+        return np.asarray(_score_text_chunk(texts), dtype=float)
+
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        results = executor.map(_score_text_chunk, chunks)
+        return np.fromiter((score for chunk in results for score in chunk), dtype=float, count=len(texts))
+
+def read_sentiment_scores(score_path: str = SENTIMENT_SCORE_PATH) -> pd.DataFrame:
+    """Reads the persistent score cache, or an empty one when it does not exist yet."""
+    if not os.path.exists(score_path):
+        return pd.DataFrame({'text_hash': pd.Series(dtype='string'), 'skor': pd.Series(dtype=float)})
+    return pd.read_parquet(score_path, engine='pyarrow')
+
+@timed('score_reviews')
+def score_reviews(df_sentimen: pd.DataFrame, score_cache: pd.DataFrame, processes: int = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Scores every review of `df_sentimen`, running VADER only on distinct texts that
+    are missing from `score_cache`.
+    Returns the per-review scores (aligned to the input index) and the extended cache.
+    """
+    reviews = df_sentimen['ulasan_naratif'].astype('category')
+    # Identical texts share a category, so every distinct text is hashed and scored once
+    distinct_texts = reviews.cat.categories.astype(str).tolist()
+    distinct_hashes = pd.Index([text_hash(text) for text in distinct_texts])
+
+    known = score_cache.drop_duplicates('text_hash').set_index('text_hash')['skor']
+    is_missing = ~distinct_hashes.isin(known.index)
+    if is_missing.any():
+        missing_texts = [text for text, missing in zip(distinct_texts, is_missing) if missing]
+        new_scores = pd.DataFrame({
+            'text_hash': distinct_hashes[is_missing],
+            'skor': score_texts(missing_texts, processes=processes)
+        })
+        score_cache = pd.concat([score_cache, new_scores], ignore_index=True)
+        known = score_cache.set_index('text_hash')['skor']
+
+    distinct_scores = known.reindex(distinct_hashes).to_numpy()
+    codes = reviews.cat.codes.to_numpy()
+    skor = np.where(codes >= 0, distinct_scores[codes], np.nan)
+
+    scored = pd.DataFrame({'id_asn': df_sentimen['id_asn'], 'skor': skor}, index=df_sentimen.index)
+    scored['sentimen'] = sentiment_labels(skor)
+    return scored, score_cache
+
+def update_sentiment_scores(df_sentimen: pd.DataFrame, score_path: str = SENTIMENT_SCORE_PATH, processes: int = None) -> int:
+    """
+    Offline stage: scores the texts not yet in the persistent cache and writes it back.
+    Returns the number of newly scored texts.
+    """
+    score_cache = read_sentiment_scores(score_path)
+    _, updated_cache = score_reviews(df_sentimen, score_cache, processes=processes)
+    new_count = len(updated_cache) - len(score_cache)
+    if new_count:
+        updated_cache.to_parquet(score_path, engine='pyarrow', index=False)
+    return new_count
+
+def aggregate_sentiment(scored_reviews: pd.DataFrame) -> pd.DataFrame:
+    """Per-ASN average compound score, its label and the number of reviews."""
+    summary = scored_reviews.groupby('id_asn').agg(
+        skor_sentimen=('skor', 'mean'),
+        jumlah_ulasan=('skor', 'size')
+    )
+    summary['sentimen'] = sentiment_labels(summary['skor_sentimen'].to_numpy())
+    return summary